@@ -0,0 +1 @@
+"""Benchmark suite: synthetic data generators, in-process store stand-ins and the runner."""
@@ -0,0 +1,133 @@
+"""
+Deterministic synthetic data at production scale.
+
+Extends the make_series() idea from the Assignment 3 notebook to
+N years x 5 price areas x all production groups, plus multi-year hourly
+ERA5 frames for the five area cities. Same seed -> same data, so
+benchmark runs are comparable.
+"""
+
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+AREAS = ["NO1", "NO2", "NO3", "NO4", "NO5"]
+GROUPS = ["hydro", "wind", "solar", "thermal", "other"]
+
+# Rough relative size of each group (kWh/h) and of each area
+_GROUP_BASE = {"hydro": 4_000_000, "wind": 600_000, "solar": 20_000, "thermal": 80_000, "other": 30_000}
+_AREA_SCALE = {"NO1": 0.6, "NO2": 1.4, "NO3": 0.7, "NO4": 0.8, "NO5": 1.0}
+_AREA_CLIMATE = {  # (mean temp, seasonal amplitude, wet days share)
+    "NO1": (6.0, 11.0, 0.35), "NO2": (8.0, 8.0, 0.45), "NO3": (5.0, 9.0, 0.45),
+    "NO4": (2.5, 8.0, 0.50), "NO5": (8.0, 6.0, 0.60),
+}
+
+
+def hourly_index(years: Sequence[int], tz=None) -> pd.DatetimeIndex:
+    return pd.date_range(f"{min(years)}-01-01", f"{max(years)}-12-31 23:00", freq="h", tz=tz)
+
+
+def _profile(group: str, t: pd.DatetimeIndex, rng: np.random.Generator) -> np.ndarray:
+    n = len(t)
+    hour = t.hour.to_numpy()
+    doy = t.dayofyear.to_numpy()
+    dow = t.dayofweek.to_numpy()
+    season = np.cos(2 * np.pi * (doy - 15) / 365.25)  # +1 mid-January, -1 mid-July
+
+    if group == "hydro":
+        shape = 1 + 0.25 * season + 0.08 * np.sin(2 * np.pi * (hour - 6) / 24) - 0.05 * (dow >= 5)
+        noise = rng.normal(0, 0.03, n)
+    elif group == "wind":
+        # AR(1) weather noise on a winter-heavy mean
+        ar = lfilter([1.0], [1.0, -0.97], rng.normal(0, 0.15, n))
+        shape = np.clip(1 + 0.3 * season + 0.25 * ar, 0.02, None)
+        noise = 0
+    elif group == "solar":
+        daylight = np.clip(np.sin(np.pi * (hour - 4) / 16), 0, None)
+        shape = daylight * (1 - 0.8 * season)
+        noise = rng.normal(0, 0.05, n) * shape
+    else:
+        shape = 1 + 0.1 * season
+        noise = rng.normal(0, 0.05, n)
+    return np.maximum(shape + noise, 0)
+
+
+def make_production(years: Sequence[int] = (2021,), areas: Sequence[str] = AREAS,
+                    groups: Sequence[str] = GROUPS, seed: int = 0) -> pd.DataFrame:
+    """
+    Hourly production in the stored layout (priceArea, productionGroup, startTime, quantityKwh).
+
+    Parameters:
+        years: Years to cover
+        areas: Price areas
+        groups: Production groups
+        seed: RNG seed
+
+    Returns:
+        pd.DataFrame: len(areas) * len(groups) * hours rows
+    """
+    t = hourly_index(years)
+    rng = np.random.default_rng(seed)
+    parts = []
+    for area in areas:
+        for group in groups:
+            q = _GROUP_BASE[group] * _AREA_SCALE[area] * _profile(group, t, rng)
+            parts.append(pd.DataFrame({
+                "priceArea": area,
+                "productionGroup": group,
+                "startTime": t,
+                "quantityKwh": q,
+            }))
+    return pd.concat(parts, ignore_index=True)
+
+
+def make_raw_elhub(years: Sequence[int] = (2021,), seed: int = 0, duplicate_share: float = 0.02) -> pd.DataFrame:
+    """
+    Production as the Elhub API returns it: '<group> - unspecified' labels,
+    placeholder groups, local-offset timestamps and some duplicated hours.
+    Input for the ingest normalisation benchmarks.
+    """
+    df = make_production(years, seed=seed)
+    rng = np.random.default_rng(seed + 1)
+    df["productionGroup"] = df["productionGroup"] + " - unspecified"
+    placeholder = df.sample(frac=0.01, random_state=seed).assign(productionGroup="*")
+    dups = df.sample(frac=duplicate_share, random_state=seed + 2)
+    df = pd.concat([df, placeholder, dups], ignore_index=True)
+    df["startTime"] = df["startTime"].dt.tz_localize("UTC").dt.tz_convert("Europe/Oslo").astype(str)
+    return df.iloc[rng.permutation(len(df))].reset_index(drop=True)
+
+
+def make_era5(years: Sequence[int] = (2021,), areas: Sequence[str] = AREAS, seed: int = 0) -> Dict[str, pd.DataFrame]:
+    """
+    Hourly ERA5-like weather per area with the columns of lib/open_meteo.HOURLY_VARS.
+
+    Returns:
+        dict: area -> DataFrame(time [UTC], temperature_2m, precipitation,
+              relative_humidity_2m, wind_speed_10m)
+    """
+    t = hourly_index(years, tz="UTC")
+    n = len(t)
+    doy = t.dayofyear.to_numpy()
+    hour = t.hour.to_numpy()
+    out = {}
+    for i, area in enumerate(areas):
+        rng = np.random.default_rng(seed + 100 + i)
+        mean, amp, wet = _AREA_CLIMATE[area]
+        temp = (mean - amp * np.cos(2 * np.pi * (doy - 15) / 365.25)
+                + 2.5 * np.sin(2 * np.pi * (hour - 9) / 24) + rng.normal(0, 2, n))
+        raining = rng.random(n) < wet
+        precip = np.where(raining, rng.gamma(0.6, 1.2, n), 0.0)
+        spikes = rng.choice(n, size=max(1, n // 100), replace=False)
+        precip[spikes] += rng.uniform(3, 10, len(spikes))
+        humidity = np.clip(80 + 10 * raining - 0.8 * (temp - mean) + rng.normal(0, 5, n), 20, 100)
+        wind = np.abs(4 + 2 * np.cos(2 * np.pi * (doy - 15) / 365.25) + rng.normal(0, 2, n))
+        out[area] = pd.DataFrame({
+            "time": t,
+            "temperature_2m": temp,
+            "precipitation": precip,
+            "relative_humidity_2m": humidity,
+            "wind_speed_10m": wind,
+        })
+    return out
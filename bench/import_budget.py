@@ -0,0 +1,153 @@
+"""
+Cold-start import budget for the Streamlit app.
+
+Imports the repo modules that app.py, home.py and the pages import at the
+top (found by parsing those scripts, so new pages and modules are covered
+without editing a list), in a fresh interpreter with `python -X importtime`, after Streamlit, pandas and NumPy
+(which every page pays for anyway). Reports the slowest imports and exits 1
+when
+
+  * a heavy library that must load on first use (statsmodels, sklearn,
+    scipy, plotly.subplots, the Cassandra driver, pymongo) is imported at
+    cold start, or
+  * the app modules together take longer than --budget-ms.
+
+Usage (from the repo root):
+    python -m bench.import_budget
+    python -m bench.import_budget --budget-ms 400 --repeat 5
+"""
+
+import argparse
+import ast
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Entry scripts whose top-level imports make up the cold start
+APP_SCRIPTS = ["app.py", "home.py", "pages/*.py"]
+PRELOADED = ["streamlit", "pandas", "numpy"]
+
+# Top-level packages that must only be imported when first used
+DEFERRED = ["statsmodels", "sklearn", "scipy", "plotly.subplots", "cassandra", "pymongo", "duckdb"]
+
+DEFAULT_BUDGET_MS = 500.0
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def _is_local(module: str) -> bool:
+    path = ROOT.joinpath(*module.split("."))
+    return path.with_suffix(".py").is_file() or (path / "__init__.py").is_file()
+
+
+def _top_level(body):
+    """Statements run at import time: the module body and its if/try/with blocks, not functions."""
+    for node in body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        yield node
+        for field in ("body", "orelse", "finalbody", "handlers"):
+            yield from _top_level(getattr(node, field, []))
+
+
+def app_modules() -> List[str]:
+    """Repo modules imported at the top of APP_SCRIPTS, in first-seen order."""
+    found = {}
+    for pattern in APP_SCRIPTS:
+        for script in sorted(ROOT.glob(pattern)):
+            tree = ast.parse(script.read_text(encoding="utf-8"), filename=str(script))
+            for node in _top_level(tree.body):
+                if isinstance(node, ast.Import):
+                    names = [a.name for a in node.names]
+                elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                    # from lib import health -> lib.health when it is a module
+                    names = [f"{node.module}.{a.name}" if _is_local(f"{node.module}.{a.name}") else node.module
+                             for a in node.names]
+                else:
+                    continue
+                found.update(dict.fromkeys(n for n in names if _is_local(n)))
+    return list(found)
+
+
+def measure() -> Tuple[float, List[Tuple[str, float, float]]]:
+    """
+    One cold import of app_modules().
+
+    Returns:
+        (total ms, [(module, self ms, cumulative ms), ...]) for modules
+        imported after the preloaded libraries
+    """
+    # -X importtime writes to stderr; the marker separates preload from app imports
+    code = "; ".join(["import sys"] + [f"import {m}" for m in PRELOADED]
+                     + ["sys.stderr.write('---\\n')"] + [f"import {m}" for m in app_modules()])
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, env={**os.environ, "PYTHONPATH": str(ROOT)},
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"[ERROR] Import failed:\n{proc.stderr[-2000:]}")
+
+    after = proc.stderr.split("---\n", 1)[-1]
+    rows, total = [], 0.0
+    for line in after.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        self_us, cum_us, indent, name = int(m.group(1)), int(m.group(2)), m.group(3), m.group(4)
+        rows.append((name, self_us / 1000, cum_us / 1000))
+        if len(indent) == 1:
+            total += cum_us / 1000
+    return total, rows
+
+
+def deferred_violations(rows) -> List[str]:
+    names = {name for name, _, _ in rows}
+    return sorted(d for d in DEFERRED if any(n == d or n.startswith(d + ".") for n in names))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the app's cold-start import budget")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="Max cumulative import time of the app modules")
+    parser.add_argument("--repeat", type=int, default=3, help="Cold runs; the fastest is reported")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("COLD-START IMPORT BUDGET")
+    print("=" * 70)
+
+    print(f"\nApp modules ({', '.join(APP_SCRIPTS)}): {', '.join(app_modules())}")
+    runs = [measure() for _ in range(args.repeat)]
+    total, rows = min(runs, key=lambda r: r[0])
+
+    by_self: Dict[str, float] = {}
+    for name, self_ms, _ in rows:
+        by_self[name] = by_self.get(name, 0.0) + self_ms
+    print(f"\nSlowest imports after {', '.join(PRELOADED)} (self time):")
+    for name, ms in sorted(by_self.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    print(f"\nApp modules: {total:.1f} ms (budget {args.budget_ms:.0f} ms, best of {args.repeat})")
+
+    failed = False
+    violations = deferred_violations(rows)
+    if violations:
+        print(f"[ERROR] Imported at cold start, should load on first use: {', '.join(violations)}")
+        failed = True
+    if total > args.budget_ms:
+        print(f"[ERROR] Import budget exceeded by {total - args.budget_ms:.1f} ms")
+        failed = True
+
+    if failed:
+        sys.exit(1)
+    print("[OK] Within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+"""
+Concurrent-session load test for the Streamlit pages.
+
+Runs app.py (the home page, through the router) and pages 02, 03 and 06
+with Streamlit's AppTest in many sessions inside one process, the way a
+Streamlit server runs its visitors' sessions: the scripts share the
+process-wide st.cache_data / st.cache_resource caches and held frames.
+MongoDB and Cassandra are replaced by the frame-backed stand-ins of
+bench/stores.py, seeded with N years of synthetic data
+(bench/generators.py), and ERA5 downloads are answered with synthetic
+weather, so the numbers measure the app rather than the network.
+
+Each session opens one page and reruns it a few times, picking a random
+option of a radio or selectbox before each rerun like a visitor would.
+The report has per-page first-run and rerun latency (p50/p95/p99), peak
+RSS and the per-cache hit rates, evictions and bytes of lib/cache_metrics.py.
+
+AppTest is not a server: every at.run() installs the process-global
+Runtime instance, patches the global config and clears both again when the
+script finishes, so two runs in flight at once would tear down each
+other's runtime. Runs are therefore serialized by one lock. --concurrency
+interleaves that many sessions over the shared caches (their state, cache
+entries and evictions mix as on a server), but the latencies are per-run
+service times, not the contention of scripts executing in parallel; the
+time each run waited for the lock is reported separately as "queued".
+Measuring parallel load needs a real `streamlit run` server and HTTP or
+websocket clients.
+
+A snapshot or lake under data/ would serve reads instead of the stand-ins,
+so both are pointed at an empty directory unless --use-local-data is given.
+
+Usage (from the repo root):
+    python -m bench.load_test --sessions 40 --concurrency 8 --years 3
+    python -m bench.load_test --backend cassandra --pages app 03 --reruns 5
+    python -m bench.load_test --years 5 --rerun-p95-budget 2.0
+"""
+
+import argparse
+import functools
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import pandas as pd  # noqa: E402
+
+from bench.generators import AREAS, make_era5, make_production  # noqa: E402
+from bench.stores import FrameSession, StandInMongoClient  # noqa: E402
+
+PAGES = ["app", "02", "03", "06"]
+BACKENDS = ["mongodb", "cassandra", "routed"]
+
+
+def page_path(page: str) -> str:
+    """'app' -> app.py, '03' -> pages/03_*.py."""
+    if page == "app":
+        return "app.py"
+    matches = sorted((ROOT / "pages").glob(f"{page}_*.py"))
+    if not matches:
+        raise SystemExit(f"[ERROR] No page matches {page!r}")
+    return str(matches[0].relative_to(ROOT))
+
+
+# ---------------- stand-ins ----------------
+def seed_stand_ins(years: List[int]):
+    """
+    MongoDB client and Cassandra session holding the same synthetic production.
+
+    Returns:
+        (StandInMongoClient, FrameSession, int): stand-ins and hourly rows
+    """
+    from lib.cassandra_schema import PRODUCTION_TABLE
+    from lib.rollups import CASSANDRA_DAILY, CASSANDRA_MONTHLY, MONGO_DAILY, MONGO_MONTHLY, rollup_frame
+
+    prod = make_production(years)
+    prod["updatedAt"] = datetime.now(timezone.utc).replace(tzinfo=None)
+    daily, monthly = rollup_frame(prod, "D"), rollup_frame(prod, "M")
+
+    client = StandInMongoClient({
+        "production_2021": prod,
+        MONGO_DAILY: daily.rename(columns={"period": "day"}),
+        MONGO_MONTHLY: monthly.rename(columns={"period": "month"}),
+    })
+
+    t = prod["startTime"]
+    session = FrameSession(
+        tables={
+            PRODUCTION_TABLE: pd.DataFrame({
+                "pricearea": prod["priceArea"], "productiongroup": prod["productionGroup"],
+                "year_month": t.dt.year * 100 + t.dt.month, "starttime": t,
+                "endtime": t + pd.Timedelta(hours=1), "quantitykwh": prod["quantityKwh"],
+            }),
+            CASSANDRA_DAILY: daily.rename(columns={"period": "day"}).rename(columns=str.lower).assign(
+                year=lambda d: d["day"].dt.year),
+            CASSANDRA_MONTHLY: monthly.rename(columns={"period": "month"}).rename(columns=str.lower),
+        },
+        partition_keys={
+            PRODUCTION_TABLE: ("pricearea", "productiongroup", "year_month"),
+            CASSANDRA_DAILY: ("pricearea", "productiongroup", "year"),
+            CASSANDRA_MONTHLY: ("pricearea", "productiongroup"),
+        },
+    )
+    return client, session, len(prod)
+
+
+def install_stand_ins(client, session):
+    """Route the app's client getters and ERA5 downloads to the stand-ins."""
+    import cassandra_client
+    import lib.mongodb_client as mongodb_client
+    import lib.open_meteo as open_meteo
+
+    by_lat = {round(lat, 2): area for area, (_, lat, _) in open_meteo.AREA_CITIES.items()}
+
+    @functools.lru_cache(maxsize=None)
+    def synthetic_era5(area: str, year: int) -> pd.DataFrame:
+        return make_era5([year], areas=[area])[area]
+
+    def fetch_era5(lat, lon, year, hourly_vars=open_meteo.HOURLY_VARS):
+        area = by_lat.get(round(lat, 2), AREAS[-1])
+        return synthetic_era5(area, int(year))[["time", *hourly_vars]].copy()
+
+    mongodb_client.get_mongo_client = lambda: client
+    cassandra_client.get_cassandra_session = lambda: session
+    open_meteo.fetch_era5 = fetch_era5
+
+
+# ---------------- sessions ----------------
+# AppTest.run() sets and clears the global Runtime and config (module docstring)
+_RUN_LOCK = threading.Lock()
+
+
+def _interact(at, rng: random.Random) -> Optional[str]:
+    """Pick a random option of one radio/selectbox, as a visitor would between reruns."""
+    choices = [w for w in list(at.radio) + list(at.selectbox) if len(w.options) > 1]
+    if not choices:
+        return None
+    widget = rng.choice(choices)
+    i = rng.randrange(len(widget.options))
+    if hasattr(widget, "select_index"):
+        widget.select_index(i)
+    else:
+        widget.set_value(widget.options[i])
+    return f"{widget.label or widget.key or type(widget).__name__}={widget.options[i]}"
+
+
+def run_session(page: str, reruns: int, timeout: float, interact: bool, seed: int) -> List[Dict]:
+    """Open a page in a fresh AppTest session and rerun it; one record per run."""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    at = AppTest.from_file(page_path(page), default_timeout=timeout)
+    out = []
+    for i in range(reruns + 1):
+        action = _interact(at, rng) if i and interact else None
+        error = None
+        queued = time.perf_counter()
+        with _RUN_LOCK:
+            t0 = time.perf_counter()
+            try:
+                at.run()
+                if at.exception:
+                    error = at.exception[0].message
+            except Exception as e:  # timeouts and script errors outside the page
+                error = f"{type(e).__name__}: {e}"
+            seconds = time.perf_counter() - t0
+        out.append({
+            "page": page,
+            "kind": "first" if i == 0 else "rerun",
+            "seconds": seconds,
+            "queued_s": t0 - queued,
+            "action": action,
+            "error": error,
+        })
+        if error and i == 0:
+            break
+    return out
+
+
+# ---------------- report ----------------
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB on Linux
+
+
+def _latency(seconds: List[float]) -> Dict:
+    from lib.instrumentation import percentile
+
+    return {
+        "n": len(seconds),
+        **{f"p{q}_s": percentile(seconds, q) for q in (50, 95, 99)},
+        "max_s": max(seconds) if seconds else None,
+    }
+
+
+def summarise(runs: List[Dict]) -> Dict:
+    pages = {}
+    for page in dict.fromkeys(r["page"] for r in runs):
+        mine = [r for r in runs if r["page"] == page]
+        ok = [r for r in mine if not r["error"]]
+        pages[page] = {
+            "path": page_path(page),
+            "first": _latency([r["seconds"] for r in ok if r["kind"] == "first"]),
+            "rerun": _latency([r["seconds"] for r in ok if r["kind"] == "rerun"]),
+            "queued": _latency([r["queued_s"] for r in mine]),
+            "errors": len(mine) - len(ok),
+            "error_samples": sorted({r["error"] for r in mine if r["error"]})[:5],
+        }
+    return pages
+
+
+def cache_hit_rates() -> Dict:
+    """Per-cache counters of every cache layer (lib/cache_metrics.py)."""
+    from lib import cache_metrics
+
+    out, hits, misses = {}, 0, 0
+    for row in cache_metrics.stats():
+        if not row["hits"] + row["misses"]:
+            continue
+        out[row["name"]] = {k: row[k] for k in ("layer", "hits", "misses", "hit_rate", "evictions", "bytes")}
+        hits, misses = hits + row["hits"], misses + row["misses"]
+    out["all"] = {"hits": hits, "misses": misses, "hit_rate": hits / (hits + misses) if hits + misses else None}
+    return out
+
+
+def print_report(report: Dict):
+    fmt = lambda v: f"{v:8.3f}" if v is not None else f"{'-':>8s}"  # noqa: E731
+    print(f"\n{'page':6s} {'runs':>5s} {'err':>4s} {'first p50':>9s} {'rerun p50':>9s} {'p95':>8s} {'p99':>8s}")
+    for page, s in report["pages"].items():
+        print(f"{page:6s} {s['first']['n'] + s['rerun']['n']:5d} {s['errors']:4d} "
+              f"{fmt(s['first']['p50_s']):>9s} {fmt(s['rerun']['p50_s']):>9s} "
+              f"{fmt(s['rerun']['p95_s'])} {fmt(s['rerun']['p99_s'])}")
+
+    print(f"\n{'cache':44s} {'hits':>7s} {'misses':>7s} {'hit rate':>9s} {'evicted':>8s}")
+    for name, c in report["caches"].items():
+        rate = f"{c['hit_rate']:9.1%}" if c["hit_rate"] is not None else f"{'-':>9s}"
+        print(f"{name:44s} {c['hits']:7d} {c['misses']:7d} {rate} {c.get('evictions', 0):8d}")
+
+    rss = report["rss"]
+    if rss["peak_mb"] is not None:
+        print(f"\nPeak RSS {rss['peak_mb']:.0f} MB (after seeding the stand-ins: {rss['seeded_mb']:.0f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the Streamlit pages with concurrent AppTest sessions")
+    parser.add_argument("--sessions", type=int, default=20, help="Sessions to open in total")
+    parser.add_argument("--concurrency", type=int, default=8, help="Sessions interleaved at a time (their runs are serialized, see the module docstring)")
+    parser.add_argument("--reruns", type=int, default=3, help="Reruns per session after the first run")
+    parser.add_argument("--pages", nargs="+", default=PAGES, help="'app' and/or page numbers, e.g. 02 03")
+    parser.add_argument("--backend", choices=BACKENDS, default="mongodb", help="IND320_BACKEND for the pages")
+    parser.add_argument("--years", type=int, default=1, help="Years of synthetic hourly data to seed")
+    parser.add_argument("--start-year", type=int, default=2021)
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds one run may take")
+    parser.add_argument("--static", action="store_true", help="Rerun without changing any widget")
+    parser.add_argument("--use-local-data", action="store_true",
+                        help="Let a snapshot/lake under data/ serve reads as in a deployment")
+    parser.add_argument("--out", default="bench/results/load_latest.json", help="Where to write the JSON report")
+    parser.add_argument("--rerun-p95-budget", type=float,
+                        help="Fail when any page's rerun p95 is above this many seconds")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("IND320 LOAD TEST")
+    print("=" * 70)
+
+    os.chdir(ROOT)  # pages use paths relative to the repo root
+    os.environ["IND320_BACKEND"] = args.backend
+    if not args.use_local_data:
+        empty = tempfile.mkdtemp(prefix="ind320-load-")
+        os.environ["IND320_SNAPSHOT"] = str(Path(empty) / "none.snap")
+        os.environ["IND320_LAKE"] = str(Path(empty) / "lake")
+
+    years = list(range(args.start_year, args.start_year + args.years))
+    print(f"Seeding {len(years)} year(s) of synthetic production into the {args.backend} stand-ins...")
+    client, session, rows = seed_stand_ins(years)
+    install_stand_ins(client, session)
+    seeded_mb = _peak_rss_mb()
+    print(f"  hourly rows: {rows:,}")
+
+    plan = [(args.pages[i % len(args.pages)], i) for i in range(args.sessions)]
+    print(f"Running {args.sessions} session(s), {args.concurrency} at a time, "
+          f"{args.reruns} rerun(s) each on: {', '.join(args.pages)}")
+    runs, lock = [], threading.Lock()
+    t0 = time.perf_counter()
+
+    def one(item):
+        page, i = item
+        result = run_session(page, args.reruns, args.timeout, not args.static, seed=i)
+        with lock:
+            runs.extend(result)
+        status = "[ERROR]" if any(r["error"] for r in result) else "[OK]"
+        print(f"  {status} session {i:3d} {page:4s} {len(result)} run(s), "
+              f"first {result[0]['seconds']:.2f}s")
+
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+        list(pool.map(one, plan))
+    wall = time.perf_counter() - t0
+
+    import streamlit
+
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "backend": args.backend,
+            "years": years,
+            "hourly_rows": rows,
+            "sessions": args.sessions,
+            "concurrency": args.concurrency,
+            "reruns": args.reruns,
+            "interact": not args.static,
+            "wall_s": wall,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "streamlit": streamlit.__version__,
+            "pandas": pd.__version__,
+        },
+        "pages": summarise(runs),
+        "caches": cache_hit_rates(),
+        "rss": {"seeded_mb": seeded_mb, "peak_mb": _peak_rss_mb()},
+    }
+    print_report(report)
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2, default=str))
+    print(f"\n[OK] Report written to {out}")
+
+    errors = sum(p["errors"] for p in report["pages"].values())
+    if errors:
+        print(f"\n[ERROR] {errors} run(s) failed; see error_samples in the report")
+        sys.exit(1)
+    if args.rerun_p95_budget is not None:
+        slow = [p for p, s in report["pages"].items()
+                if s["rerun"]["p95_s"] is not None and s["rerun"]["p95_s"] > args.rerun_p95_budget]
+        if slow:
+            print(f"\n[ERROR] Rerun p95 above {args.rerun_p95_budget:.2f}s on: {', '.join(slow)}")
+            sys.exit(1)
+        print(f"\n[OK] Every page reruns within {args.rerun_p95_budget:.2f}s at p95")
+
+
+if __name__ == "__main__":
+    main()
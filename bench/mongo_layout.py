@@ -0,0 +1,173 @@
+"""
+Benchmark the two MongoDB layouts for production data on a real mongod.
+
+Loads N years of synthetic Elhub production (bench/generators.py) into a
+scratch database twice - as production_2021-style documents (one per hour)
+and as a native time-series collection (lib/mongo_timeseries.py) - and
+times the reads the app makes against each: a full download, a one-month
+range scan of one series, the monthly $dateTrunc aggregation and the
+stats() aggregation of lib/repository.py. Both layouts are read through the
+same flat queries (the time-series one via TimeSeriesCollection), so the
+numbers include the facade. Storage and index sizes come from $collStats.
+
+Needs a MongoDB 7.0+ server; the scratch database is dropped afterwards
+unless --keep is given.
+
+Usage (from the repo root):
+    python -m bench.mongo_layout --years 3
+    python -m bench.mongo_layout --uri mongodb://localhost:27017 --years 5 --repeat 5 --keep
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd  # noqa: E402
+
+from bench.generators import make_production  # noqa: E402
+from bench.run import timeit  # noqa: E402
+
+DATABASE = "ind320_bench"
+LAYOUTS = ("documents", "timeseries")
+
+
+def load(db, prod: pd.DataFrame) -> Dict[str, Dict]:
+    """Load both layouts and return the flat read collection and load report of each."""
+    from lib.elhub_loader import load_to_mongo, load_to_mongo_timeseries
+    from lib.mongo_timeseries import SOURCE_COLLECTION, TS_COLLECTION, TimeSeriesCollection, create_timeseries_collection
+
+    docs = db[SOURCE_COLLECTION]
+    report = load_to_mongo(prod, docs, mode="insert")
+    print(f"  documents   {report['rows']:,} rows in {report['seconds']:.1f}s")
+
+    ts = create_timeseries_collection(db, TS_COLLECTION, drop=True)
+    ts_report = load_to_mongo_timeseries(prod, ts)
+    print(f"  timeseries  {ts_report['rows']:,} rows in {ts_report['seconds']:.1f}s")
+
+    return {
+        "documents": {"collection": docs, "raw": docs, "load_s": report["seconds"]},
+        "timeseries": {"collection": TimeSeriesCollection(ts), "raw": ts, "load_s": ts_report["seconds"]},
+    }
+
+
+def storage(raw) -> Dict:
+    """storageSize, totalIndexSize and count of a collection from $collStats."""
+    stats = next(raw.aggregate([{"$collStats": {"storageStats": {}}}]), {}).get("storageStats", {})
+    return {
+        "storage_bytes": stats.get("storageSize"),
+        "index_bytes": stats.get("totalIndexSize"),
+        "size_bytes": stats.get("size"),
+        "documents": stats.get("count"),
+        # Buckets actually stored for a time-series collection
+        "buckets": stats.get("timeseries", {}).get("bucketCount"),
+    }
+
+
+def queries(coll, area: str, group: str, year: int) -> Dict:
+    """The reads timed per layout, as callables over the flat collection."""
+    projection = {"_id": 0, "priceArea": 1, "productionGroup": 1, "startTime": 1, "quantityKwh": 1}
+    month = {"$gte": datetime(year, 3, 1), "$lt": datetime(year, 4, 1)}
+    year_range = {"$gte": datetime(year, 1, 1), "$lt": datetime(year + 1, 1, 1)}
+    return {
+        "full_scan": lambda: list(coll.find({}, projection)),
+        "range_scan.series_month": lambda: list(coll.find(
+            {"priceArea": area, "productionGroup": group, "startTime": month}, projection)),
+        "monthly_aggregation": lambda: list(coll.aggregate([
+            {"$match": {"startTime": year_range}},
+            {"$group": {
+                "_id": {"a": "$priceArea", "g": "$productionGroup",
+                        "m": {"$dateTrunc": {"date": "$startTime", "unit": "month"}}},
+                "kwh": {"$sum": "$quantityKwh"},
+            }},
+        ])),
+        "stats.area": lambda: list(coll.aggregate([
+            {"$match": {"priceArea": area}},
+            {"$group": {"_id": None, "rows": {"$sum": 1}, "first": {"$min": "$startTime"},
+                        "last": {"$max": "$startTime"}, "total_kwh": {"$sum": "$quantityKwh"}}},
+        ])),
+    }
+
+
+def run(uri: str, years: List[int], repeat: int, keep: bool) -> Dict:
+    from pymongo import MongoClient
+
+    client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+    server = client.server_info()["version"]
+    client.drop_database(DATABASE)
+    db = client[DATABASE]
+
+    prod = make_production(years)
+    area, group = prod["priceArea"].iloc[0], prod["productionGroup"].iloc[0]
+    print(f"Loading {len(prod):,} synthetic rows into {DATABASE} (MongoDB {server})...")
+    layouts = load(db, prod)
+
+    report = {"server": server, "rows": len(prod), "layouts": {}}
+    for layout in LAYOUTS:
+        entry = layouts[layout]
+        print(f"\n{layout}")
+        stages = {}
+        for name, fn in queries(entry["collection"], area, group, years[0]).items():
+            print(f"  {name} ...", end=" ", flush=True)
+            stages[name] = timeit(fn, repeat)
+            print(f"{stages[name]['median_s']:.3f}s")
+        report["layouts"][layout] = {"load_s": entry["load_s"], "stages": stages, "storage": storage(entry["raw"])}
+
+    if not keep:
+        client.drop_database(DATABASE)
+    client.close()
+    return report
+
+
+def print_report(report: Dict):
+    docs, ts = (report["layouts"][k] for k in LAYOUTS)
+    print(f"\n{'stage':28s} {'documents':>10s} {'timeseries':>10s} {'speedup':>8s}")
+    for name, cur in docs["stages"].items():
+        other = ts["stages"][name]
+        print(f"{name:28s} {cur['median_s']:10.3f} {other['median_s']:10.3f} "
+              f"{cur['median_s'] / other['median_s']:7.1f}x")
+    for key in ("storage_bytes", "index_bytes"):
+        a, b = docs["storage"][key], ts["storage"][key]
+        if a and b:
+            print(f"{key:28s} {a / 1e6:9.1f}M {b / 1e6:9.1f}M {a / b:7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the document and time-series MongoDB layouts")
+    parser.add_argument("--uri", default=os.environ.get("MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--years", type=int, default=1, help="Years of hourly data to generate")
+    parser.add_argument("--start-year", type=int, default=2021)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per query")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch database for inspection")
+    parser.add_argument("--out", default="bench/results/mongo_layout.json", help="Where to write the JSON report")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("IND320 MONGODB LAYOUT BENCHMARK")
+    print("=" * 70)
+
+    years = list(range(args.start_year, args.start_year + args.years))
+    report = run(args.uri, years, args.repeat, args.keep)
+    report["meta"] = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "years": years,
+        "repeat": args.repeat,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+    print_report(report)
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2, default=str))
+    print(f"\n[OK] Report written to {out}")
+
+
+if __name__ == "__main__":
+    main()
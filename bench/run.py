@@ -0,0 +1,193 @@
+"""
+Benchmark runner for the ingest and analysis hot paths.
+
+Generates N years of synthetic Elhub production and ERA5 weather
+(bench/generators.py), times each stage a few times (min and median wall
+time) and writes a JSON report. With --baseline the run is compared with an
+earlier report and exits 1 when any stage is slower than the baseline by more
+than --tolerance, so it can guard a change locally or in CI.
+
+Usage (from the repo root):
+    python -m bench.run --years 3
+    python -m bench.run --years 3 --out bench/results/latest.json
+    python -m bench.run --years 3 --baseline bench/results/baseline.json --tolerance 0.25
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from bench.generators import make_era5, make_production, make_raw_elhub  # noqa: E402
+from bench.stores import InMemoryCollection, InMemorySession  # noqa: E402
+
+
+def timeit(fn: Callable, repeat: int, setup: Callable = None) -> Dict:
+    """Run fn() `repeat` times (after an optional fresh setup() each time)."""
+    walls = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        t0 = time.perf_counter()
+        fn(arg) if setup else fn()
+        walls.append(time.perf_counter() - t0)
+    return {"min_s": min(walls), "median_s": statistics.median(walls), "repeat": repeat}
+
+
+def run(years: List[int], repeat: int) -> Dict:
+    from lib.elhub_loader import load_to_cassandra, load_to_mongo, prepare_production_frame
+    from lib.repository import FrameRepository
+    from notebooks.utils_analysis import (
+        FAST_STL_CHECKED_PARAMS, FAST_STL_MAX_ERROR, _ensure_stl_params, _series, fast_stl, lof_anomalies, spc_outliers, spectrogram_production_plot,
+        stl_approximation_error, stl_production_plot,
+    )
+
+    print(f"Generating {len(years)} year(s) of synthetic data...")
+    raw = make_raw_elhub(years)
+    prod = make_production(years)
+    era5 = make_era5(years)
+    print(f"  raw Elhub rows: {len(raw):,}  production rows: {len(prod):,}  ERA5 hours/area: {len(era5['NO1']):,}")
+
+    stages = {}
+
+    def stage(name, fn, setup=None, n=repeat):
+        print(f"  {name} ...", end=" ", flush=True)
+        stages[name] = timeit(fn, n, setup)
+        print(f"{stages[name]['median_s']:.3f}s")
+
+    print("\nIngest")
+    stage("prepare_production_frame", lambda: prepare_production_frame(raw))
+
+    prepared = prepare_production_frame(raw)
+    stages["prepare_production_frame"]["rows"] = len(prepared)
+    stage("load_to_mongo.insert", lambda c: load_to_mongo(prepared, c, mode="insert"), setup=InMemoryCollection)
+
+    def loaded_collection():
+        c = InMemoryCollection()
+        load_to_mongo(prepared, c, mode="insert")
+        return c
+    stage("load_to_mongo.upsert", lambda c: load_to_mongo(prepared, c, mode="upsert"), setup=loaded_collection)
+
+    try:
+        import cassandra  # noqa: F401
+        stage("load_to_cassandra", lambda s: load_to_cassandra(prepared, s, "elhub_production_by_month"),
+              setup=InMemorySession)
+    except ImportError:
+        print("  [SKIP] load_to_cassandra (cassandra-driver not installed)")
+
+    print("\nQuery")
+    repo = FrameRepository(prod, name="bench")
+    month_start = pd.Timestamp(f"{years[-1]}-06-01")
+    stage("repository.query.hour_month",
+          lambda: repo.query("NO5", ["hydro", "wind"], month_start, month_start + pd.DateOffset(months=1)))
+    stage("repository.query.month_all", lambda: repo.query(resolution="month"))
+
+    print("\nAnalysis")
+    stage("_series", lambda: _series(prod, "NO5", "hydro"))
+    stage("stl_production_plot", lambda: stl_production_plot(prod, "NO5", "hydro"), n=max(1, repeat // 2))
+    stage("stl_production_plot.fast", lambda: stl_production_plot(prod, "NO5", "hydro", mode="fast"))
+
+    # Accuracy of the fast mode against exact STL at the smoothers the page
+    # actually fits (its defaults after the same clamping), worst case kept
+    from statsmodels.tsa.seasonal import STL
+    ts = _series(prod, "NO5", "hydro")
+    errors = {}
+    for period, seasonal, trend in FAST_STL_CHECKED_PARAMS:
+        period, seasonal, trend = _ensure_stl_params(len(ts.dropna()), period, seasonal, trend)
+        exact = STL(ts, period=period, seasonal=seasonal, trend=trend, robust=True).fit()
+        fast = fast_stl(ts, periods=(24, period), seasonal=seasonal, trend=trend)
+        errors[f"period={period},seasonal={seasonal},trend={trend}"] = stl_approximation_error(ts, fast, exact)
+    error = max(errors.values())
+    stages["stl_production_plot.fast"]["rel_error"] = error
+    stages["stl_production_plot.fast"]["rel_error_by_params"] = errors
+    for params, e in errors.items():
+        print(f"  fast STL relative error {e:.3f} at {params} (bound {FAST_STL_MAX_ERROR})")
+    stage("spectrogram_production_plot", lambda: spectrogram_production_plot(prod, "NO5", "wind"))
+    temp = era5["NO5"]["temperature_2m"].to_numpy()
+    precip = era5["NO5"]["precipitation"].to_numpy()
+    stage("spc_outliers", lambda: spc_outliers(temp))
+    stage("lof_anomalies", lambda: lof_anomalies(precip), n=max(1, repeat // 2))
+
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "years": years,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "rows": {"raw": len(raw), "production": len(prod), "era5_per_area": len(era5["NO1"])},
+        },
+        "stages": stages,
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Names of stages whose median is slower than baseline * (1 + tolerance)."""
+    regressions = []
+    print(f"\n{'stage':34s} {'baseline':>10s} {'current':>10s} {'change':>8s}")
+    for name, cur in current["stages"].items():
+        base = baseline.get("stages", {}).get(name)
+        if not base:
+            print(f"{name:34s} {'-':>10s} {cur['median_s']:10.3f} {'new':>8s}")
+            continue
+        change = cur["median_s"] / base["median_s"] - 1 if base["median_s"] else 0.0
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  [REGRESSION]"
+        print(f"{name:34s} {base['median_s']:10.3f} {cur['median_s']:10.3f} {change:+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingest and analysis on synthetic data")
+    parser.add_argument("--years", type=int, default=1, help="Years of hourly data to generate")
+    parser.add_argument("--start-year", type=int, default=2021)
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per stage")
+    parser.add_argument("--out", default="bench/results/latest.json", help="Where to write the JSON report")
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown vs baseline before failing (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("IND320 BENCHMARK")
+    print("=" * 70)
+
+    years = list(range(args.start_year, args.start_year + args.years))
+    report = run(years, args.repeat)
+    from notebooks.utils_analysis import FAST_STL_MAX_ERROR
+    fast_error = report["stages"].get("stl_production_plot.fast", {}).get("rel_error", 0.0)
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"\n[OK] Report written to {out}")
+
+    if fast_error > FAST_STL_MAX_ERROR:
+        print(f"\n[ERROR] Fast STL error {fast_error:.3f} exceeds its documented bound {FAST_STL_MAX_ERROR}")
+        sys.exit(1)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"\n[ERROR] {len(regressions)} stage(s) regressed beyond {args.tolerance:.0%}: "
+                  + ", ".join(regressions))
+            sys.exit(1)
+        print("\n[OK] No regressions")
+
+
+if __name__ == "__main__":
+    main()
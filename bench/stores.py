@@ -0,0 +1,325 @@
+"""
+In-process stand-ins for MongoDB and Cassandra.
+
+Just enough of the pymongo Collection and cassandra-driver Session APIs
+for lib/elhub_loader.py to run against, so loader benchmarks (and the load
+test harness) measure our own code rather than network round trips.
+
+The write side (InMemoryCollection, InMemorySession) stores or counts what
+the loaders send. The read side (StandInMongoClient, FrameSession) answers
+the queries of lib/repository.py, lib/data_version.py and lib/health.py
+from DataFrames, so the pages can run against them (bench/load_test.py).
+"""
+
+import re
+from types import SimpleNamespace
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+# ---------------- MongoDB ----------------
+class InMemoryCollection:
+    """Dict-backed stand-in for a pymongo Collection keyed on a unique index."""
+
+    def __init__(self, name: str = "production_2021", database: str = "ind320"):
+        self.name = name
+        self.full_name = f"{database}.{name}"
+        self.docs = {}
+        self.key = None
+
+    def create_index(self, keys, unique=False, name=None):
+        if unique:
+            self.key = tuple(k for k, _ in keys)
+        return name
+
+    def estimated_document_count(self):
+        return len(self.docs)
+
+    count_documents = lambda self, _filter: len(self.docs)  # noqa: E731
+
+    def _key(self, doc):
+        return tuple(doc[k] for k in self.key) if self.key else id(doc)
+
+    def insert_many(self, docs, ordered=True):
+        from pymongo.errors import BulkWriteError
+
+        inserted, errors = [], []
+        for i, d in enumerate(docs):
+            k = self._key(d)
+            if k in self.docs:
+                errors.append({"index": i, "code": 11000})
+                if ordered:
+                    break
+                continue
+            self.docs[k] = dict(d)
+            inserted.append(k)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(inserted)})
+        return SimpleNamespace(inserted_ids=inserted)
+
+    def bulk_write(self, ops, ordered=True):
+        upserted = modified = 0
+        for op in ops:
+            k = self._key(op._filter)
+            if k in self.docs:
+                self.docs[k].update(op._doc["$set"])
+                modified += 1
+            elif op._upsert:
+                self.docs[k] = {**op._filter, **op._doc["$set"]}
+                upserted += 1
+        return SimpleNamespace(upserted_count=upserted, modified_count=modified)
+
+    def update_many(self, _filter, _update):
+        return SimpleNamespace(modified_count=0)
+
+    def find(self, _filter=None, projection=None):
+        return iter(list(self.docs.values()))
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(list(self.docs.values()))
+
+
+# ---------------- Cassandra ----------------
+class _DoneFuture:
+    """Already-completed ResponseFuture: callbacks fire immediately."""
+
+    has_more_pages = False
+    _col_names = None
+    _col_types = None
+    _continuous_paging_session = None
+
+    def __init__(self, result):
+        self._result = result
+
+    def add_callbacks(self, callback, errback, callback_args=(), callback_kwargs=None,
+                      errback_args=(), errback_kwargs=None):
+        callback(self._result, *callback_args, **(callback_kwargs or {}))
+
+    def clear_callbacks(self):
+        pass
+
+    def result(self):
+        return self._result
+
+
+class _Statement:
+    """Prepared-statement stand-in; '?' markers become '%s' so BatchStatement can bind it."""
+
+    def __init__(self, query: str):
+        self.query_string = re.sub(r"\?", "%s", query)
+        self.keyspace = None
+        self.routing_key = None
+        self.is_idempotent = True
+        self.custom_payload = None
+
+    def bind(self, values):
+        return self
+
+
+class InMemorySession:
+    """Counts rows written through execute_async/execute_concurrent."""
+
+    def __init__(self, keyspace: str = "ind320", partition_key=("pricearea", "productiongroup", "year_month"),
+                 columns=("pricearea", "productiongroup", "year_month", "starttime", "endtime", "quantitykwh")):
+        self.keyspace = keyspace
+        self.rows_written = 0
+        self.statements = 0
+        table = SimpleNamespace(
+            partition_key=[SimpleNamespace(name=c) for c in partition_key],
+            columns={c: None for c in columns},
+        )
+        tables = _AnyTable(table)
+        self.cluster = SimpleNamespace(
+            metadata=SimpleNamespace(keyspaces={keyspace: SimpleNamespace(tables=tables)})
+        )
+
+    def prepare(self, query):
+        return _Statement(query)
+
+    def execute_async(self, statement, parameters=None, timeout=None, execution_profile=None, **kwargs):
+        n = len(getattr(statement, "_statements_and_parameters", [None]))
+        self.rows_written += n
+        self.statements += 1
+        return _DoneFuture([])
+
+    def execute(self, statement, parameters=None, **kwargs):
+        return self.execute_async(statement, parameters).result()
+
+
+class _AnyTable(dict):
+    """Metadata mapping that reports the same layout for every table name."""
+
+    def __init__(self, table):
+        super().__init__()
+        self._table = table
+
+    def __getitem__(self, _name):
+        return self._table
+
+    def __contains__(self, _name):
+        return True
+
+
+# ---------------- read side ----------------
+def _mask(df: pd.DataFrame, filter_: Optional[dict]) -> np.ndarray:
+    """Boolean mask of a pymongo filter: equality, $in and $gt/$gte/$lt/$lte."""
+    mask = np.ones(len(df), dtype=bool)
+    for field, cond in (filter_ or {}).items():
+        if field not in df.columns:
+            return np.zeros(len(df), dtype=bool)
+        col = df[field]
+        if not isinstance(cond, dict):
+            mask &= (col == cond).to_numpy()
+            continue
+        for op, value in cond.items():
+            if op == "$in":
+                mask &= col.isin(list(value)).to_numpy()
+            elif op in ("$gt", "$gte", "$lt", "$lte"):
+                if pd.api.types.is_datetime64_any_dtype(col):
+                    value = pd.Timestamp(value)
+                mask &= {"$gt": col > value, "$gte": col >= value,
+                         "$lt": col < value, "$lte": col <= value}[op].to_numpy()
+            else:
+                raise NotImplementedError(f"filter operator {op}")
+    return mask
+
+
+class FrameCollection:
+    """Read-only pymongo Collection stand-in over a DataFrame (one row per document)."""
+
+    def __init__(self, df: Optional[pd.DataFrame] = None, name: str = "production_2021"):
+        self.df = df if df is not None else pd.DataFrame()
+        self.name = name
+
+    def _select(self, filter_=None, projection=None) -> pd.DataFrame:
+        df = self.df[_mask(self.df, filter_)] if filter_ else self.df
+        if projection:
+            df = df[[c for c, on in projection.items() if on and c in df.columns]]
+        return df
+
+    def find(self, filter_=None, projection=None):
+        return iter(self._select(filter_, projection).to_dict("records"))
+
+    def find_one(self, filter_=None, projection=None):
+        return next(self.find(filter_, projection), None)
+
+    def distinct(self, field, filter_=None):
+        df = self._select(filter_)
+        return df[field].dropna().unique().tolist() if field in df.columns else []
+
+    def estimated_document_count(self):
+        return len(self.df)
+
+    def count_documents(self, filter_=None):
+        return int(_mask(self.df, filter_).sum())
+
+    def aggregate(self, pipeline):
+        """$match followed by a single-group $group ({_id: None}), as used by the stats reads."""
+        df = self.df
+        for stage in pipeline:
+            (op, spec), = stage.items()
+            if op == "$match":
+                df = df[_mask(df, spec)]
+            elif op == "$group" and spec.get("_id") is None:
+                if df.empty:
+                    return iter([])
+                out = {"_id": None}
+                for name, acc in spec.items():
+                    if name == "_id":
+                        continue
+                    (fn, arg), = acc.items()
+                    values = df[arg.lstrip("$")] if isinstance(arg, str) else None
+                    out[name] = (len(df) if values is None and fn == "$sum"
+                                 else {"$sum": values.sum, "$min": values.min, "$max": values.max}[fn]())
+                return iter([out])
+            else:
+                raise NotImplementedError(f"aggregation stage {op}")
+        return iter(df.to_dict("records"))
+
+
+class _FrameDatabase(dict):
+    def __missing__(self, name):
+        return self.setdefault(name, FrameCollection(name=name))
+
+    def list_collection_names(self):
+        return list(self)
+
+
+class StandInMongoClient:
+    """MongoClient stand-in: client[db][collection] -> FrameCollection."""
+
+    def __init__(self, collections: Dict[str, pd.DataFrame], database: str = "ind320"):
+        self._dbs = {database: _FrameDatabase({n: FrameCollection(df, n) for n, df in collections.items()})}
+        self.admin = SimpleNamespace(command=lambda *_a, **_k: {"ok": 1.0})
+
+    def __getitem__(self, name):
+        return self._dbs.setdefault(name, _FrameDatabase())
+
+    def server_info(self):
+        return {"version": "stand-in"}
+
+
+class _Rows(list):
+    def one(self):
+        return self[0] if self else None
+
+
+_SELECT = re.compile(r"SELECT\s+(DISTINCT\s+)?(?P<cols>.+?)\s+FROM\s+(?P<table>\w+)(?:\s+WHERE\s+(?P<where>.+?))?\s*$",
+                     re.IGNORECASE | re.DOTALL)
+_COND = re.compile(r"(\w+)\s*(>=|<=|=|>|<)\s*(?:\?|%s)")
+
+
+class FrameSession(InMemorySession):
+    """
+    Cassandra Session stand-in that answers SELECTs from DataFrames.
+
+    Each table is a frame with lower-case column names, split up front by
+    its partition key, so a single-partition slice read is a dictionary
+    lookup plus a range filter - the access pattern the real tables have.
+    Anything that is not a SELECT is counted like InMemorySession does.
+    """
+
+    def __init__(self, tables: Dict[str, pd.DataFrame], partition_keys: Dict[str, Sequence[str]],
+                 keyspace: str = "ind320"):
+        super().__init__(keyspace)
+        self.tables = tables
+        self.partition_keys = {t: tuple(k) for t, k in partition_keys.items()}
+        self._partitions = {
+            t: {k if isinstance(k, tuple) else (k,): part for k, part in df.groupby(list(self.partition_keys[t]),
+                                                                                     sort=False)}
+            for t, df in tables.items() if t in self.partition_keys
+        }
+
+    def _select(self, query: str, params) -> _Rows:
+        m = _SELECT.match(query.strip())
+        table, cols = m.group("table"), [c.strip().lower() for c in m.group("cols").split(",")]
+        df = self.tables.get(table)
+        if df is None:
+            return _Rows()
+        conds = [(c.lower(), op, v) for (c, op), v in zip(_COND.findall(m.group("where") or ""), params or ())]
+
+        key = self.partition_keys.get(table, ())
+        if m.group(1) and not conds and tuple(cols) == key:
+            return _Rows(self._partitions[table])
+        eq = {c: v for c, op, v in conds if op == "="}
+        if key and all(k in eq for k in key):
+            df = self._partitions[table].get(tuple(eq[k] for k in key), df.iloc[0:0])
+            conds = [cond for cond in conds if cond[0] not in key]
+        for c, op, v in conds:
+            if pd.api.types.is_datetime64_any_dtype(df[c]):
+                v = pd.Timestamp(v)
+            df = df[{"=": df[c] == v, ">=": df[c] >= v, "<=": df[c] <= v, ">": df[c] > v, "<": df[c] < v}[op]]
+        if m.group(1):
+            df = df[cols].drop_duplicates()
+        return _Rows(df[cols].itertuples(index=False, name=None))
+
+    def execute_async(self, statement, parameters=None, timeout=None, execution_profile=None, **kwargs):
+        query = getattr(statement, "query_string", statement)
+        if isinstance(query, str) and query.lstrip().upper().startswith("SELECT"):
+            return _DoneFuture(self._select(query, parameters))
+        return super().execute_async(statement, parameters, timeout, execution_profile, **kwargs)
+
+    def execute(self, statement, parameters=None, **kwargs):
+        return _Rows(self.execute_async(statement, parameters).result())
@@ -4,23 +4,54 @@ IND320 Assessment 4
 
 This module provides a clean interface for accessing energy data from Cassandra.
 Compatible with the existing Streamlit pages (can replace MongoDB calls).
+
+Reads go to the time-bucketed tables from lib/cassandra_schema.py
+(partitioned by priceArea, group and year_month), so range queries are
+single-partition slice reads. Run scripts/migrate_cassandra_schema.py once
+to copy the legacy elhub_* tables across.
+
+The session connects to every node of the docker-compose cluster with
+token-aware routing, speculative execution for reads and per-request
+timeouts (lib/cassandra_cluster.py; override with the [cassandra] table of
+secrets.toml or IND320_CASSANDRA_* variables). Reads are marked idempotent
+so the driver may speculate on them, and request latencies are recorded
+for pages/08_Diagnostics.py.
 """
 
 import streamlit as st
-from cassandra.cluster import Cluster
-from cassandra.auth import PlainTextAuthProvider
-from cassandra.query import SimpleStatement
 import pandas as pd
 from datetime import datetime
 from typing import Optional, List, Dict
 
+from lib.cassandra_cluster import build_cluster, cluster_settings, host_states, idempotent, record_latencies
+from lib.cassandra_schema import GROUP_COLUMN, PRODUCTION_TABLE, bucketed_table, read_slices
+from lib.data_version import Uncached, versioned_cache
+from lib.instrumentation import instrumented
+from lib.rollups import CASSANDRA_MONTHLY
+
 
-# Cassandra Configuration
-CASSANDRA_HOSTS = ['127.0.0.1']
-CASSANDRA_PORT = 9042
+# Cassandra Configuration (contact points, policies and timeouts: lib/cassandra_cluster.py)
 KEYSPACE = 'ind320'
 
 
+def _table_of(collection_name: str, *args, **kwargs) -> str:
+    # Data version key of a read: the bucketed table it is served from
+    return bucketed_table(collection_name)
+
+
+def _by_table(**cache_kwargs):
+    return versioned_cache("cassandra", _table_of, **cache_kwargs)
+
+
+def get_cluster_settings() -> dict:
+    """Cluster profile from the defaults, secrets.toml [cassandra] and IND320_CASSANDRA_* variables."""
+    try:
+        secrets = dict(st.secrets.get("cassandra", {}))
+    except Exception:
+        secrets = {}
+    return cluster_settings(secrets)
+
+
 @st.cache_resource
 def get_cassandra_session():
     """
@@ -29,10 +60,11 @@ def get_cassandra_session():
     Returns:
         session: Cassandra session object or None if connection fails
     """
+    # The driver is imported on first connect, not when a page imports this module
     try:
-        cluster = Cluster(CASSANDRA_HOSTS, port=CASSANDRA_PORT)
+        cluster = build_cluster(get_cluster_settings())
         session = cluster.connect(KEYSPACE)
-        return session
+        return record_latencies(session)
     except Exception as e:
         st.error(f"Failed to connect to Cassandra: {e}")
         return None
@@ -48,13 +80,14 @@ def check_connection():
     try:
         session = get_cassandra_session()
         if session:
-            result = session.execute("SELECT release_version FROM system.local")
+            result = session.execute(idempotent("SELECT release_version FROM system.local"))
             version = result.one()[0]
             return {
                 'status': 'connected',
                 'version': version,
                 'keyspace': KEYSPACE,
-                'hosts': CASSANDRA_HOSTS
+                'hosts': get_cluster_settings()['hosts'].split(','),
+                'nodes': host_states(session)
             }
         else:
             return {'status': 'disconnected', 'error': 'Failed to create session'}
@@ -62,7 +95,7 @@ def check_connection():
         return {'status': 'error', 'error': str(e)}
 
 
-@st.cache_data(ttl=3600)
+@versioned_cache("cassandra", lambda table_name: table_name)
 def get_collection_count(table_name: str) -> int:
     """
     Get the total number of records in a table.
@@ -73,22 +106,79 @@ def get_collection_count(table_name: str) -> int:
     Returns:
         int: Record count
     """
-    try:
-        session = get_cassandra_session()
-        if not session:
-            return 0
+    session = get_cassandra_session()
+    if not session:
+        raise Uncached(0)
 
+    try:
         # Note: COUNT(*) can be slow in Cassandra, use sparingly
         query = f"SELECT COUNT(*) FROM {table_name}"
-        result = session.execute(query)
+        result = session.execute(idempotent(query))
         count = result.one()[0]
         return count
     except Exception as e:
         st.warning(f"Could not count records in {table_name}: {e}")
-        return 0
+        raise Uncached(0)
+
+
+@instrumented("cassandra.get_partitions", cache=_by_table())
+def get_partitions(collection_name: str) -> List[tuple]:
+    """
+    Get the (priceArea, group) series stored in a bucketed table.
+
+    SELECT DISTINCT on the full partition key only reads partition headers,
+    so this is cheap even for multi-year tables.
+
+    Parameters:
+        collection_name: Legacy or bucketed table name
+
+    Returns:
+        List[tuple]: Sorted (priceArea, group) pairs
+    """
+    table = bucketed_table(collection_name)
+    session = get_cassandra_session()
+    if not session:
+        raise Uncached([])
+
+    group_col = GROUP_COLUMN[table]
+    result = session.execute(idempotent(f"SELECT DISTINCT pricearea, {group_col}, year_month FROM {table}"))
+    return sorted({(row[0], row[1]) for row in result})
+
+
+def _fetch_bucketed(
+    collection_name: str,
+    start_date: datetime,
+    end_date: datetime,
+    price_area: Optional[str],
+    group: Optional[str],
+) -> pd.DataFrame:
+    """Read [start_date, end_date] as single-partition slices of the bucketed table."""
+    table = bucketed_table(collection_name)
+    session = get_cassandra_session()
+    if not session:
+        raise ConnectionError("Cassandra is not connected")
+
+    if price_area and group:
+        partitions = [(price_area, group)]
+    else:
+        partitions = [
+            (a, g) for a, g in get_partitions(table)
+            if (price_area is None or a == price_area) and (group is None or g == group)
+        ]
+
+    rows = read_slices(session, table, partitions, start_date, end_date)
+    df = pd.DataFrame(rows)
+
+    if not df.empty:
+        # Convert timestamp columns
+        df['startTime'] = pd.to_datetime(df['starttime'])
+        df['endTime'] = pd.to_datetime(df['endtime'])
+        df.drop(['starttime', 'endtime', 'year_month'], axis=1, inplace=True)
 
+    return df
 
-@st.cache_data(ttl=3600)
+
+@instrumented("cassandra.fetch_consumption_data", cache=_by_table())
 def fetch_consumption_data(
     collection_name: str,
     start_date: datetime,
@@ -99,6 +189,9 @@ def fetch_consumption_data(
     """
     Fetch consumption data from Cassandra.
 
+    Reads the time-bucketed elhub_consumption_by_month table: one slice read
+    per (area, group, month) partition, no ALLOW FILTERING.
+
     Parameters:
         collection_name: Table name (elhub_consumption_2021 or elhub_consumption_2022_2024)
         start_date: Start datetime
@@ -110,48 +203,14 @@ def fetch_consumption_data(
         pd.DataFrame: Consumption data
     """
     try:
-        session = get_cassandra_session()
-        if not session:
-            return pd.DataFrame()
-
-        # Build query based on filters
-        if price_area and consumption_group:
-            query = f"""
-                SELECT * FROM {collection_name}
-                WHERE priceArea = %s
-                AND consumptionGroup = %s
-                AND startTime >= %s
-                AND startTime <= %s
-                ALLOW FILTERING
-            """
-            params = (price_area, consumption_group, start_date, end_date)
-        else:
-            query = f"""
-                SELECT * FROM {collection_name}
-                WHERE startTime >= %s
-                AND startTime <= %s
-                ALLOW FILTERING
-            """
-            params = (start_date, end_date)
-
-        result = session.execute(query, params)
-        df = pd.DataFrame(list(result))
-
-        if not df.empty:
-            # Convert timestamp columns
-            if 'starttime' in df.columns:
-                df['startTime'] = pd.to_datetime(df['starttime'])
-                df['endTime'] = pd.to_datetime(df['endtime'])
-                df.drop(['starttime', 'endtime'], axis=1, inplace=True)
-
-        return df
+        return _fetch_bucketed(collection_name, start_date, end_date, price_area, consumption_group)
 
     except Exception as e:
         st.warning(f"Error fetching consumption data: {e}")
-        return pd.DataFrame()
+        raise Uncached(pd.DataFrame())
 
 
-@st.cache_data(ttl=3600)
+@instrumented("cassandra.fetch_production_data", cache=_by_table())
 def fetch_production_data(
     collection_name: str,
     start_date: datetime,
@@ -162,6 +221,9 @@ def fetch_production_data(
     """
     Fetch production data from Cassandra.
 
+    Reads the time-bucketed elhub_production_by_month table: one slice read
+    per (area, group, month) partition, no ALLOW FILTERING.
+
     Parameters:
         collection_name: Table name (elhub_production_2022_2024)
         start_date: Start datetime
@@ -173,48 +235,14 @@ def fetch_production_data(
         pd.DataFrame: Production data
     """
     try:
-        session = get_cassandra_session()
-        if not session:
-            return pd.DataFrame()
-
-        # Build query based on filters
-        if price_area and production_group:
-            query = f"""
-                SELECT * FROM {collection_name}
-                WHERE priceArea = %s
-                AND productionGroup = %s
-                AND startTime >= %s
-                AND startTime <= %s
-                ALLOW FILTERING
-            """
-            params = (price_area, production_group, start_date, end_date)
-        else:
-            query = f"""
-                SELECT * FROM {collection_name}
-                WHERE startTime >= %s
-                AND startTime <= %s
-                ALLOW FILTERING
-            """
-            params = (start_date, end_date)
-
-        result = session.execute(query, params)
-        df = pd.DataFrame(list(result))
-
-        if not df.empty:
-            # Convert timestamp columns
-            if 'starttime' in df.columns:
-                df['startTime'] = pd.to_datetime(df['starttime'])
-                df['endTime'] = pd.to_datetime(df['endtime'])
-                df.drop(['starttime', 'endtime'], axis=1, inplace=True)
-
-        return df
+        return _fetch_bucketed(collection_name, start_date, end_date, price_area, production_group)
 
     except Exception as e:
         st.warning(f"Error fetching production data: {e}")
-        return pd.DataFrame()
+        raise Uncached(pd.DataFrame())
 
 
-@st.cache_data(ttl=3600)
+@_by_table()
 def get_available_groups(collection_name: str, group_type: str = 'consumption') -> List[str]:
     """
     Get list of available consumption or production groups.
@@ -227,28 +255,21 @@ def get_available_groups(collection_name: str, group_type: str = 'consumption')
         List[str]: Available groups
     """
     try:
-        session = get_cassandra_session()
-        if not session:
-            return []
-
-        column_name = 'consumptionGroup' if group_type == 'consumption' else 'productionGroup'
-
-        query = f"SELECT DISTINCT {column_name} FROM {collection_name}"
-        result = session.execute(query)
-
-        groups = [row[0] for row in result if row[0]]
+        groups = {g for _, g in get_partitions(collection_name) if g}
+        if not groups:
+            raise ValueError(f"no partitions in {bucketed_table(collection_name)}")
         return sorted(groups)
 
     except Exception as e:
         st.warning(f"Error fetching groups: {e}")
-        # Return default values as fallback
+        # Return default values as fallback (not cached, the next rerun retries)
         if group_type == 'consumption':
-            return ['Residential', 'Commercial', 'Industrial', 'Other']
+            raise Uncached(['Residential', 'Commercial', 'Industrial', 'Other'])
         else:
-            return ['Hydro', 'Wind', 'Thermal', 'Solar']
+            raise Uncached(['Hydro', 'Wind', 'Thermal', 'Solar'])
 
 
-@st.cache_data(ttl=3600)
+@_by_table()
 def get_available_price_areas(collection_name: str) -> List[str]:
     """
     Get list of available price areas.
@@ -260,25 +281,55 @@ def get_available_price_areas(collection_name: str) -> List[str]:
         List[str]: Available price areas
     """
     try:
-        session = get_cassandra_session()
-        if not session:
-            return []
-
-        query = f"SELECT DISTINCT priceArea FROM {collection_name}"
-        result = session.execute(query)
-
-        areas = [row[0] for row in result if row[0]]
+        areas = {a for a, _ in get_partitions(collection_name) if a}
+        if not areas:
+            raise ValueError(f"no partitions in {bucketed_table(collection_name)}")
         return sorted(areas)
 
     except Exception as e:
         st.warning(f"Error fetching price areas: {e}")
-        return ['NO1', 'NO2', 'NO3', 'NO4', 'NO5']
+        raise Uncached(['NO1', 'NO2', 'NO3', 'NO4', 'NO5'])
+
+
+@instrumented("cassandra.fetch_monthly_rollup", cache=versioned_cache("cassandra", PRODUCTION_TABLE))
+def fetch_monthly_rollup(price_area: Optional[str] = None) -> pd.DataFrame:
+    """
+    Fetch monthly production totals from the rollup table maintained at ingest.
+
+    Parameters:
+        price_area: Optional price area filter (NO1, NO2, etc.)
+
+    Returns:
+        pd.DataFrame: priceArea, productionGroup, month, quantityKwh, hours
+    """
+    session = get_cassandra_session()
+    if not session:
+        raise Uncached(pd.DataFrame())
+
+    try:
+        query = f"SELECT pricearea, productiongroup, month, quantitykwh, hours FROM {CASSANDRA_MONTHLY}"
+        result = session.execute(idempotent(query))
+        df = pd.DataFrame(list(result), columns=['priceArea', 'productionGroup', 'month', 'quantityKwh', 'hours'])
+
+        if price_area:
+            df = df[df['priceArea'] == price_area]
+        if not df.empty:
+            df['month'] = pd.to_datetime(df['month'].astype(str))
+
+        return df.reset_index(drop=True)
+
+    except Exception as e:
+        st.warning(f"Error fetching monthly rollup: {e}")
+        raise Uncached(pd.DataFrame())
 
 
 def get_date_range(collection_name: str) -> Dict[str, datetime]:
     """
     Get the min and max dates available in a collection.
 
+    Finds the first and last month buckets from the partition keys, then
+    reads one clustering row from each end of those partitions.
+
     Parameters:
         collection_name: Table name
 
@@ -290,32 +341,29 @@ def get_date_range(collection_name: str) -> Dict[str, datetime]:
         if not session:
             return {'min_date': None, 'max_date': None}
 
-        # Note: MIN/MAX aggregations might not be efficient in Cassandra
-        # This is a simplified approach
-        query = f"SELECT startTime FROM {collection_name} LIMIT 1000"
-        result = session.execute(query)
-
-        dates = [row.starttime for row in result if hasattr(row, 'starttime')]
-
-        if dates:
-            return {
-                'min_date': min(dates),
-                'max_date': max(dates)
-            }
-        else:
+        table = bucketed_table(collection_name)
+        group_col = GROUP_COLUMN[table]
+        buckets = list(session.execute(idempotent(f"SELECT DISTINCT pricearea, {group_col}, year_month FROM {table}")))
+        if not buckets:
             return {'min_date': None, 'max_date': None}
 
+        first = min(b[2] for b in buckets)
+        last = max(b[2] for b in buckets)
+        edge = f"""
+            SELECT starttime FROM {table}
+            WHERE pricearea = %s AND {group_col} = %s AND year_month = %s
+            ORDER BY starttime {{order}} LIMIT 1
+        """
+        first_row, last_row = idempotent(edge.format(order='ASC')), idempotent(edge.format(order='DESC'))
+        mins = [session.execute(first_row, b).one() for b in buckets if b[2] == first]
+        maxs = [session.execute(last_row, b).one() for b in buckets if b[2] == last]
+
+        return {
+            'min_date': min(r.starttime for r in mins if r),
+            'max_date': max(r.starttime for r in maxs if r)
+        }
+
     except Exception as e:
         st.warning(f"Error fetching date range: {e}")
         return {'min_date': None, 'max_date': None}
 
-
-# Alias functions for MongoDB compatibility
-def get_mongo_client():
-    """Compatibility function - returns Cassandra session instead."""
-    return get_cassandra_session()
-
-
-def get_database(client, db_name='ind320'):
-    """Compatibility function - returns client (Cassandra session)."""
-    return client
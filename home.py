@@ -0,0 +1,91 @@
+# home.py — landing page, run through the router in app.py
+import streamlit as st
+from lib.mongodb_client import check_mongodb_connection
+from lib.prefetch import get_prefetcher
+
+st.set_page_config(
+    page_title="IND320 Assignment 3 — Isma Sohail",
+    page_icon="🌦️",
+    layout="wide"
+)
+
+# --- HOME PAGE ---
+st.title("🌦️ IND320 Assignment 3 — Advanced Weather & Energy Analysis")
+
+st.markdown("""
+Welcome to the IND320 Assignment 3 Streamlit app! This application demonstrates advanced 
+time series analysis techniques including:
+
+- **STL Decomposition** - Seasonal-Trend decomposition using LOESS
+- **Spectrogram Analysis** - Frequency-time domain visualization
+- **Temperature Outlier Detection** - Using DCT + Statistical Process Control
+- **Precipitation Anomaly Detection** - Using Local Outlier Factor
+
+### 📊 Data Sources
+- **Elhub Production Data** (2021) - From MongoDB Atlas
+- **Open-Meteo Weather Data** (ERA5 Historical Reanalysis)
+
+### 🎓 Student Information
+**Name:** Isma Sohail  
+**Course:** IND320 — NMBU  
+**Assignment:** Part 3 of 4
+
+---
+""")
+
+# Show MongoDB connection status (cached by the background health probe)
+st.subheader("📊 Database Status")
+mongo_status = check_mongodb_connection()
+
+col1, col2 = st.columns(2)
+
+with col1:
+    if mongo_status['status'] == 'connected':
+        st.success(f"✅ MongoDB Connected")
+        st.metric("Documents in production_2021", f"{mongo_status['document_count']:,}")
+        if mongo_status['latency']['p50_ms'] is not None:
+            st.caption(f"Ping p50 {mongo_status['latency']['p50_ms']:.0f} ms · "
+                       f"p95 {mongo_status['latency']['p95_ms']:.0f} ms")
+    elif mongo_status['status'] == 'checking':
+        st.info("⏳ Checking MongoDB connection…")
+    else:
+        st.error(f"❌ MongoDB Disconnected")
+        st.caption(mongo_status['message'])
+
+with col2:
+    st.info("📡 Open-Meteo API")
+    st.caption("ERA5 Historical Reanalysis (2021)")
+
+
+# Warm the analysis pages' data in the background while the visitor reads this page
+st.subheader("⚡ Preloading analysis data")
+prefetcher = get_prefetcher()
+
+
+# Poll once a second while running; static once everything is loaded
+@st.fragment(run_every=None if prefetcher.progress()["finished"] else 1.0)
+def prefetch_progress():
+    p = prefetcher.progress()
+    st.progress(p["done"] / max(p["total"], 1),
+                text=f"{p['done']}/{p['total']} datasets ready · {p['elapsed_s']:.0f}s")
+    if p["running"]:
+        st.caption("Loading: " + ", ".join(p["running"]))
+    if p["failed"]:
+        with st.expander(f"{p['failed']} dataset(s) could not be preloaded"):
+            for t in p["tasks"]:
+                if t["error"]:
+                    st.caption(f"{t['task']}: {t['error']}")
+    if p["cancelled"]:
+        st.caption(f"Stopped with {p['pending']} dataset(s) left; pages load them on first use.")
+    elif p["finished"]:
+        st.caption("All pages will render from memory.")
+    elif st.button("Stop preloading"):
+        prefetcher.cancel()
+
+
+prefetch_progress()
+
+
+# Footer
+st.markdown("---")
+st.caption("IND320 — Data Science and Analytics | NMBU | 2024-2025")
@@ -0,0 +1,282 @@
+"""
+Cache registry - Assessment 4
+
+Counts how well every cache layer of the app works: the Streamlit caches
+(st.cache_data / st.cache_resource in lib/ and pages/, including the
+versioned caches of lib/data_version.py), the per-session ERA5 cache in
+st.session_state (lib/open_meteo.get_or_fetch_era5) and the CSV files on
+disk the A1/A3 pages fall back to.
+
+Per cache it records hits, misses, evictions, entries and their bytes, the
+average cost of a miss and of a hit, and the compute time saved (hits x
+average miss cost - time spent serving hits). pages/07_Mongo_Status.py
+shows the table and exports it as JSON or Prometheus text, so ttl and
+max_entries can be tuned from data.
+
+Streamlit caches are registered by using the drop-in decorators:
+
+    @cache_data("price_area.era5_csv")          # instead of @st.cache_data
+    @cache_resource(max_entries=8)              # name defaults to module.qualname
+
+Other layers report lookups themselves:
+
+    record("era5_session", "session_state", hit=False, key=key, seconds=dt, nbytes=n)
+
+Streamlit has no eviction hook, so evictions are inferred: every cache
+keeps a shadow LRU of the keys it has stored (arguments whose names start
+with an underscore are left out, as Streamlit does). A miss on a key still
+in the shadow means the cache dropped it (ttl or clear), and the shadow
+drops its oldest key when max_entries is exceeded. Keys of unhashable
+arguments fall back to object identity, so counts are close, not exact.
+
+This module does not import Streamlit until a Streamlit cache is created.
+"""
+
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional
+
+LAYERS = ("cache_data", "cache_resource", "session_state", "disk")
+
+_registry: Dict[str, "CacheStats"] = {}
+_registry_lock = threading.Lock()
+_local = threading.local()
+
+
+def size_of(value, _depth: int = 0) -> Optional[int]:
+    """Approximate bytes held by a cached value (shallow for frames; None if unknown)."""
+    if value is None:
+        return None
+    if hasattr(value, "memory_usage") and hasattr(value, "shape"):
+        usage = value.memory_usage(index=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    if hasattr(value, "nbytes") and hasattr(value, "shape"):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if _depth < 2 and isinstance(value, (tuple, list, dict)):
+        items = value.values() if isinstance(value, dict) else value
+        sizes = [size_of(v, _depth + 1) for v in items]
+        known = [s for s in sizes if s is not None]
+        return sum(known) if known else None
+    frame = getattr(value, "df", None)  # DeltaFrame, SharedFrame, TimeIndexedFrame
+    if _depth < 2 and frame is not None:
+        return size_of(frame, _depth + 1)
+    return None
+
+
+class CacheStats:
+    """Counters and shadow key LRU of one cache."""
+
+    def __init__(self, name: str, layer: str, max_entries: Optional[int] = None, ttl=None):
+        self.name = name
+        self.layer = layer
+        self.max_entries = max_entries
+        self.ttl_s = ttl.total_seconds() if hasattr(ttl, "total_seconds") else ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Optional[int]]" = OrderedDict()
+        self.reset()
+
+    def reset(self):
+        """Zero the counters; the entries held are still held."""
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+            self.hit_s = self.miss_s = 0.0
+
+    def hit(self, key: Hashable = None, seconds: float = 0.0):
+        with self._lock:
+            self.hits += 1
+            self.hit_s += seconds
+            if key in self._entries:
+                self._entries.move_to_end(key)
+
+    def miss(self, key: Hashable = None, seconds: float = 0.0, nbytes: Optional[int] = None):
+        with self._lock:
+            self.misses += 1
+            self.miss_s += seconds
+            if key in self._entries:
+                # Stored before but recomputed: the cache dropped it (ttl, clear, memory)
+                self.evictions += 1
+                del self._entries[key]
+            self._entries[key] = nbytes
+            if self.max_entries and len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def cleared(self):
+        with self._lock:
+            self.evictions += len(self._entries)
+            self._entries.clear()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            calls = self.hits + self.misses
+            miss_avg = self.miss_s / self.misses if self.misses else None
+            sizes = [b for b in self._entries.values() if b is not None]
+            return {
+                "name": self.name,
+                "layer": self.layer,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / calls if calls else None,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": sum(sizes) if sizes else None,
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl_s,
+                "miss_ms_avg": miss_avg * 1000 if miss_avg is not None else None,
+                "hit_ms_avg": self.hit_s / self.hits * 1000 if self.hits else None,
+                "saved_s": max(0.0, self.hits * miss_avg - self.hit_s) if miss_avg is not None else 0.0,
+            }
+
+
+def register(name: str, layer: str, max_entries: Optional[int] = None, ttl=None) -> CacheStats:
+    """The CacheStats of `name`, created on first use."""
+    with _registry_lock:
+        stats = _registry.get(name)
+        if stats is None:
+            stats = _registry[name] = CacheStats(name, layer, max_entries, ttl)
+        return stats
+
+
+def record(name: str, layer: str, hit: bool, key: Hashable = None, seconds: float = 0.0,
+           nbytes: Optional[int] = None):
+    """
+    Report one lookup of a cache that is not a Streamlit decorator.
+
+    Parameters:
+        name: Cache name
+        layer: One of LAYERS
+        hit: Whether the value was served from the cache
+        key: Entry key (for entry counting and eviction inference)
+        seconds: Time spent computing the value on a miss (or serving a hit)
+        nbytes: Size of the stored value on a miss
+    """
+    stats = register(name, layer)
+    if hit:
+        stats.hit(key, seconds)
+    else:
+        stats.miss(key, seconds, nbytes)
+
+
+# ---------------- Streamlit caches ----------------
+def _hashable(value) -> Hashable:
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return ("id", id(value))
+
+
+def _tracked(layer: str, name: Optional[str], decorator_factory: Callable, cache_kwargs: Dict):
+    def decorator(func):
+        stats = register(name or f"{func.__module__}.{func.__qualname__}", layer,
+                         cache_kwargs.get("max_entries"), cache_kwargs.get("ttl"))
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def body(*args, **kwargs):
+            # Only runs on a miss; the wrapper below reads the result off its frame
+            t0 = time.perf_counter()
+            result = func(*args, **kwargs)
+            stack = getattr(_local, "stack", None)
+            if stack:
+                stack[-1]["miss"] = (time.perf_counter() - t0, result)
+            return result
+
+        target = decorator_factory(**cache_kwargs)(body)
+
+        def key_of(args, kwargs):
+            try:
+                bound = signature.bind(*args, **kwargs)
+            except TypeError:
+                # Wrapper with extra leading arguments (lib/data_version.versioned_cache)
+                return tuple(map(_hashable, args)) + tuple((k, _hashable(v)) for k, v in sorted(kwargs.items()))
+            return tuple((k, _hashable(v)) for k, v in bound.arguments.items() if not k.startswith("_"))
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stack = getattr(_local, "stack", None)
+            if stack is None:
+                stack = _local.stack = []
+            frame = {"miss": None}
+            stack.append(frame)
+            t0 = time.perf_counter()
+            try:
+                result = target(*args, **kwargs)
+            finally:
+                stack.pop()
+            key = key_of(args, kwargs)
+            if frame["miss"] is None:
+                stats.hit(key, time.perf_counter() - t0)
+            else:
+                seconds, value = frame["miss"]
+                stats.miss(key, seconds, size_of(value))
+            return result
+
+        def clear():
+            target.clear()
+            stats.cleared()
+
+        wrapper.clear = clear
+        return wrapper
+
+    return decorator
+
+
+def cache_data(name: Optional[str] = None, **cache_kwargs):
+    """st.cache_data(**cache_kwargs) that reports to the registry under `name`."""
+    import streamlit as st
+
+    return _tracked("cache_data", name, st.cache_data, cache_kwargs)
+
+
+def cache_resource(name: Optional[str] = None, **cache_kwargs):
+    """st.cache_resource(**cache_kwargs) that reports to the registry under `name`."""
+    import streamlit as st
+
+    return _tracked("cache_resource", name, st.cache_resource, cache_kwargs)
+
+
+# ---------------- reporting ----------------
+def stats() -> List[Dict]:
+    """One row per registered cache, by layer and name."""
+    with _registry_lock:
+        caches = list(_registry.values())
+    order = {layer: i for i, layer in enumerate(LAYERS)}
+    return sorted((c.snapshot() for c in caches), key=lambda r: (order.get(r["layer"], len(LAYERS)), r["name"]))
+
+
+def reset():
+    """Zero every cache's counters (entry counts are kept)."""
+    with _registry_lock:
+        caches = list(_registry.values())
+    for c in caches:
+        c.reset()
+
+
+def export_json() -> str:
+    return json.dumps({"caches": stats()}, default=str, indent=2)
+
+
+def export_prometheus() -> str:
+    """Prometheus text exposition of the per-cache counters and gauges."""
+    rows = stats()
+    lines = []
+    for metric, key, kind, help_text in (
+        ("ind320_cache_layer_hits_total", "hits", "counter", "Lookups served from the cache."),
+        ("ind320_cache_layer_misses_total", "misses", "counter", "Lookups that computed the value."),
+        ("ind320_cache_layer_evictions_total", "evictions", "counter", "Entries dropped by the cache (inferred)."),
+        ("ind320_cache_layer_entries", "entries", "gauge", "Entries currently held (inferred)."),
+        ("ind320_cache_layer_bytes", "bytes", "gauge", "Approximate bytes of the entries held."),
+        ("ind320_cache_layer_saved_seconds_total", "saved_s", "counter", "Compute time saved by hits."),
+    ):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for r in rows:
+            lines.append(f'{metric}{{name="{r["name"]}",layer="{r["layer"]}"}} {r[key] or 0}')
+    return "\n".join(lines) + "\n"
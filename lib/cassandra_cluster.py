@@ -0,0 +1,287 @@
+"""
+Cassandra cluster profile and request latency - Assessment 4
+
+docker-compose.yml runs three Cassandra nodes (CQL on localhost ports 9042,
+9043 and 9044). build_cluster() connects to all of them with the policies
+that keep read tail latency flat when one node is slow or restarting:
+
+    load balancing   TokenAware(DCAwareRoundRobin(local_dc)): prepared
+                     reads go straight to a replica of their partition,
+                     and only nodes of the local data centre are used
+    speculation      ConstantSpeculativeExecution(delay, max): when a read
+                     has not answered after `delay` ms the same request is
+                     sent to the next replica and the first answer wins.
+                     The driver only does this for statements marked
+                     idempotent (idempotent() below; every SELECT of the app)
+    timeouts         per-request timeout of the default execution profile;
+                     ingest scripts get a longer one and no speculation
+
+Settings come from the defaults below, then the [cassandra] table of
+.streamlit/secrets.toml (passed in by cassandra_client), then environment
+variables:
+
+    IND320_CASSANDRA_HOSTS           host[:port],...   (all compose nodes)
+    IND320_CASSANDRA_DC              local data centre (datacenter1)
+    IND320_CASSANDRA_CONSISTENCY     read consistency  (LOCAL_ONE)
+    IND320_CASSANDRA_TIMEOUT_S       read request timeout
+    IND320_CASSANDRA_INGEST_TIMEOUT_S
+    IND320_CASSANDRA_SPECULATIVE_MS  speculation delay, 0 disables it
+    IND320_CASSANDRA_SPECULATIVE_MAX extra attempts per read
+
+The driver finds the other nodes through the system.peers table, so it
+talks to the addresses the nodes advertise. Those are the compose network
+addresses; they are routable from a Linux host but not from Docker Desktop,
+where only the contact points are reachable.
+
+record_latencies() attaches a request-init listener to a session and
+collects request latency per coordinator into fixed histogram buckets plus
+a recent-sample window for percentiles. pages/08_Diagnostics.py shows it
+and exports it as Prometheus text.
+
+This module does not import Streamlit.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_SETTINGS = {
+    "hosts": "127.0.0.1:9042,127.0.0.1:9043,127.0.0.1:9044",
+    "local_dc": "datacenter1",
+    "consistency": "LOCAL_ONE",
+    "connect_timeout_s": 5.0,
+    "request_timeout_s": 2.0,
+    "ingest_timeout_s": 30.0,
+    "speculative_delay_ms": 50.0,
+    "speculative_max": 2,
+}
+
+_ENV = {
+    "hosts": "IND320_CASSANDRA_HOSTS",
+    "local_dc": "IND320_CASSANDRA_DC",
+    "consistency": "IND320_CASSANDRA_CONSISTENCY",
+    "request_timeout_s": "IND320_CASSANDRA_TIMEOUT_S",
+    "ingest_timeout_s": "IND320_CASSANDRA_INGEST_TIMEOUT_S",
+    "speculative_delay_ms": "IND320_CASSANDRA_SPECULATIVE_MS",
+    "speculative_max": "IND320_CASSANDRA_SPECULATIVE_MAX",
+}
+
+# Histogram bucket upper bounds in milliseconds (Prometheus style, cumulative on export)
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+WINDOW = 2048
+
+
+def cluster_settings(secrets: Optional[Dict] = None, **overrides) -> Dict:
+    """
+    Effective cluster settings: defaults < secrets < environment < overrides.
+
+    Parameters:
+        secrets: The [cassandra] table of secrets.toml, if any
+        overrides: Explicit values (e.g. hosts from a script's --hosts)
+
+    Returns:
+        dict: Settings with the types of DEFAULT_SETTINGS
+    """
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update({k: v for k, v in (secrets or {}).items() if k in DEFAULT_SETTINGS})
+    settings.update({k: os.environ[var] for k, var in _ENV.items() if os.environ.get(var)})
+    settings.update({k: v for k, v in overrides.items() if v is not None})
+    for key, default in DEFAULT_SETTINGS.items():
+        if not isinstance(default, str):
+            settings[key] = type(default)(settings[key])
+    return settings
+
+
+def contact_points(hosts) -> List[Tuple[str, int]]:
+    """'a:9042,b:9043' (or a list) -> [(host, port)]; the port defaults to 9042."""
+    items = hosts.split(",") if isinstance(hosts, str) else hosts
+    points = []
+    for item in (i.strip() for i in items):
+        if not item:
+            continue
+        host, _, port = item.rpartition(":") if ":" in item else (item, "", "9042")
+        points.append((host, int(port)))
+    return points
+
+
+def build_cluster(settings: Optional[Dict] = None, ingest: bool = False):
+    """
+    Cluster configured from a profile (see module docstring).
+
+    Parameters:
+        settings: From cluster_settings(); defaults if omitted
+        ingest: Longer request timeout and no speculative execution, for
+                the bulk writers in scripts/
+
+    Returns:
+        cassandra.cluster.Cluster (not yet connected)
+    """
+    from cassandra import ConsistencyLevel
+    from cassandra.cluster import EXEC_PROFILE_DEFAULT, Cluster, ExecutionProfile
+    from cassandra.policies import ConstantSpeculativeExecutionPolicy, DCAwareRoundRobinPolicy, TokenAwarePolicy
+
+    s = settings or cluster_settings()
+    speculate = not ingest and s["speculative_delay_ms"] > 0 and s["speculative_max"] > 0
+    profile = ExecutionProfile(
+        load_balancing_policy=TokenAwarePolicy(DCAwareRoundRobinPolicy(local_dc=s["local_dc"]),
+                                               shuffle_replicas=True),
+        speculative_execution_policy=(
+            ConstantSpeculativeExecutionPolicy(s["speculative_delay_ms"] / 1000, s["speculative_max"])
+            if speculate else None
+        ),
+        consistency_level=ConsistencyLevel.name_to_value[s["consistency"].upper()],
+        request_timeout=s["ingest_timeout_s"] if ingest else s["request_timeout_s"],
+    )
+    return Cluster(
+        contact_points=contact_points(s["hosts"]),
+        execution_profiles={EXEC_PROFILE_DEFAULT: profile},
+        connect_timeout=s["connect_timeout_s"],
+    )
+
+
+def idempotent(statement):
+    """
+    Mark a read as safe to retry and speculate on.
+
+    Accepts a CQL string (wrapped in a SimpleStatement) or a prepared
+    statement (flagged in place). Without the driver the string is returned
+    unchanged.
+    """
+    if isinstance(statement, str):
+        try:
+            from cassandra.query import SimpleStatement
+        except ImportError:
+            return statement
+        return SimpleStatement(statement, is_idempotent=True)
+    statement.is_idempotent = True
+    return statement
+
+
+def host_states(session) -> List[Dict]:
+    """Address, data centre and up/down state of every node the driver knows."""
+    try:
+        hosts = session.cluster.metadata.all_hosts()
+    except AttributeError:
+        return []
+    return [{"host": str(h.endpoint), "dc": h.datacenter, "rack": h.rack, "up": bool(h.is_up)}
+            for h in sorted(hosts, key=lambda h: str(h.endpoint))]
+
+
+# ---------------- request latency ----------------
+class LatencyHistogram:
+    """Bucketed latency counts plus a window of recent samples, for one coordinator or all."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.recent = deque(maxlen=WINDOW)
+        self.requests = self.errors = 0
+        self.sum_s = 0.0
+        self.error_types: Dict[str, int] = {}
+
+    def add(self, seconds: float, error: Optional[str] = None):
+        ms = seconds * 1000
+        i = next((i for i, b in enumerate(BUCKETS_MS) if ms <= b), len(BUCKETS_MS))
+        self.counts[i] += 1
+        self.recent.append(seconds)
+        self.requests += 1
+        self.sum_s += seconds
+        if error:
+            self.errors += 1
+            self.error_types[error] = self.error_types.get(error, 0) + 1
+
+    def snapshot(self) -> Dict:
+        from lib.instrumentation import percentile
+
+        recent = list(self.recent)
+        ms = {f"p{q}_ms": percentile(recent, q) * 1000 if recent else None for q in (50, 95, 99)}
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_types": dict(self.error_types),
+            "sum_s": self.sum_s,
+            "mean_ms": self.sum_s / self.requests * 1000 if self.requests else None,
+            **ms,
+            "max_ms": max(recent) * 1000 if recent else None,
+            "buckets": dict(zip([str(b) for b in BUCKETS_MS] + ["+Inf"], self.counts)),
+        }
+
+
+class LatencyRecorder:
+    """Times every request of the sessions it is attached to, per coordinator."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.total = LatencyHistogram()
+            self.hosts: Dict[str, LatencyHistogram] = {}
+
+    def attach(self, session):
+        session.add_request_init_listener(self._on_request)
+
+    def _on_request(self, future):
+        t0 = time.perf_counter()
+        done = []
+
+        def finish(error=None):
+            if done:  # callbacks fire again for later pages of a paged read
+                return
+            done.append(True)
+            host = getattr(future, "coordinator_host", None)
+            self.add(time.perf_counter() - t0, str(host) if host else "unknown", error)
+
+        future.add_callbacks(callback=lambda _rows: finish(),
+                             errback=lambda exc: finish(type(exc).__name__))
+
+    def add(self, seconds: float, host: str, error: Optional[str] = None):
+        with self._lock:
+            self.total.add(seconds, error)
+            self.hosts.setdefault(host, LatencyHistogram()).add(seconds, error)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "total": self.total.snapshot(),
+                "hosts": {h: hist.snapshot() for h, hist in sorted(self.hosts.items())},
+            }
+
+
+_recorder = LatencyRecorder()
+
+
+def record_latencies(session):
+    """Start timing the requests of `session` into the process-wide recorder."""
+    _recorder.attach(session)
+    return session
+
+
+def latency_stats() -> Dict:
+    return _recorder.stats()
+
+
+def reset_latencies():
+    _recorder.reset()
+
+
+def export_prometheus() -> str:
+    """Prometheus histogram of request latency per coordinator."""
+    hosts = latency_stats()["hosts"]
+    metric = "ind320_cassandra_request_seconds"
+    lines = [f"# HELP {metric} Cassandra request latency by coordinator.", f"# TYPE {metric} histogram"]
+    for host, snap in hosts.items():
+        running = 0
+        for le, n in snap["buckets"].items():
+            running += n
+            bound = le if le == "+Inf" else f"{int(le) / 1000:g}"
+            lines.append(f'{metric}_bucket{{host="{host}",le="{bound}"}} {running}')
+        lines.append(f'{metric}_sum{{host="{host}"}} {snap["sum_s"]:.6f}')
+        lines.append(f'{metric}_count{{host="{host}"}} {snap["requests"]}')
+    lines.append("# HELP ind320_cassandra_request_errors_total Failed Cassandra requests by coordinator.")
+    lines.append("# TYPE ind320_cassandra_request_errors_total counter")
+    for host, snap in hosts.items():
+        lines.append(f'ind320_cassandra_request_errors_total{{host="{host}"}} {snap["errors"]}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,221 @@
+"""
+Weather-production alignment and correlation - Assessment 4
+
+Puts hourly Elhub production for every (area, group) series and the ERA5
+variables of each area's city (lib/open_meteo.AREA_CITIES) on one shared
+UTC hourly grid, as dense float arrays:
+
+    production  (series, hours)
+    weather     (areas, variables, hours)
+
+Rows are placed by integer hour offset from the grid start, so the join is
+an array scatter instead of a pandas merge, and every statistic below runs
+over all series at once:
+
+    panel = align(prod_df, {"NO1": era5_no1, ...})
+    r = rolling_corr(panel.production, panel.weather_for_series("wind_speed_10m"), window=24 * 30)
+    lags, cc = cross_correlation(panel.production, panel.weather_for_series("wind_speed_10m"), max_lag=72)
+
+Missing hours stay NaN and are left out of every sum. This module does not
+import Streamlit.
+"""
+
+import warnings
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _hours(times) -> np.ndarray:
+    """Whole hours since the epoch of naive-UTC or tz-aware timestamps."""
+    t = pd.to_datetime(times, utc=True)
+    if isinstance(t, pd.Series):
+        t = t.dt.tz_localize(None)
+    else:
+        t = t.tz_localize(None)
+    return np.asarray(t, dtype="datetime64[h]").astype(np.int64)
+
+
+class AlignedPanel:
+    """Production and weather on one hourly grid (see module docstring)."""
+
+    def __init__(self, grid: pd.DatetimeIndex, series: List[Tuple[str, str]], production: np.ndarray,
+                 areas: List[str], variables: List[str], weather: np.ndarray):
+        self.grid = grid
+        self.series = series
+        self.production = production
+        self.areas = areas
+        self.variables = variables
+        self.weather = weather
+        # Row of `weather` belonging to each production series
+        area_pos = {a: i for i, a in enumerate(areas)}
+        self.series_area = np.array([area_pos.get(a, -1) for a, _ in series], dtype=np.int64)
+
+    def weather_for_series(self, variable: str) -> np.ndarray:
+        """(series, hours) matrix of one weather variable, each row from the series' own area."""
+        v = self.variables.index(variable)
+        out = np.full_like(self.production, np.nan)
+        has = self.series_area >= 0
+        out[has] = self.weather[self.series_area[has], v]
+        return out
+
+    def series_index(self, area: str, group: str) -> int:
+        return self.series.index((area, group))
+
+
+def align(production: pd.DataFrame, weather: Dict[str, pd.DataFrame],
+          variables: Optional[Sequence[str]] = None,
+          start=None, end=None) -> AlignedPanel:
+    """
+    Align production and per-area weather on a shared UTC hourly grid.
+
+    Parameters:
+        production: priceArea, productionGroup, startTime (naive UTC), quantityKwh
+        weather: area -> ERA5 frame with a 'time' column (lib/open_meteo.fetch_era5)
+        variables: Weather columns to include (default: all numeric columns of the first frame)
+        start, end: Grid bounds (default: span of the production data)
+
+    Returns:
+        AlignedPanel
+    """
+    if production.empty:
+        raise ValueError("No production rows to align")
+    prod_h = _hours(production["startTime"])
+    h0 = _hours(pd.Series([pd.Timestamp(start)]))[0] if start is not None else prod_h.min()
+    h1 = _hours(pd.Series([pd.Timestamp(end)]))[0] if end is not None else prod_h.max()
+    n = int(h1 - h0 + 1)
+    grid = pd.DatetimeIndex((np.arange(n, dtype=np.int64) + h0).astype("datetime64[h]").astype("datetime64[ns]"))
+
+    # Production: factorize (area, group) once, then scatter values by hour offset
+    keys = pd.MultiIndex.from_arrays([production["priceArea"].astype(str),
+                                      production["productionGroup"].astype(str)])
+    codes, uniques = keys.factorize(sort=True)
+    pos = prod_h - h0
+    inside = (pos >= 0) & (pos < n)
+    rows, cols = codes[inside], pos[inside]
+    qty = production["quantityKwh"].to_numpy(dtype=float)[inside]
+
+    # Hours reported twice are summed, so overlapping loads never hide data
+    sums = np.zeros((len(uniques), n))
+    np.add.at(sums, (rows, cols), qty)
+    matrix = np.full_like(sums, np.nan)
+    matrix[rows, cols] = sums[rows, cols]
+
+    # Weather: one (variables, hours) block per area
+    areas = sorted(weather)
+    if variables is None:
+        first = weather[areas[0]] if areas else pd.DataFrame()
+        variables = [c for c in first.columns if c != "time" and pd.api.types.is_numeric_dtype(first[c])]
+    variables = list(variables)
+    wx = np.full((len(areas), len(variables), n), np.nan)
+    for i, area in enumerate(areas):
+        w = weather[area]
+        wpos = _hours(w["time"]) - h0
+        ok = (wpos >= 0) & (wpos < n)
+        wx[i][:, wpos[ok]] = w[variables].to_numpy(dtype=float)[ok].T
+
+    return AlignedPanel(grid, [tuple(k) for k in uniques], matrix, areas, variables, wx)
+
+
+def _standardize(x: np.ndarray) -> np.ndarray:
+    """Zero mean, unit std per row (NaN-aware); keeps cumulative sums well conditioned."""
+    with warnings.catch_warnings():
+        # All-NaN rows (a series with no data in range) stay NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(x, axis=-1, keepdims=True)
+        std = np.nanstd(x, axis=-1, keepdims=True)
+    std[~(std > 0)] = 1.0
+    return (x - mean) / std
+
+
+def rolling_corr(x: np.ndarray, y: np.ndarray, window: int, min_periods: Optional[int] = None) -> np.ndarray:
+    """
+    Trailing-window Pearson correlation of matching rows of x and y.
+
+    Computed from cumulative sums along the time axis, so the cost does not
+    depend on the window length and all rows are done in one pass.
+
+    Parameters:
+        x, y: (..., hours) arrays of the same shape; NaN = missing
+        window: Window length in hours
+        min_periods: Minimum paired observations in a window (default window // 2)
+
+    Returns:
+        np.ndarray: Same shape as x; NaN where the window has too few pairs
+    """
+    min_periods = window // 2 if min_periods is None else min_periods
+    valid = ~(np.isnan(x) | np.isnan(y))
+    xs = np.where(valid, _standardize(np.where(valid, x, np.nan)), 0.0)
+    ys = np.where(valid, _standardize(np.where(valid, y, np.nan)), 0.0)
+
+    def windowed(a):
+        c = np.cumsum(a, axis=-1)
+        out = c.copy()
+        out[..., window:] = c[..., window:] - c[..., :-window]
+        return out
+
+    n = windowed(valid.astype(float))
+    sx, sy = windowed(xs), windowed(ys)
+    sxx, syy, sxy = windowed(xs * xs), windowed(ys * ys), windowed(xs * ys)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = n * sxy - sx * sy
+        var = (n * sxx - sx * sx) * (n * syy - sy * sy)
+        r = cov / np.sqrt(var)
+    r[(n < max(min_periods, 2)) | ~(var > 0)] = np.nan
+    return np.clip(r, -1.0, 1.0)
+
+
+def cross_correlation(x: np.ndarray, y: np.ndarray, max_lag: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Lagged correlation of matching rows of x and y for every lag in [-max_lag, max_lag].
+
+    corr[..., k] relates x[t] to y[t - lag_k]: a positive lag means y
+    (the weather) leads x (the production). All lags come from one FFT
+    product per row; the pair counts per lag come from the same transform
+    of the missing-value masks, so gaps are handled exactly.
+
+    Returns:
+        (lags, corr): lags of shape (2 * max_lag + 1,), corr of shape (..., 2 * max_lag + 1)
+    """
+    valid_x, valid_y = ~np.isnan(x), ~np.isnan(y)
+    xs = np.where(valid_x, _standardize(x), 0.0)
+    ys = np.where(valid_y, _standardize(y), 0.0)
+
+    t = x.shape[-1]
+    nfft = 1 << int(np.ceil(np.log2(2 * t - 1)))
+    fx, fy = np.fft.rfft(xs, nfft), np.fft.rfft(ys, nfft)
+    mx, my = np.fft.rfft(valid_x.astype(float), nfft), np.fft.rfft(valid_y.astype(float), nfft)
+    raw = np.fft.irfft(fx * np.conj(fy), nfft)
+    counts = np.rint(np.fft.irfft(mx * np.conj(my), nfft))
+
+    lags = np.arange(-max_lag, max_lag + 1)
+    idx = lags % nfft
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = raw[..., idx] / counts[..., idx]
+    corr[counts[..., idx] < 2] = np.nan
+    return lags, np.clip(corr, -1.0, 1.0)
+
+
+def correlation_summary(panel: AlignedPanel, variable: str, max_lag: int = 72) -> pd.DataFrame:
+    """
+    One row per (area, group): zero-lag correlation with the area's weather
+    variable and the lag with the strongest absolute correlation.
+
+    Returns:
+        pd.DataFrame: priceArea, productionGroup, corr, best_lag_h, best_corr, hours
+    """
+    y = panel.weather_for_series(variable)
+    lags, cc = cross_correlation(panel.production, y, max_lag)
+    zero = int(np.flatnonzero(lags == 0)[0])
+    best = np.argmax(np.where(np.isnan(cc), -np.inf, np.abs(cc)), axis=-1)
+    rows = np.arange(len(panel.series))
+    return pd.DataFrame({
+        "priceArea": [a for a, _ in panel.series],
+        "productionGroup": [g for _, g in panel.series],
+        "corr": cc[:, zero],
+        "best_lag_h": lags[best],
+        "best_corr": cc[rows, best],
+        "hours": (~np.isnan(panel.production) & ~np.isnan(y)).sum(axis=-1),
+    })
@@ -0,0 +1,234 @@
+"""
+Data version watermarks - Assessment 4
+
+Every ingest bumps a small watermark for the collection or table it wrote
+(a document in ind320.data_versions, a row in the Cassandra data_versions
+table). The app polls the watermark - one point read every few seconds per
+process - and the Streamlit caches are keyed on it instead of a ttl, so a
+cached frame is reused until the data actually changes and refreshed on the
+next rerun after it does.
+
+Writer side (scripts/load_elhub.py, scripts/migrate_cassandra_schema.py):
+
+    bump_mongo_version(db, "production_2021", rows=len(df))
+    bump_cassandra_version(session, "elhub_production_by_month", rows=len(df))
+
+Reader side (lib/mongodb_client.py, cassandra_client.py, lib/repository.py):
+
+    @instrumented("cassandra.fetch_production_data", cache=versioned_cache("cassandra", _table_of))
+    def fetch_production_data(collection_name, start_date, end_date, ...): ...
+
+    # or with the version as an explicit cache key argument
+    _cached_query(repo, repo.name, version_of(repo.sources), area, groups, ...)
+
+Held frames (lib/delta_frame.py) are not cached this way: they sync() to
+current_version() and fetch only the rows written since.
+
+A version only changes on ingest, so a cached function must not return a
+fallback for a failed read (an empty frame, default labels): it would be
+served until the next bump, or for good if the source was never bumped.
+Raise Uncached(fallback) instead; the caller gets the fallback and the
+next call tries again.
+
+The writer functions do not import Streamlit.
+"""
+
+import functools
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Tuple, Union
+
+VERSIONS_COLLECTION = "data_versions"
+VERSIONS_TABLE = "data_versions"
+POLL_INTERVAL_S = 10.0
+CACHE_MAX_ENTRIES = 256
+
+VERSIONS_DDL = f"""
+CREATE TABLE IF NOT EXISTS {VERSIONS_TABLE} (
+    name text PRIMARY KEY,
+    version bigint,
+    rows bigint,
+    updated_at timestamp
+)
+"""
+
+
+# ---------------- writers ----------------
+def bump_mongo_version(db, name: str, rows: int = 0) -> int:
+    """
+    Increment the watermark of a MongoDB collection after it was written.
+
+    Parameters:
+        db: pymongo Database (e.g. client['ind320'])
+        name: Collection the data was written to
+        rows: Rows written by this ingest (informational)
+
+    Returns:
+        int: The new version
+    """
+    from pymongo import ReturnDocument
+
+    doc = db[VERSIONS_COLLECTION].find_one_and_update(
+        {"_id": name},
+        {
+            "$inc": {"version": 1},
+            "$set": {"rows": int(rows), "updatedAt": datetime.now(timezone.utc).replace(tzinfo=None)},
+        },
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return int(doc["version"])
+
+
+def read_mongo_version(db, name: str) -> int:
+    doc = db[VERSIONS_COLLECTION].find_one({"_id": name}, {"version": 1})
+    return int(doc["version"]) if doc else 0
+
+
+def ensure_cassandra_versions_table(session) -> None:
+    session.execute(VERSIONS_DDL)
+
+
+def bump_cassandra_version(session, name: str, rows: int = 0) -> int:
+    """
+    Set the watermark of a Cassandra table after it was written.
+
+    Cassandra has no atomic increment outside counter tables, so the version
+    is the write time in microseconds; it only has to change, not count.
+
+    Returns:
+        int: The new version
+    """
+    ensure_cassandra_versions_table(session)
+    now = datetime.now(timezone.utc)
+    version = time.time_ns() // 1000
+    session.execute(
+        f"UPDATE {VERSIONS_TABLE} SET version = %s, rows = %s, updated_at = %s WHERE name = %s",
+        (version, int(rows), now, name),
+    )
+    return version
+
+
+def read_cassandra_version(session, name: str) -> int:
+    from lib.cassandra_cluster import idempotent
+
+    row = session.execute(idempotent(f"SELECT version FROM {VERSIONS_TABLE} WHERE name = %s"), (name,)).one()
+    return int(row[0]) if row and row[0] is not None else 0
+
+
+# ---------------- polling ----------------
+_polled: Dict[Tuple[str, str], Tuple[float, int]] = {}
+_poll_lock = threading.Lock()
+
+
+def _read_version(backend: str, name: str) -> int:
+    if backend == "mongodb":
+        from lib.mongodb_client import get_mongo_client
+        client = get_mongo_client()
+        return read_mongo_version(client["ind320"], name) if client else 0
+    if backend == "cassandra":
+        from cassandra_client import get_cassandra_session
+        session = get_cassandra_session()
+        return read_cassandra_version(session, name) if session else 0
+    if backend == "lake":
+        from lib.lake import LAKE_DIR, read_lake_version
+        # '<lake dir>::<dataset>' for a lake other than LAKE_DIR (LakeRepository)
+        lake_dir, _, dataset = name.rpartition("::")
+        return read_lake_version(dataset, Path(lake_dir) if lake_dir else LAKE_DIR)
+    raise ValueError(f"Unknown backend: {backend}")
+
+
+def current_version(backend: str, name: str, max_age: float = POLL_INTERVAL_S) -> int:
+    """
+    Latest known watermark of a collection/table, re-read at most every max_age seconds.
+
+    If the watermark cannot be read the last known value is kept, so a
+    database hiccup does not invalidate every cache.
+
+    Parameters:
+        backend: 'mongodb', 'cassandra' or 'lake' (lib/lake.py dataset)
+        name: Collection, table or dataset name ('<lake dir>::<dataset>'
+              for a lake outside LAKE_DIR)
+        max_age: Seconds a polled value is reused
+
+    Returns:
+        int: Version (0 when the source was never bumped)
+    """
+    key = (backend, name)
+    now = time.monotonic()
+    with _poll_lock:
+        checked, version = _polled.get(key, (None, 0))
+    if checked is not None and now - checked < max_age:
+        return version
+    try:
+        version = _read_version(backend, name)
+    except Exception:
+        pass
+    with _poll_lock:
+        _polled[key] = (now, version)
+    return version
+
+
+def forget_polled():
+    """Drop polled values so the next call re-reads every watermark."""
+    with _poll_lock:
+        _polled.clear()
+
+
+# ---------------- Streamlit cache ----------------
+class Uncached(Exception):
+    """Raised by a versioned_cache function to return `value` without caching it."""
+
+    def __init__(self, value):
+        super().__init__("uncached fallback")
+        self.value = value
+
+
+def versioned_cache(backend: str, source: Union[str, Callable[..., str]],
+                    max_entries: int = CACHE_MAX_ENTRIES, **cache_kwargs):
+    """
+    st.cache_data keyed on the data version of `source` instead of a ttl.
+
+    Usable on its own or as the cache of lib.instrumentation.instrumented.
+
+    Parameters:
+        backend: 'mongodb' or 'cassandra'
+        source: Collection/table name, or a function of the call arguments
+                returning it (e.g. the table argument of a fetcher)
+        max_entries: Entries kept per function; results for superseded
+                     versions are evicted as new ones come in
+        cache_kwargs: Passed on to st.cache_data (e.g. show_spinner=False)
+
+    The wrapped function raises Uncached(fallback) for results that must
+    not be cached; st.cache_data does not store exceptions, and the wrapper
+    returns the fallback outside the cache.
+    """
+    from lib.cache_metrics import cache_data
+
+    def decorator(func):
+        @functools.wraps(func)
+        def body(data_version, *args, **kwargs):
+            return func(*args, **kwargs)
+
+        # Reported to lib/cache_metrics.py under the wrapped function's name
+        cached = cache_data(max_entries=max_entries, **cache_kwargs)(body)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            name = source(*args, **kwargs) if callable(source) else source
+            try:
+                return cached(current_version(backend, name), *args, **kwargs)
+            except Uncached as fallback:
+                return fallback.value
+
+        wrapper.clear = cached.clear
+        return wrapper
+
+    return decorator
+
+
+def version_of(sources) -> Tuple[int, ...]:
+    """Current versions of several (backend, name) sources, for composite cache keys."""
+    return tuple(current_version(backend, name) for backend, name in sources)
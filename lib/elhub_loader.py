@@ -0,0 +1,388 @@
+"""
+Bulk loader for Elhub production data - Assessment 4
+
+Writes a cleaned production frame (priceArea, productionGroup, startTime,
+quantityKwh) into MongoDB (documents or time-series layout) and Cassandra
+with batched, idempotent writes.
+
+Used by scripts/load_elhub.py. This module does not import Streamlit so it
+can run from the command line or a scheduled job.
+"""
+
+import os
+import re
+import time
+import tomllib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Natural key of one production record: one row per area, group and hour
+PRODUCTION_KEY = ("priceArea", "productionGroup", "startTime")
+PRODUCTION_COLUMNS = ["priceArea", "productionGroup", "startTime", "quantityKwh"]
+
+# Label cleaning (instructor feedback: no "unspecified" parts or placeholder groups)
+UNSPECIFIED_SUFFIX = r"\s*-\s*unspecified"
+EXCLUDED_GROUPS = ["unspecified", "x", "×", "*"]
+
+# Batch sizes tuned for Atlas (16 MB message limit, ~100 bytes/document)
+# and for Cassandra (keep unlogged batches well below batch_size_warn_threshold)
+MONGO_BATCH_SIZE = 5000
+CASSANDRA_BATCH_SIZE = 50
+CASSANDRA_CONCURRENCY = 32
+
+SECRETS_PATH = Path(".streamlit/secrets.toml")
+
+
+def get_mongo_uri() -> Optional[str]:
+    """
+    Resolve the MongoDB URI outside Streamlit.
+
+    Looks at the MONGO_URI environment variable first, then at the same
+    .streamlit/secrets.toml file the app uses.
+
+    Returns:
+        str or None: MongoDB connection string
+    """
+    uri = os.environ.get("MONGO_URI")
+    if uri:
+        return uri
+    if SECRETS_PATH.exists():
+        with open(SECRETS_PATH, "rb") as f:
+            return tomllib.load(f).get("MONGO_URI")
+    return None
+
+
+def clean_group_labels(labels: pd.Series) -> pd.Categorical:
+    """
+    Normalise production group labels through a categorical lookup.
+
+    Each distinct raw label is cleaned once (" - unspecified" suffix removed,
+    whitespace stripped) and the resulting codes are broadcast back to every
+    row. Placeholder groups ('unspecified', 'x', '×', '*') become missing.
+
+    Parameters:
+        labels: Raw productionGroup column
+
+    Returns:
+        pd.Categorical: Cleaned labels (NaN for excluded groups)
+    """
+    codes, uniques = pd.factorize(labels, sort=False)
+    cleaned = (
+        pd.Index(uniques.astype(str))
+        .str.replace(UNSPECIFIED_SUFFIX, "", regex=True, flags=re.IGNORECASE)
+        .str.strip()
+    )
+    cleaned = cleaned.where(~cleaned.str.lower().isin(EXCLUDED_GROUPS))
+
+    # Several raw labels may collapse onto one clean label: re-factorize the
+    # (small) unique table and remap the row codes through it
+    clean_codes, categories = pd.factorize(cleaned, sort=True)
+    row_codes = np.where(codes >= 0, clean_codes[codes], -1)
+    return pd.Categorical.from_codes(row_codes, categories=categories)
+
+
+def drop_duplicate_hours(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Drop repeated (priceArea, productionGroup, startTime) rows, keeping the last.
+
+    Rows are compared by a 64-bit hash of the key columns, so reloads and
+    overlapping fetch windows never double-count an hour.
+    """
+    hashes = pd.util.hash_pandas_object(df[list(PRODUCTION_KEY)], index=False)
+    return df[~hashes.duplicated(keep="last").to_numpy()]
+
+
+def drop_placeholder_groups(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Drop rows of the placeholder groups ('unspecified', 'x', '×', '*', any case).
+
+    Read-side counterpart of clean_group_labels for documents written before
+    cleaning moved to ingest (the notebooks loaded them uncleaned). Returns
+    df itself when there is nothing to drop.
+    """
+    if df.empty or "productionGroup" not in df.columns:
+        return df
+    labels = {v for g in EXCLUDED_GROUPS for v in (g, g.upper(), g.capitalize())}
+    placeholder = df["productionGroup"].isin(labels).to_numpy()
+    return df[~placeholder] if placeholder.any() else df
+
+
+def prepare_production_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Ingest-time normalisation of a production frame.
+
+    Restricts the frame to the stored columns, converts timestamps to naive
+    UTC, cleans group labels, drops placeholder groups and duplicate hours.
+    The read path in lib/mongodb_client relies on this having been done.
+
+    Parameters:
+        df: Frame from the Elhub fetcher (or its CSV export)
+
+    Returns:
+        pd.DataFrame: priceArea, productionGroup, startTime, quantityKwh
+    """
+    missing = [c for c in PRODUCTION_COLUMNS if c not in df.columns]
+    if missing:
+        raise KeyError(f"Production frame is missing columns: {missing}")
+
+    out = df[PRODUCTION_COLUMNS].copy()
+    # Elhub returns local offsets (+01:00/+02:00); store everything as naive UTC
+    out["startTime"] = pd.to_datetime(out["startTime"], utc=True).dt.tz_localize(None)
+    out["quantityKwh"] = pd.to_numeric(out["quantityKwh"], errors="coerce").astype(float)
+    out["priceArea"] = out["priceArea"].astype("category")
+    out["productionGroup"] = clean_group_labels(out["productionGroup"])
+    out = out.dropna(subset=["startTime", "productionGroup"])
+    return drop_duplicate_hours(out).reset_index(drop=True)
+
+
+def _report(target: str, rows: int, seconds: float, **extra) -> Dict:
+    return {
+        "target": target,
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_s": rows / seconds if seconds > 0 else float("inf"),
+        **extra,
+    }
+
+
+def _chunks(items: Sequence, size: int) -> List[Sequence]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+# ---------------- MongoDB ----------------
+def convert_legacy_times(collection) -> int:
+    """
+    Convert startTime values stored as ISO strings (older notebook loads) to BSON dates.
+
+    Range filters and upserts on startTime only match BSON dates, so this runs
+    server-side once before the first keyed load.
+
+    Returns:
+        int: Number of documents converted
+    """
+    res = collection.update_many(
+        {"startTime": {"$type": "string"}},
+        [{"$set": {"startTime": {"$toDate": "$startTime"}}}],
+    )
+    return res.modified_count
+
+
+def ensure_mongo_indexes(collection) -> None:
+    """
+    Create the unique natural-key index that makes re-runs idempotent, and
+    the updatedAt index used by incremental reads (lib/delta_frame.py).
+    """
+    collection.create_index(
+        [(k, 1) for k in PRODUCTION_KEY],
+        unique=True,
+        name="area_group_start_unique",
+    )
+    collection.create_index([("updatedAt", 1)], name="updated_at")
+
+
+def load_to_mongo(
+    df: pd.DataFrame,
+    collection,
+    batch_size: int = MONGO_BATCH_SIZE,
+    workers: int = 4,
+    mode: str = "auto",
+) -> Dict:
+    """
+    Write a production frame to MongoDB in concurrent unordered batches.
+
+    Parameters:
+        df: Frame from prepare_production_frame()
+        collection: pymongo Collection (e.g. ind320.production_2021)
+        batch_size: Documents per insert_many/bulk_write call
+        workers: Number of batches in flight at once
+        mode: 'insert' (insert_many, duplicates skipped), 'upsert'
+              (bulk_write of keyed UpdateOne upserts) or 'auto' (insert
+              into an empty collection, upsert otherwise)
+
+    Returns:
+        dict: Load report with rows, seconds and rows_per_s
+    """
+    from pymongo import UpdateOne
+    from pymongo.errors import BulkWriteError
+
+    convert_legacy_times(collection)
+    ensure_mongo_indexes(collection)
+    if mode == "auto":
+        mode = "insert" if collection.estimated_document_count() == 0 else "upsert"
+
+    t0 = time.perf_counter()
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    records = df.to_dict("records")
+    for r in records:
+        r["updatedAt"] = now
+
+    def write_insert(batch):
+        try:
+            res = collection.insert_many(batch, ordered=False)
+            return len(res.inserted_ids), 0
+        except BulkWriteError as e:
+            # Duplicate keys (11000) mean the row is already loaded
+            fatal = [w for w in e.details.get("writeErrors", []) if w.get("code") != 11000]
+            if fatal:
+                raise
+            return e.details.get("nInserted", 0), 0
+
+    def write_upsert(batch):
+        ops = [
+            UpdateOne(
+                {k: r[k] for k in PRODUCTION_KEY},
+                {"$set": {"quantityKwh": r["quantityKwh"], "updatedAt": r["updatedAt"]}},
+                upsert=True,
+            )
+            for r in batch
+        ]
+        res = collection.bulk_write(ops, ordered=False)
+        return res.upserted_count, res.modified_count
+
+    write = write_insert if mode == "insert" else write_upsert
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(write, _chunks(records, batch_size)))
+
+    seconds = time.perf_counter() - t0
+    return _report(
+        f"mongodb:{collection.full_name}",
+        len(records),
+        seconds,
+        mode=mode,
+        inserted=sum(r[0] for r in results),
+        modified=sum(r[1] for r in results),
+    )
+
+
+def load_to_mongo_timeseries(
+    df: pd.DataFrame,
+    collection,
+    batch_size: int = MONGO_BATCH_SIZE,
+    workers: int = 4,
+) -> Dict:
+    """
+    Write a production frame to the time-series collection (lib/mongo_timeseries.py).
+
+    Time-series collections have no unique index to upsert against, so the
+    hours in df are replaced: the covered range of each series is deleted,
+    then the measurements are inserted in concurrent unordered batches.
+    Re-running a load is therefore idempotent. Range deletes on time-series
+    collections need MongoDB 7.0+.
+
+    Parameters:
+        df: Frame from prepare_production_frame()
+        collection: pymongo Collection created by create_timeseries_collection()
+        batch_size: Measurements per insert_many call
+        workers: Number of batches in flight at once
+
+    Returns:
+        dict: Load report with rows, seconds and rows_per_s
+    """
+    from lib.mongo_timeseries import META_FIELD, TIME_FIELD, to_measurements
+
+    t0 = time.perf_counter()
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    spans = df.groupby(["priceArea", "productionGroup"], observed=True)["startTime"].agg(["min", "max"])
+    deleted = 0
+    for (area, group), row in spans.iterrows():
+        deleted += collection.delete_many({
+            f"{META_FIELD}.priceArea": area,
+            f"{META_FIELD}.productionGroup": group,
+            TIME_FIELD: {"$gte": row["min"].to_pydatetime(), "$lte": row["max"].to_pydatetime()},
+        }).deleted_count
+
+    measurements = to_measurements(df, now)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        inserted = sum(pool.map(lambda b: len(collection.insert_many(b, ordered=False).inserted_ids),
+                                _chunks(measurements, batch_size)))
+
+    return _report(
+        f"mongodb:{collection.full_name}",
+        len(measurements),
+        time.perf_counter() - t0,
+        mode="replace",
+        inserted=inserted,
+        replaced=deleted,
+    )
+
+
+# ---------------- Cassandra ----------------
+def _table_layout(session, table: str) -> Tuple[List[str], List[str]]:
+    """Read (partition key columns, all columns) of a table from cluster metadata."""
+    try:
+        meta = session.cluster.metadata.keyspaces[session.keyspace].tables[table]
+        return [c.name for c in meta.partition_key], list(meta.columns)
+    except (KeyError, AttributeError):
+        return ["pricearea", "productiongroup"], [c.lower() for c in PRODUCTION_COLUMNS]
+
+
+def load_to_cassandra(
+    df: pd.DataFrame,
+    session,
+    table: str,
+    batch_size: int = CASSANDRA_BATCH_SIZE,
+    concurrency: int = CASSANDRA_CONCURRENCY,
+) -> Dict:
+    """
+    Write a production frame to Cassandra with concurrent UNLOGGED batches.
+
+    Rows are grouped by the table's partition key so that every batch
+    touches a single partition (one replica set, no coordinator fan-out).
+    INSERT is an upsert in Cassandra, so re-running a load is idempotent.
+
+    Parameters:
+        df: Frame from prepare_production_frame()
+        session: Cassandra session connected to the keyspace
+        table: Target table (e.g. elhub_production_by_month)
+        batch_size: Rows per unlogged batch
+        concurrency: Batches in flight at once
+
+    Returns:
+        dict: Load report with rows, seconds, rows_per_s, failed_batches and
+              the distinct errors of the failed batches (every batch is
+              attempted; the caller decides whether failures are fatal)
+    """
+    from cassandra.concurrent import execute_concurrent
+    from cassandra.query import BatchStatement, BatchType
+
+    t0 = time.perf_counter()
+    pk, table_cols = _table_layout(session, table)
+
+    frame = df[PRODUCTION_COLUMNS].copy()
+    frame.columns = [c.lower() for c in PRODUCTION_COLUMNS]
+    if "year_month" in table_cols:
+        # Time-bucketed tables (lib/cassandra_schema.py)
+        frame["year_month"] = frame["starttime"].dt.year * 100 + frame["starttime"].dt.month
+
+    cols = list(frame.columns)
+    insert = session.prepare(
+        f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})"
+    )
+    pk = [c for c in pk if c in frame.columns]
+
+    batches = []
+    for _, part in frame.groupby(pk, sort=False, observed=True) if pk else [(None, frame)]:
+        rows = list(part.itertuples(index=False, name=None))
+        for chunk in _chunks(rows, batch_size):
+            batch = BatchStatement(batch_type=BatchType.UNLOGGED)
+            for row in chunk:
+                batch.add(insert, row)
+            batches.append((batch, None))
+
+    results = execute_concurrent(session, batches, concurrency=concurrency, raise_on_first_error=False)
+    errors = [result for ok, result in results if not ok]
+
+    seconds = time.perf_counter() - t0
+    return _report(
+        f"cassandra:{session.keyspace}.{table}",
+        len(frame),
+        seconds,
+        batches=len(batches),
+        failed_batches=len(errors),
+        errors=sorted({f"{type(e).__name__}: {e}" for e in errors})[:5],
+    )
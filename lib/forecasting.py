@@ -0,0 +1,259 @@
+"""
+Production forecasting - Assessment 4
+
+Two models per (area, group) series, both built on the hourly series from
+notebooks.utils_analysis._series:
+
+    stl_naive   STL decomposition; the trend is extended with the drift of
+                its last period and the seasonal component repeats its last
+                cycle. Fast enough to run interactively.
+    sarimax     statsmodels SARIMAX with a daily season, fitted on the last
+                `train_days` of data.
+
+forecast_all() fits every series in a process pool (one BLAS thread per
+worker, so it scales with cores) and writes one JSON file per fit to
+FIT_DIR with the parameters, fit statistics and a precomputed forecast.
+Later runs start the optimiser from the stored parameters, and the
+forecast page (pages/10_Forecast.py) only reads these files.
+
+Used by scripts/forecast_all.py. This module does not import Streamlit.
+"""
+
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+FIT_DIR = Path("data/forecast_fits")
+MODELS = ("stl_naive", "sarimax")
+
+DEFAULT_HORIZON = 24 * 7
+DEFAULT_TRAIN_DAYS = 60
+DEFAULT_ORDER = (1, 0, 1)
+DEFAULT_SEASONAL_ORDER = (1, 1, 1, 24)
+
+
+# ---------------- models ----------------
+def stl_naive_forecast(ts: pd.Series, horizon: int = DEFAULT_HORIZON, period: int = 24 * 7) -> pd.DataFrame:
+    """
+    STL + seasonal-naive baseline forecast.
+
+    Parameters:
+        ts: Hourly series with a DatetimeIndex (from _series)
+        horizon: Hours to forecast
+        period: Seasonal period in hours (default one week)
+
+    Returns:
+        pd.DataFrame: index = forecast hours, columns mean, lower, upper
+                      (lower/upper = +/- 1.96 x residual std)
+    """
+    from statsmodels.tsa.seasonal import STL
+
+    ts = ts.dropna()
+    period = min(period, max(2, len(ts) // 3))
+    res = STL(ts, period=period, robust=True).fit()
+
+    trend = res.trend.to_numpy()
+    drift = (trend[-1] - trend[-period]) / (period - 1) if len(trend) >= period else 0.0
+    steps = np.arange(1, horizon + 1)
+    last_cycle = res.seasonal.to_numpy()[-period:]
+    mean = trend[-1] + drift * steps + np.resize(last_cycle, horizon)
+    band = 1.96 * np.nanstd(res.resid.to_numpy())
+
+    index = pd.date_range(ts.index[-1] + pd.Timedelta(hours=1), periods=horizon, freq="h")
+    return pd.DataFrame({"mean": mean, "lower": mean - band, "upper": mean + band}, index=index)
+
+
+def fit_sarimax(values: np.ndarray, order=DEFAULT_ORDER, seasonal_order=DEFAULT_SEASONAL_ORDER,
+                start_params: Optional[Sequence[float]] = None, horizon: int = DEFAULT_HORIZON,
+                maxiter: int = 50) -> Dict:
+    """
+    Fit SARIMAX to an hourly array and forecast `horizon` steps.
+
+    Parameters:
+        values: Hourly observations (NaN allowed)
+        order, seasonal_order: SARIMAX orders
+        start_params: Warm start, e.g. the parameters of the previous fit
+        horizon: Hours to forecast
+        maxiter: Optimiser iterations
+
+    Returns:
+        dict: params, param_names, aic, converged, mean, lower, upper
+    """
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+    model = SARIMAX(values, order=order, seasonal_order=seasonal_order,
+                    enforce_stationarity=False, enforce_invertibility=False)
+    if start_params is not None and len(start_params) != len(model.start_params):
+        start_params = None
+    res = model.fit(start_params=start_params, disp=False, maxiter=maxiter)
+    fc = res.get_forecast(horizon)
+    conf = np.asarray(fc.conf_int(alpha=0.05))
+    return {
+        "params": [float(p) for p in res.params],
+        "param_names": list(model.param_names),
+        "aic": float(res.aic),
+        "converged": bool(res.mle_retvals.get("converged", False)) if res.mle_retvals else None,
+        "mean": [float(v) for v in np.asarray(fc.predicted_mean)],
+        "lower": [float(v) for v in conf[:, 0]],
+        "upper": [float(v) for v in conf[:, 1]],
+    }
+
+
+# ---------------- fit store ----------------
+def fit_path(area: str, group: str, model: str, fit_dir: Path = FIT_DIR) -> Path:
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", f"{area}_{group}_{model}").strip("_").lower()
+    return Path(fit_dir) / f"{slug}.json"
+
+
+def load_fit(area: str, group: str, model: str, fit_dir: Path = FIT_DIR) -> Optional[Dict]:
+    p = fit_path(area, group, model, fit_dir)
+    if not p.exists():
+        return None
+    return json.loads(p.read_text())
+
+
+def save_fit(fit: Dict, fit_dir: Path = FIT_DIR) -> Path:
+    p = fit_path(fit["area"], fit["group"], fit["model"], fit_dir)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_suffix(".tmp")
+    tmp.write_text(json.dumps(fit))
+    tmp.replace(p)  # readers never see a half-written file
+    return p
+
+
+def list_fits(fit_dir: Path = FIT_DIR) -> List[Dict]:
+    """All stored fits (without their forecast arrays) for overviews."""
+    out = []
+    for p in sorted(Path(fit_dir).glob("*.json")):
+        try:
+            fit = json.loads(p.read_text())
+        except (OSError, ValueError):
+            continue
+        out.append({k: v for k, v in fit.items() if k not in ("params", "mean", "lower", "upper")})
+    return out
+
+
+def forecast_frame(fit: Dict) -> pd.DataFrame:
+    """Stored forecast of a fit as a frame indexed by hour."""
+    index = pd.date_range(pd.Timestamp(fit["forecast_start"]), periods=len(fit["mean"]), freq="h")
+    return pd.DataFrame({"mean": fit["mean"], "lower": fit["lower"], "upper": fit["upper"]}, index=index)
+
+
+# ---------------- batch fitting ----------------
+def _worker_init():
+    # One BLAS thread per process: the pool provides the parallelism.
+    # Forked workers already have BLAS loaded, so the env vars alone are not
+    # enough; threadpoolctl (installed with scikit-learn) limits it at runtime
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = "1"
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(1)
+    except ImportError:
+        pass
+
+
+def _fit_one(area: str, group: str, model: str, values: np.ndarray, start: str,
+             horizon: int, order, seasonal_order, previous: Optional[Dict]) -> Dict:
+    """Fit one series (runs in a worker process)."""
+    t0 = time.perf_counter()
+    index = pd.date_range(pd.Timestamp(start), periods=len(values), freq="h")
+    fit = {
+        "area": area,
+        "group": group,
+        "model": model,
+        "train_start": str(index[0]),
+        "train_end": str(index[-1]),
+        "forecast_start": str(index[-1] + pd.Timedelta(hours=1)),
+        "horizon": horizon,
+        "nobs": int(np.isfinite(values).sum()),
+    }
+    if model == "stl_naive":
+        fc = stl_naive_forecast(pd.Series(values, index=index), horizon)
+        fit.update({"mean": fc["mean"].tolist(), "lower": fc["lower"].tolist(), "upper": fc["upper"].tolist()})
+    else:
+        warm = None
+        if previous and previous.get("order") == list(order) and previous.get("seasonal_order") == list(seasonal_order):
+            warm = previous.get("params")
+        fit.update(fit_sarimax(values, order, seasonal_order, start_params=warm, horizon=horizon))
+        fit.update({"order": list(order), "seasonal_order": list(seasonal_order), "warm_start": warm is not None})
+    fit["seconds"] = time.perf_counter() - t0
+    fit["fitted_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    return fit
+
+
+def forecast_all(
+    df: pd.DataFrame,
+    combos: Optional[Sequence[Tuple[str, str]]] = None,
+    models: Sequence[str] = MODELS,
+    workers: Optional[int] = None,
+    horizon: int = DEFAULT_HORIZON,
+    train_days: int = DEFAULT_TRAIN_DAYS,
+    order=DEFAULT_ORDER,
+    seasonal_order=DEFAULT_SEASONAL_ORDER,
+    fit_dir: Path = FIT_DIR,
+    reuse: bool = True,
+) -> pd.DataFrame:
+    """
+    Fit and store forecasts for many (area, group) series in a process pool.
+
+    Parameters:
+        df: Hourly production (priceArea, productionGroup, startTime, quantityKwh)
+        combos: (area, group) pairs (default: every pair in df)
+        models: Subset of MODELS
+        workers: Worker processes (default: os.cpu_count())
+        horizon: Hours to forecast
+        train_days: Days of history each model is fitted on
+        order, seasonal_order: SARIMAX orders
+        fit_dir: Where fits are stored
+        reuse: Skip series whose stored fit already covers the same training end
+
+    Returns:
+        pd.DataFrame: One row per fit (area, group, model, status, seconds, aic)
+    """
+    from notebooks.utils_analysis import _series
+
+    if combos is None:
+        combos = sorted(df[["priceArea", "productionGroup"]].drop_duplicates().itertuples(index=False, name=None))
+
+    jobs, report = [], []
+    for area, group in combos:
+        ts = _series(df, area, group)
+        if ts.empty:
+            report.append({"area": area, "group": group, "model": None, "status": "no data"})
+            continue
+        ts = ts.iloc[-train_days * 24:]
+        for model in models:
+            previous = load_fit(area, group, model, fit_dir)
+            if reuse and previous and previous.get("train_end") == str(ts.index[-1]) \
+                    and previous.get("horizon") == horizon:
+                report.append({"area": area, "group": group, "model": model, "status": "cached",
+                               "seconds": 0.0, "aic": previous.get("aic")})
+                continue
+            jobs.append((area, group, model, ts.to_numpy(dtype=float), str(ts.index[0]),
+                         horizon, order, seasonal_order, previous))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_worker_init) as pool:
+        futures = {pool.submit(_fit_one, *job): job for job in jobs}
+        for fut in as_completed(futures):
+            area, group, model = futures[fut][:3]
+            try:
+                fit = fut.result()
+                save_fit(fit, fit_dir)
+                status = "warm" if fit.get("warm_start") else "fitted"
+                report.append({"area": area, "group": group, "model": model, "status": status,
+                               "seconds": fit["seconds"], "aic": fit.get("aic")})
+            except Exception as e:
+                report.append({"area": area, "group": group, "model": model, "status": f"error: {e}"})
+
+    # Columns given so an empty report (no combos) still sorts
+    report = pd.DataFrame(report, columns=["area", "group", "model", "status", "seconds", "aic"])
+    return report.sort_values(["area", "group", "model"], na_position="last", ignore_index=True)
@@ -0,0 +1,205 @@
+"""
+Hot-path timing instrumentation - Assessment 4
+
+A small in-process tracer for the data access and analysis functions.
+Each call to an instrumented function records wall time, rows and
+bytes of the result and, for Streamlit-cached functions, whether the call
+was a cache hit. Records go into a fixed-size ring buffer that
+pages/08_Diagnostics.py shows and exports as JSON or Prometheus text.
+
+Enable with IND320_INSTRUMENT=1 (or from the diagnostics page). When
+disabled an instrumented call costs one flag check.
+
+    @instrumented("load_production_2021", cache=st.cache_data(max_entries=8))
+    def load_production_2021(): ...
+"""
+
+import functools
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+RING_SIZE = 4096
+
+_enabled = os.environ.get("IND320_INSTRUMENT", "0") == "1"
+_ring = deque(maxlen=RING_SIZE)
+_local = threading.local()
+
+
+def enable(flag: bool = True):
+    global _enabled
+    _enabled = bool(flag)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def clear():
+    _ring.clear()
+
+
+def _size_of(result):
+    """(rows, bytes) of a DataFrame/Series/ndarray result, without deep inspection."""
+    if hasattr(result, "memory_usage") and hasattr(result, "shape"):
+        usage = result.memory_usage(index=True)
+        return len(result), int(usage.sum() if hasattr(usage, "sum") else usage)
+    if hasattr(result, "nbytes") and hasattr(result, "shape"):
+        return (result.shape[0] if result.shape else 1), int(result.nbytes)
+    return None, None
+
+
+def _stack() -> list:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def annotate(rows: Optional[int] = None, nbytes: Optional[int] = None):
+    """Attach rows/bytes to the innermost active instrumented call."""
+    stack = getattr(_local, "stack", None)
+    if stack:
+        if rows is not None:
+            stack[-1]["rows"] = rows
+        if nbytes is not None:
+            stack[-1]["bytes"] = nbytes
+
+
+def _record(name: str, t0: float, frame: dict, cache: Optional[str]):
+    _ring.append({
+        "name": name,
+        "ts": time.time(),
+        "wall_ms": (time.perf_counter() - t0) * 1000,
+        "rows": frame["rows"],
+        "bytes": frame["bytes"],
+        "cache": cache,
+        "thread": threading.current_thread().name,
+    })
+
+
+def instrumented(name: Optional[str] = None, cache: Optional[Callable] = None):
+    """
+    Decorator recording each call of a function.
+
+    Parameters:
+        name: Label in the ring buffer (default: function qualname)
+        cache: Optional Streamlit cache decorator, e.g. st.cache_data() or
+               lib.data_version.versioned_cache(...).
+               The function is cached inside the timing wrapper, so cache
+               hits are recorded too and told apart from misses.
+    """
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def body(*args, **kwargs):
+            # Only runs on a cache miss (or always, when uncached)
+            stack = getattr(_local, "stack", None)
+            if stack:
+                stack[-1]["miss"] = True
+            return func(*args, **kwargs)
+
+        target = cache(body) if cache is not None else body
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return target(*args, **kwargs)
+            frame = {"rows": None, "bytes": None, "miss": False}
+            stack = _stack()
+            stack.append(frame)
+            t0 = time.perf_counter()
+            try:
+                result = target(*args, **kwargs)
+            finally:
+                stack.pop()
+            if frame["rows"] is None and frame["bytes"] is None:
+                frame["rows"], frame["bytes"] = _size_of(result)
+            state = None if cache is None else ("miss" if frame["miss"] else "hit")
+            _record(label, t0, frame, state)
+            return result
+
+        if hasattr(target, "clear"):
+            wrapper.clear = target.clear
+        return wrapper
+
+    return decorator
+
+
+# ---------------- reporting ----------------
+def records() -> List[Dict]:
+    return list(_ring)
+
+
+def percentile(values, q: float) -> Optional[float]:
+    """
+    Nearest-rank percentile of a sample (q in 0..100).
+
+    The one definition used for every latency summary of the app
+    (lib/health.py, lib/cassandra_cluster.py, bench/load_test.py).
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))]
+
+
+def summary() -> List[Dict]:
+    """Per-name aggregate of the ring buffer."""
+    by_name: Dict[str, List[Dict]] = {}
+    for r in list(_ring):
+        by_name.setdefault(r["name"], []).append(r)
+
+    out = []
+    for name, recs in sorted(by_name.items()):
+        walls = sorted(r["wall_ms"] for r in recs)
+        hits = sum(1 for r in recs if r["cache"] == "hit")
+        misses = sum(1 for r in recs if r["cache"] == "miss")
+        out.append({
+            "name": name,
+            "calls": len(recs),
+            "total_ms": sum(walls),
+            "p50_ms": percentile(walls, 50),
+            "p95_ms": percentile(walls, 95),
+            "max_ms": walls[-1],
+            "rows": sum(r["rows"] or 0 for r in recs),
+            "bytes": sum(r["bytes"] or 0 for r in recs),
+            "cache_hits": hits,
+            "cache_misses": misses,
+        })
+    return out
+
+
+def export_json() -> str:
+    return json.dumps({"summary": summary(), "records": records()}, default=str, indent=2)
+
+
+def export_prometheus() -> str:
+    """Prometheus text exposition of the per-name summary."""
+    lines = [
+        "# HELP ind320_call_seconds Wall time of instrumented calls.",
+        "# TYPE ind320_call_seconds summary",
+    ]
+    rows = summary()
+    for s in rows:
+        label = f'name="{s["name"]}"'
+        lines.append(f'ind320_call_seconds{{{label},quantile="0.5"}} {s["p50_ms"] / 1000:.6f}')
+        lines.append(f'ind320_call_seconds{{{label},quantile="0.95"}} {s["p95_ms"] / 1000:.6f}')
+        lines.append(f"ind320_call_seconds_sum{{{label}}} {s['total_ms'] / 1000:.6f}")
+        lines.append(f"ind320_call_seconds_count{{{label}}} {s['calls']}")
+    for metric, key, help_text in (
+        ("ind320_rows_total", "rows", "Rows returned by instrumented calls."),
+        ("ind320_bytes_total", "bytes", "Bytes returned by instrumented calls."),
+        ("ind320_cache_hits_total", "cache_hits", "Streamlit cache hits."),
+        ("ind320_cache_misses_total", "cache_misses", "Streamlit cache misses."),
+    ):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for s in rows:
+            lines.append(f'{metric}{{name="{s["name"]}"}} {s[key]}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,285 @@
+"""
+Local columnar data lake with an embedded SQL engine - Assessment 4
+
+Elhub production and ERA5 weather are stored as Hive-partitioned Parquet
+files under LAKE_DIR and queried in-process with DuckDB (no server):
+
+    data/lake/production/priceArea=NO5/year=2021/part_<uuid>.parquet
+    data/lake/era5/area=NO5/year=2021/part_<uuid>.parquet
+
+Queries are pushed down to the files: filters on the partition columns skip
+whole directories, time filters use the Parquet row-group statistics and
+only the referenced columns are read. DuckDB runs the aggregation on all
+cores and spills to LAKE_DIR/.tmp beyond LAKE_MEMORY_LIMIT, so the data
+does not have to fit in a worker's memory:
+
+    aggregate("production", by=("priceArea", "productionGroup"), bucket="month",
+              where={"priceArea": "NO5"}, start=datetime(2021, 1, 1))
+
+Each dataset keeps a version file that writers increment, so the
+Streamlit caches (lib/data_version.py, backend 'lake') refresh after a
+rebuild. Written by scripts/build_lake.py; read through
+lib.repository.LakeRepository. This module does not import Streamlit.
+"""
+
+import os
+import re
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+LAKE_DIR = Path(os.environ.get("IND320_LAKE", "data/lake"))
+LAKE_MEMORY_LIMIT = os.environ.get("IND320_LAKE_MEMORY", "1GB")
+
+# dataset -> time column, unique key and partition columns
+DATASETS = {
+    "production": {
+        "time": "startTime",
+        "key": ("priceArea", "productionGroup", "startTime"),
+        "partition": ("priceArea", "year"),
+    },
+    "era5": {
+        "time": "time",
+        "key": ("area", "time"),
+        "partition": ("area", "year"),
+    },
+}
+BUCKETS = ("hour", "day", "week", "month", "quarter", "year")
+AGGREGATES = ("sum", "avg", "min", "max", "count")
+
+_IDENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _ident(name: str) -> str:
+    """Quoted SQL identifier; rejects anything that is not a plain column name."""
+    if not _IDENT.match(name):
+        raise ValueError(f"Invalid column name: {name!r}")
+    return f'"{name}"'
+
+
+# ---------------- engine ----------------
+_con = None
+_con_lock = threading.Lock()
+
+
+def _cursor(lake_dir: Path = LAKE_DIR):
+    """A cursor on the process-wide DuckDB connection (one per query; cursors are thread-safe to create)."""
+    global _con
+    import duckdb
+
+    with _con_lock:
+        if _con is None:
+            tmp = Path(lake_dir) / ".tmp"
+            tmp.mkdir(parents=True, exist_ok=True)
+            _con = duckdb.connect(database=":memory:", config={
+                "threads": os.cpu_count() or 1,
+                "memory_limit": LAKE_MEMORY_LIMIT,
+                "temp_directory": str(tmp),
+            })
+        return _con.cursor()
+
+
+def _source(dataset: str, lake_dir: Path = LAKE_DIR) -> str:
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset: {dataset!r}")
+    glob = (Path(lake_dir) / dataset / "**" / "*.parquet").as_posix()
+    return f"read_parquet('{glob}', hive_partitioning = true, union_by_name = true)"
+
+
+def has_dataset(dataset: str, lake_dir: Path = LAKE_DIR) -> bool:
+    return any((Path(lake_dir) / dataset).glob("*=*/*=*/*.parquet"))
+
+
+def sql(query: str, params: Optional[Sequence] = None, lake_dir: Path = LAKE_DIR) -> pd.DataFrame:
+    """
+    Run an ad-hoc query. The datasets are available as views named after
+    them, e.g. "SELECT area, avg(temperature_2m) FROM era5 GROUP BY area".
+    """
+    cur = _cursor(lake_dir)
+    try:
+        for name in DATASETS:
+            if has_dataset(name, lake_dir):
+                cur.execute(f"CREATE OR REPLACE TEMP VIEW {name} AS SELECT * FROM {_source(name, lake_dir)}")
+        return cur.execute(query, list(params or [])).df()
+    finally:
+        cur.close()
+
+
+# ---------------- reading ----------------
+def _where(dataset: str, where: Optional[Dict], start, end) -> Tuple[str, List]:
+    time_col = DATASETS[dataset]["time"]
+    clauses, params = [], []
+    for col, value in (where or {}).items():
+        if isinstance(value, (list, tuple, set)):
+            values = list(value)
+            if not values:
+                clauses.append("FALSE")
+                continue
+            clauses.append(f"{_ident(col)} IN ({', '.join('?' for _ in values)})")
+            params.extend(values)
+        else:
+            clauses.append(f"{_ident(col)} = ?")
+            params.append(value)
+    # The year predicates prune partitions; the time predicates row groups
+    if start is not None:
+        start = pd.Timestamp(start)
+        clauses += ["year >= ?", f"{_ident(time_col)} >= ?"]
+        params += [start.year, start.to_pydatetime()]
+    if end is not None:
+        end = pd.Timestamp(end)
+        clauses += ["year <= ?", f"{_ident(time_col)} <= ?"]
+        params += [end.year, end.to_pydatetime()]
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def aggregate(
+    dataset: str,
+    by: Sequence[str] = (),
+    bucket: Optional[str] = None,
+    value: str = "quantityKwh",
+    agg: str = "sum",
+    where: Optional[Dict] = None,
+    start=None,
+    end=None,
+    lake_dir: Path = LAKE_DIR,
+) -> pd.DataFrame:
+    """
+    GROUP BY over a dataset, evaluated in the files.
+
+    Parameters:
+        dataset: 'production' or 'era5'
+        by: Grouping columns, e.g. ('priceArea', 'productionGroup')
+        bucket: Time bucket ('hour', 'day', 'month', ...; None = no time grouping)
+        value: Column to aggregate
+        agg: 'sum', 'avg', 'min', 'max' or 'count'
+        where: column -> value or list of values
+        start, end: Inclusive time range
+
+    Returns:
+        pd.DataFrame: by columns, the bucket start (named like the time
+                      column) when bucket is set, and the aggregate named
+                      like `value`, ordered by all grouping columns
+    """
+    if agg not in AGGREGATES:
+        raise ValueError(f"agg must be one of {AGGREGATES}, got {agg!r}")
+    if bucket is not None and bucket not in BUCKETS:
+        raise ValueError(f"bucket must be one of {BUCKETS}, got {bucket!r}")
+    time_col = DATASETS[dataset]["time"]
+
+    keys = [_ident(c) for c in by]
+    if bucket is not None:
+        keys.append(f"date_trunc('{bucket}', {_ident(time_col)}) AS {_ident(time_col)}")
+    select = keys + [f"{agg}({_ident(value)}) AS {_ident(value)}"]
+    where_sql, params = _where(dataset, where, start, end)
+    group = " GROUP BY ALL ORDER BY ALL" if len(select) > 1 else ""
+    query = f"SELECT {', '.join(select)} FROM {_source(dataset, lake_dir)}{where_sql}{group}"
+
+    cur = _cursor(lake_dir)
+    try:
+        df = cur.execute(query, params).df()
+    finally:
+        cur.close()
+    if time_col in df.columns:
+        df[time_col] = pd.to_datetime(df[time_col]).astype("datetime64[ns]")
+    return df
+
+
+def select(dataset: str, columns: Sequence[str], where: Optional[Dict] = None, start=None, end=None,
+           lake_dir: Path = LAKE_DIR) -> pd.DataFrame:
+    """Rows of the given columns matching the filter, ordered by the dataset key."""
+    key = [c for c in DATASETS[dataset]["key"] if c in columns]
+    where_sql, params = _where(dataset, where, start, end)
+    order = f" ORDER BY {', '.join(_ident(c) for c in key)}" if key else ""
+    query = f"SELECT {', '.join(_ident(c) for c in columns)} FROM {_source(dataset, lake_dir)}{where_sql}{order}"
+    cur = _cursor(lake_dir)
+    try:
+        df = cur.execute(query, params).df()
+    finally:
+        cur.close()
+    time_col = DATASETS[dataset]["time"]
+    if time_col in df.columns:
+        df[time_col] = pd.to_datetime(df[time_col]).astype("datetime64[ns]")
+    return df
+
+
+# ---------------- writing ----------------
+def read_lake_version(dataset: str, lake_dir: Path = LAKE_DIR) -> int:
+    p = Path(lake_dir) / dataset / "_version"
+    try:
+        return int(p.read_text().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def bump_lake_version(dataset: str, lake_dir: Path = LAKE_DIR) -> int:
+    version = read_lake_version(dataset, lake_dir) + 1
+    p = Path(lake_dir) / dataset / "_version"
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_suffix(".tmp")
+    tmp.write_text(str(version))
+    tmp.replace(p)
+    return version
+
+
+def write_dataset(dataset: str, df: pd.DataFrame, lake_dir: Path = LAKE_DIR) -> Dict:
+    """
+    Upsert rows into a dataset.
+
+    Only the partitions the frame touches are rewritten: their existing rows
+    are merged with the new ones (new rows win on the dataset key), written
+    to a staging directory and swapped in partition by partition.
+
+    Parameters:
+        dataset: 'production' or 'era5'
+        df: Rows with the dataset's key columns (naive UTC times)
+
+    Returns:
+        dict: rows written, partitions rewritten, new version
+    """
+    spec = DATASETS[dataset]
+    time_col, key, (part_col, _) = spec["time"], spec["key"], spec["partition"]
+    root = Path(lake_dir) / dataset
+    if df.empty:
+        return {"rows": 0, "partitions": 0, "version": read_lake_version(dataset, lake_dir)}
+
+    new = df.copy()
+    new[time_col] = pd.to_datetime(new[time_col])
+    new["year"] = new[time_col].dt.year
+    touched = sorted(set(zip(new[part_col].astype(str), new["year"].astype(int))))
+    existing = [str(p) for a, y in touched for p in (root / f"{part_col}={a}" / f"year={y}").glob("*.parquet")]
+
+    staging = root / f".staging_{uuid.uuid4().hex}"
+    cur = _cursor(lake_dir)
+    try:
+        cur.register("new_rows", new)
+        query = "SELECT * FROM new_rows"
+        if existing:
+            files = ", ".join(f"'{Path(f).as_posix()}'" for f in existing)
+            keys = ", ".join(_ident(c) for c in key)
+            query += (f" UNION ALL BY NAME SELECT old.* FROM read_parquet([{files}], hive_partitioning = true) old"
+                      f" ANTI JOIN new_rows USING ({keys})")
+        partition = ", ".join(_ident(c) for c in spec["partition"])
+        cur.execute(
+            f"COPY ({query}) TO '{staging.as_posix()}' "
+            f"(FORMAT PARQUET, PARTITION_BY ({partition}), FILENAME_PATTERN 'part_{{uuid}}')"
+        )
+        cur.unregister("new_rows")
+    finally:
+        cur.close()
+
+    for a, y in touched:
+        src = staging / f"{part_col}={a}" / f"year={y}"
+        dst = root / f"{part_col}={a}" / f"year={y}"
+        if not src.exists():
+            continue
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        if dst.exists():
+            shutil.rmtree(dst)
+        src.replace(dst)
+    shutil.rmtree(staging, ignore_errors=True)
+
+    return {"rows": int(len(new)), "partitions": len(touched), "version": bump_lake_version(dataset, lake_dir)}
@@ -0,0 +1,300 @@
+"""
+MongoDB time-series layout for production data - Assessment 4
+
+production_2021 stores one document per (area, group, hour), each with its
+own _id, field names and index entries. production_ts holds the same
+measurements in a native time-series collection:
+
+    timeField    startTime
+    metaField    meta = {priceArea, productionGroup}
+    granularity  hours
+
+MongoDB packs the hours of one series into compressed bucket documents, so
+a range scan reads a few buckets instead of one document per hour and
+$group/$dateTrunc aggregations run over the buckets.
+
+TimeSeriesCollection puts the flat production_2021 document shape in front
+of it: priceArea/productionGroup in filters, projections, distinct() and a
+leading $match are mapped to meta.*, and results come back flat. The
+repository, DeltaFrame and the rollup pipelines therefore read either
+layout unchanged. production_collection() picks the layout from
+IND320_MONGO_LAYOUT:
+
+    documents    production_2021 as before
+    timeseries   production_ts
+    auto         production_ts once scripts/migrate_mongo_timeseries.py has
+                 completed (its data version is > 0), else production_2021
+
+Time-series collections have no unique indexes, so loads replace the hours
+they cover instead of upserting them (lib/elhub_loader.load_to_mongo_timeseries;
+deletes on time ranges need MongoDB 7.0+).
+
+This module does not import Streamlit.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+SOURCE_COLLECTION = "production_2021"
+TS_COLLECTION = "production_ts"
+TIME_FIELD = "startTime"
+META_FIELD = "meta"
+META_KEYS = ("priceArea", "productionGroup")
+GRANULARITY = "hours"
+TS_BATCH_SIZE = 10_000
+LAYOUT_RECHECK_S = 300.0
+
+# Flat field -> expression reading it from the metaField
+_FLAT = {k: f"${META_FIELD}.{k}" for k in META_KEYS}
+_DEFAULT_PROJECTION = {"_id": 0, TIME_FIELD: 1, "quantityKwh": 1, "updatedAt": 1, **_FLAT}
+
+
+def timeseries_options() -> Dict:
+    return {"timeField": TIME_FIELD, "metaField": META_FIELD, "granularity": GRANULARITY}
+
+
+def create_timeseries_collection(db, name: str = TS_COLLECTION, drop: bool = False):
+    """
+    Create the time-series collection and its secondary indexes (idempotent).
+
+    Parameters:
+        db: pymongo Database (ind320)
+        name: Collection name
+        drop: Drop an existing collection first
+
+    Returns:
+        pymongo Collection
+    """
+    if drop:
+        db.drop_collection(name)
+    if not db.list_collection_names(filter={"name": name}):
+        db.create_collection(name, timeseries=timeseries_options())
+    coll = db[name]
+    coll.create_index([(f"{META_FIELD}.{k}", 1) for k in META_KEYS] + [(TIME_FIELD, 1)], name="series_time")
+    coll.create_index([("updatedAt", 1)], name="updated_at")  # DeltaFrame watermark reads
+    return coll
+
+
+# ---------------- flat <-> meta mapping ----------------
+def _field(name: str) -> str:
+    return f"{META_FIELD}.{name}" if name in META_KEYS else name
+
+
+def map_filter(filter_: Optional[Dict]) -> Dict:
+    """Flat production_2021 filter -> time-series filter."""
+    out = {}
+    for key, cond in (filter_ or {}).items():
+        if key in ("$and", "$or", "$nor"):
+            out[key] = [map_filter(f) for f in cond]
+        else:
+            out[_field(key)] = cond
+    return out
+
+
+def map_projection(projection: Optional[Dict]) -> Dict:
+    """Flat projection -> projection returning flat documents."""
+    if not projection:
+        return dict(_DEFAULT_PROJECTION)
+    return {k: (_FLAT[k] if k in _FLAT and v else v) for k, v in projection.items()}
+
+
+def map_pipeline(pipeline: List[Dict]) -> List[Dict]:
+    """Map a leading $match and flatten meta for the following stages."""
+    stages = list(pipeline)
+    if stages and next(iter(stages[0])) in ("$collStats", "$indexStats"):
+        return stages  # must stay the first stage; not about documents
+    head = []
+    if stages and "$match" in stages[0]:
+        head = [{"$match": map_filter(stages[0]["$match"])}]
+        stages = stages[1:]
+    return head + [{"$set": dict(_FLAT)}] + stages
+
+
+class TimeSeriesCollection:
+    """Read-side pymongo Collection facade over production_ts in the production_2021 shape."""
+
+    def __init__(self, collection):
+        self.raw = collection
+        self.name = collection.name
+        self.full_name = collection.full_name
+        self.database = collection.database
+
+    def find(self, filter_=None, projection=None, **kwargs):
+        return self.raw.find(map_filter(filter_), map_projection(projection), **kwargs)
+
+    def find_one(self, filter_=None, projection=None, **kwargs):
+        return self.raw.find_one(map_filter(filter_), map_projection(projection), **kwargs)
+
+    def distinct(self, field, filter_=None, **kwargs):
+        return self.raw.distinct(_field(field), map_filter(filter_), **kwargs)
+
+    def count_documents(self, filter_=None, **kwargs):
+        return self.raw.count_documents(map_filter(filter_), **kwargs)
+
+    def estimated_document_count(self, **kwargs):
+        from pymongo.errors import OperationFailure
+
+        try:
+            return self.raw.estimated_document_count(**kwargs)
+        except OperationFailure:
+            # Servers that treat the time-series namespace as a view
+            return self.raw.count_documents({})
+
+    def aggregate(self, pipeline, **kwargs):
+        return self.raw.aggregate(map_pipeline(pipeline), **kwargs)
+
+
+# ---------------- layout selection ----------------
+_layout: Dict[str, Tuple[float, bool]] = {}
+_layout_lock = threading.Lock()
+
+
+def layout_setting() -> str:
+    return os.environ.get("IND320_MONGO_LAYOUT", "auto").lower()
+
+
+def uses_timeseries(db, max_age: float = LAYOUT_RECHECK_S, layout: Optional[str] = None) -> bool:
+    """
+    Whether production is read from production_ts (see module docstring).
+
+    In auto mode the server is asked at most every max_age seconds; any
+    error (no permission, stand-in database) means the documents layout.
+    `layout` overrides IND320_MONGO_LAYOUT.
+    """
+    setting = (layout or layout_setting()).lower()
+    if setting in ("documents", "timeseries"):
+        return setting == "timeseries"
+
+    key = getattr(db, "name", "")
+    now = time.monotonic()
+    with _layout_lock:
+        checked, value = _layout.get(key, (None, False))
+    if checked is not None and now - checked < max_age:
+        return value
+    try:
+        from lib.data_version import read_mongo_version
+
+        exists = db.list_collection_names(filter={"name": TS_COLLECTION, "type": "timeseries"})
+        value = bool(exists) and read_mongo_version(db, TS_COLLECTION) > 0
+    except Exception:
+        value = False
+    with _layout_lock:
+        _layout[key] = (now, value)
+    return value
+
+
+def production_collection(db, name: str = SOURCE_COLLECTION, layout: Optional[str] = None):
+    """
+    Collection production is read from (and loaded into), and the name its data version is kept under.
+
+    Returns:
+        (collection, str): TimeSeriesCollection over production_ts when the
+                           time-series layout is active, else db[name]
+    """
+    if name == SOURCE_COLLECTION and uses_timeseries(db, layout=layout):
+        return TimeSeriesCollection(db[TS_COLLECTION]), TS_COLLECTION
+    return db[name], name
+
+
+# ---------------- writes ----------------
+def _as_datetime(value) -> datetime:
+    # Legacy documents may hold ISO strings or tz-aware times; time fields must be naive UTC dates
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value
+    ts = pd.Timestamp(value)
+    return (ts.tz_convert("UTC").tz_localize(None) if ts.tzinfo else ts).to_pydatetime()
+
+
+def to_measurements(df: pd.DataFrame, updated_at: datetime) -> List[Dict]:
+    """Production rows -> time-series measurements, sorted by series and time for dense buckets."""
+    df = df.sort_values(["priceArea", "productionGroup", TIME_FIELD])
+    return [
+        {TIME_FIELD: t, META_FIELD: {"priceArea": a, "productionGroup": g}, "quantityKwh": float(q),
+         "updatedAt": updated_at}
+        for a, g, t, q in zip(df["priceArea"], df["productionGroup"],
+                              df[TIME_FIELD].dt.to_pydatetime(), df["quantityKwh"])
+    ]
+
+
+def _series_totals(collection, pipeline_head: List[Dict]) -> Dict[Tuple[str, str], Tuple[int, float]]:
+    rows = collection.aggregate(pipeline_head + [
+        {"$group": {"_id": {"a": "$priceArea", "g": "$productionGroup"},
+                    "n": {"$sum": 1}, "kwh": {"$sum": "$quantityKwh"}}},
+    ])
+    return {(r["_id"]["a"], r["_id"]["g"]): (int(r["n"]), float(r["kwh"] or 0.0)) for r in rows}
+
+
+def migrate_to_timeseries(db, source: str = SOURCE_COLLECTION, target: str = TS_COLLECTION,
+                          batch_size: int = TS_BATCH_SIZE, drop: bool = False,
+                          progress: Optional[Callable[[str, int], None]] = None) -> Dict:
+    """
+    Copy a production_2021-shaped collection into a time-series collection, series by series.
+
+    Series already copied completely (same count) are skipped, others are
+    deleted from the target (a metaField-only delete, which every
+    time-series version supports) and copied again, so an interrupted run
+    can simply be restarted. Measurements keep their updatedAt.
+
+    Parameters:
+        db: pymongo Database (ind320)
+        source: Documents collection
+        target: Time-series collection (created if missing)
+        batch_size: Measurements per insert_many
+        drop: Recreate the target from scratch
+        progress: Optional callback(series label, rows copied)
+
+    Returns:
+        dict: rows copied, series copied/skipped, seconds and the series
+              whose counts or totals differ after the copy (should be empty)
+    """
+    t0 = time.perf_counter()
+    ts = create_timeseries_collection(db, target, drop=drop)
+    flat = TimeSeriesCollection(ts)
+    src = db[source]
+    wanted = _series_totals(src, [])
+    have = _series_totals(flat, [])
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    copied = skipped = 0
+    for (area, group), (n, _) in sorted(wanted.items()):
+        if have.get((area, group), (None,))[0] == n:
+            skipped += 1
+            continue
+        meta = {"priceArea": area, "productionGroup": group}
+        ts.delete_many({f"{META_FIELD}.{k}": v for k, v in meta.items()})
+        cursor = (src.find({"priceArea": area, "productionGroup": group},
+                           {"_id": 0, TIME_FIELD: 1, "quantityKwh": 1, "updatedAt": 1})
+                  .sort(TIME_FIELD, 1).batch_size(batch_size))
+        batch, rows = [], 0
+        for doc in cursor:
+            batch.append({TIME_FIELD: _as_datetime(doc[TIME_FIELD]), META_FIELD: meta,
+                          "quantityKwh": doc.get("quantityKwh"), "updatedAt": doc.get("updatedAt") or now})
+            if len(batch) >= batch_size:
+                ts.insert_many(batch, ordered=False)
+                rows += len(batch)
+                batch = []
+        if batch:
+            ts.insert_many(batch, ordered=False)
+            rows += len(batch)
+        copied += rows
+        if progress:
+            progress(f"{area}/{group}", rows)
+
+    after = _series_totals(flat, [])
+    mismatched = [
+        f"{a}/{g}" for (a, g), (n, kwh) in sorted(wanted.items())
+        if after.get((a, g), (0, 0.0))[0] != n or abs(after[(a, g)][1] - kwh) > 1e-6 * max(1.0, abs(kwh))
+    ]
+    return {
+        "rows": copied,
+        "series": len(wanted),
+        "series_copied": len(wanted) - skipped,
+        "series_skipped": skipped,
+        "seconds": time.perf_counter() - t0,
+        "mismatched": mismatched,
+    }
@@ -3,13 +3,27 @@
 # ERA5 download helpers for Open-Meteo + a cache helper for Streamlit pages.
 
 from __future__ import annotations
+import time
 import requests
 import pandas as pd
 import numpy as np
 
+from lib.cache_metrics import record, size_of
+from lib.instrumentation import instrumented
+
 # ---- Default hourly variables we use across the assignment ----
 HOURLY_VARS = ["temperature_2m", "precipitation", "relative_humidity_2m", "wind_speed_10m"]
 
+# ---- Representative city per Elhub price area: (city, lat, lon) ----
+AREA_CITIES = {
+    "NO1": ("Oslo", 59.9139, 10.7522),
+    "NO2": ("Kristiansand", 58.1467, 7.9956),
+    "NO3": ("Trondheim", 63.4305, 10.3951),
+    "NO4": ("Tromsø", 69.6492, 18.9553),
+    "NO5": ("Bergen", 60.3929, 5.3241),
+}
+
+@instrumented("fetch_era5")
 def fetch_era5(lat: float, lon: float, year: int, hourly_vars: list[str] = HOURLY_VARS) -> pd.DataFrame:
     """
     Download ERA5 hourly data (UTC) for one location/year with selected variables.
@@ -37,22 +51,66 @@ def fetch_era5(lat: float, lon: float, year: int, hourly_vars: list[str] = HOURL
     return df
 
 
+def load_area_era5(area_code: str, year: int) -> pd.DataFrame:
+    """
+    ERA5 for a price area's city (AREA_CITIES) and year: from the cold-start
+    snapshot (lib/snapshot.py) or the local Parquet lake (lib/lake.py) when
+    they have it, otherwise downloaded. With the host-wide shared store
+    enabled (lib/shared_store.py) the result is a read-only mapped view
+    that one replica loads for all.
+    """
+    from lib.shared_store import shared_store_enabled, shared_table
+
+    if shared_store_enabled():
+        return shared_table(f"era5-{area_code}-{year}", lambda: _load_area_era5(area_code, year))
+    return _load_area_era5(area_code, year)
+
+
+def _load_area_era5(area_code: str, year: int) -> pd.DataFrame:
+    from lib.snapshot import era5_frame, load_snapshot
+
+    snap = load_snapshot()
+    if snap is not None:
+        df = era5_frame(snap, area_code, year)
+        if df is not None:
+            return df
+
+    from lib.lake import has_dataset, select
+    if has_dataset("era5"):
+        try:
+            df = select("era5", ["time", *HOURLY_VARS], where={"area": area_code},
+                        start=f"{year}-01-01", end=f"{year}-12-31 23:00")
+        except Exception:
+            df = pd.DataFrame()
+        if not df.empty:
+            df["time"] = df["time"].dt.tz_localize("UTC")
+            return df
+    _, lat, lon = AREA_CITIES[area_code]
+    return fetch_era5(lat=lat, lon=lon, year=year)
+
+
 # ------------ Streamlit cache helper ------------
 # Lets Analysis pages work even after a cold start in the cloud.
 def get_or_fetch_era5(st, area_code: str, lat: float, lon: float, year: int = 2021,
                       hourly_vars: list[str] = HOURLY_VARS) -> pd.DataFrame:
     """
     Ensure ERA5 df exists in st.session_state. Returns a DataFrame guaranteed to exist.
-    Cache key is (area_code, year, hourly_vars).
+    Cache key is (area_code, year, hourly_vars). Lookups are reported to
+    lib/cache_metrics.py as the "era5_session" cache, one entry per session.
     """
     key = f"era5_{area_code}_{year}_{'+'.join(hourly_vars)}"
     if "era5_cache" not in st.session_state:
         st.session_state["era5_cache"] = {}
 
     cache = st.session_state["era5_cache"]
+    entry = (id(cache), key)
     if key in cache and isinstance(cache[key], pd.DataFrame) and not cache[key].empty:
+        record("era5_session", "session_state", hit=True, key=entry)
         return cache[key]
 
+    t0 = time.perf_counter()
     df = fetch_era5(lat=lat, lon=lon, year=year, hourly_vars=hourly_vars)
     cache[key] = df
+    record("era5_session", "session_state", hit=False, key=entry,
+           seconds=time.perf_counter() - t0, nbytes=size_of(df))
     return df
@@ -0,0 +1,158 @@
+"""
+Background cache warming for the analysis pages - Assessment 4
+
+The home page starts one Prefetcher per process. Its worker threads call the
+same cached loaders the pages use, so by the time a visitor navigates to
+Price Area, Analysis A or Weather Correlation their data is already in the
+shared Streamlit caches:
+
+    production      full hourly frame, the 2021 hourly and monthly views
+    availability    (area -> groups) map of the Analysis A page
+    era5            ERA5 for each area's city (lib/open_meteo.AREA_CITIES)
+
+The work is bounded (a fixed number of workers and a time budget) and can be
+cancelled; progress is readable at any time without blocking, like the
+health probe in lib/health.py.
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from lib.cache_metrics import cache_resource
+
+PREFETCH_WORKERS = 2
+PREFETCH_BUDGET_S = 180.0
+PREFETCH_YEAR = 2021
+
+
+# ---------------- shared cached loaders ----------------
+@cache_resource(show_spinner=False)
+def cached_area_era5(area: str, year: int) -> pd.DataFrame:
+    """
+    ERA5 for an area's city and year (historical data, cached for the
+    process lifetime). Returned as is, not copied per call - do not modify.
+    """
+    from lib.open_meteo import load_area_era5
+
+    return load_area_era5(area, year)
+
+
+def default_tasks(year: int = PREFETCH_YEAR) -> List[Tuple[str, Callable[[], object]]]:
+    """(label, loader) pairs for the data the analysis pages open with."""
+    from lib.open_meteo import AREA_CITIES
+    from lib.repository import cached_availability, cached_query, get_repository
+
+    start, end = datetime(year, 1, 1), datetime(year, 12, 31, 23)
+
+    def repo_task(**kwargs):
+        return lambda: cached_query(get_repository(), **kwargs)
+
+    tasks = [
+        ("production (all hours)", repo_task()),
+        (f"production {year} (hourly)", repo_task(start=start, end=end)),
+        (f"production {year} (monthly)", repo_task(start=start, end=end, resolution="month")),
+        ("availability map", lambda: cached_availability(get_repository())),
+    ]
+    for area, (city, _, _) in AREA_CITIES.items():
+        tasks.append((f"ERA5 {area} ({city}) {year}", lambda a=area: cached_area_era5(a, year)))
+    return tasks
+
+
+class Prefetcher:
+    """
+    Runs loader tasks on a few daemon threads.
+
+    Tasks are taken in order; a worker stops picking new ones once the run
+    is cancelled or the time budget is spent. A task already running is
+    allowed to finish (loaders cannot be interrupted safely).
+    """
+
+    def __init__(self, tasks: List[Tuple[str, Callable[[], object]]],
+                 workers: int = PREFETCH_WORKERS, budget_s: float = PREFETCH_BUDGET_S):
+        self.workers = max(1, workers)
+        self.budget_s = budget_s
+        self._queue = deque(tasks)
+        self._total = len(tasks)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._started = None
+        self._running: Dict[str, float] = {}
+        self._done: List[Dict] = []
+
+    def _next(self) -> Optional[Tuple[str, Callable]]:
+        with self._lock:
+            if self._stop.is_set() or not self._queue:
+                return None
+            if time.perf_counter() - self._started > self.budget_s:
+                self._stop.set()
+                return None
+            label, fn = self._queue.popleft()
+            self._running[label] = time.perf_counter()
+            return label, fn
+
+    def _run(self):
+        while True:
+            task = self._next()
+            if task is None:
+                return
+            label, fn = task
+            error = None
+            try:
+                fn()
+            except Exception as e:
+                error = str(e)
+            with self._lock:
+                t0 = self._running.pop(label)
+                self._done.append({"task": label, "seconds": time.perf_counter() - t0, "error": error})
+
+    def start(self) -> "Prefetcher":
+        if self._started is None:
+            self._started = time.perf_counter()
+            for i in range(min(self.workers, self._total)):
+                # No script context is attached: the loaders only fill the
+                # process-wide caches and must not write into a visitor's page
+                t = threading.Thread(target=self._run, name=f"prefetch-{i}", daemon=True)
+                self._threads.append(t)
+                t.start()
+        return self
+
+    def cancel(self):
+        """Stop after the tasks currently running."""
+        self._stop.set()
+
+    # -------- readers (never block on a task) --------
+    def progress(self) -> Dict:
+        """
+        Returns:
+            dict: total, done, failed, running (labels), pending, finished,
+                  cancelled, elapsed_s, tasks (one dict per completed task)
+        """
+        with self._lock:
+            done = list(self._done)
+            running = list(self._running)
+            pending = len(self._queue)
+        finished = not running and (pending == 0 or self._stop.is_set())
+        return {
+            "total": self._total,
+            "done": len(done),
+            "failed": sum(1 for d in done if d["error"]),
+            "running": running,
+            "pending": pending,
+            "finished": finished,
+            "cancelled": self._stop.is_set() and pending > 0,
+            "elapsed_s": time.perf_counter() - self._started if self._started else 0.0,
+            "tasks": done,
+        }
+
+
+@st.cache_resource
+def get_prefetcher() -> Prefetcher:
+    """Process-wide prefetcher, started on the first home page render."""
+    return Prefetcher(default_tasks()).start()
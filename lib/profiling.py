@@ -0,0 +1,159 @@
+"""
+On-demand page profiling - Assessment 4
+
+app.py runs every page through st.navigation and wraps the page run in
+profile_run(). When profiling is requested - ?profile=1 in the page URL or
+IND320_PROFILE=1 in the environment - the rerun is sampled with
+pyinstrument and three files are written to PROFILE_DIR:
+
+    <stamp>_<page>.speedscope.json   flame graph, open in https://speedscope.app
+    <stamp>_<page>.html              pyinstrument's interactive call tree
+    <stamp>_<page>.json              summary: wall time, per-package and
+                                     per-function self time
+
+The per-package split shows whether a rerun waits on pymongo, pandas,
+statsmodels or plotly. pages/08_Diagnostics.py lists recent profiles.
+
+When profiling is not requested, profile_run() costs one environment and
+one query-parameter lookup; pyinstrument is not imported.
+"""
+
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+PROFILE_DIR = Path(os.environ.get("IND320_PROFILE_DIR", "data/diagnostics/profiles"))
+PROFILE_INTERVAL_S = 0.001
+PROFILE_KEEP = 50
+TOP_FUNCTIONS = 40
+
+
+def profiling_requested() -> bool:
+    if os.environ.get("IND320_PROFILE", "0") == "1":
+        return True
+    import streamlit as st
+
+    try:
+        return st.query_params.get("profile", "0") not in ("", "0", "false")
+    except Exception:
+        return False
+
+
+def _package_of(path: str) -> str:
+    """Top-level package of a source file ('pandas', 'pymongo', 'lib', ...)."""
+    p = Path(path or "?")
+    parts = p.parts
+    for marker in ("site-packages", "dist-packages"):
+        if marker in parts:
+            i = parts.index(marker)
+            return parts[i + 1].split(".")[0] if i + 1 < len(parts) else marker
+    try:
+        rel = p.resolve().relative_to(Path.cwd().resolve())
+        return rel.parts[0] if len(rel.parts) > 1 else rel.stem
+    except (ValueError, OSError):
+        return "stdlib" if "python" in str(p).lower() else p.stem
+
+
+def _summarise(root) -> Dict:
+    """Self time per function and per package from a pyinstrument frame tree."""
+    by_function = defaultdict(lambda: {"self_s": 0.0, "total_s": 0.0, "calls": 0})
+    by_package = defaultdict(float)
+
+    def walk(frame, active):
+        key = (frame.function, getattr(frame, "file_path_short", None) or frame.file_path, frame.line_no)
+        self_time = max(0.0, frame.time - sum(c.time for c in frame.children))
+        stats = by_function[key]
+        stats["self_s"] += self_time
+        stats["calls"] += 1
+        if key not in active:
+            stats["total_s"] += frame.time  # recursion counted once
+        by_package[_package_of(frame.file_path)] += self_time
+        for child in frame.children:
+            walk(child, active | {key})
+
+    if root is not None:
+        walk(root, frozenset())
+
+    functions = sorted(
+        ({"function": f, "file": path, "line": line, **s} for (f, path, line), s in by_function.items()),
+        key=lambda r: r["self_s"], reverse=True,
+    )[:TOP_FUNCTIONS]
+    packages = sorted(({"package": k, "self_s": v} for k, v in by_package.items()),
+                      key=lambda r: r["self_s"], reverse=True)
+    return {"functions": functions, "packages": packages}
+
+
+def _prune(keep: int = PROFILE_KEEP):
+    summaries = sorted(PROFILE_DIR.glob("*.json"), key=lambda p: p.name)
+    summaries = [p for p in summaries if not p.name.endswith(".speedscope.json")]
+    for old in summaries[:-keep]:
+        stem = old.name[:-len(".json")]
+        for p in PROFILE_DIR.glob(f"{stem}.*"):
+            p.unlink(missing_ok=True)
+
+
+@contextmanager
+def profile_run(page: str):
+    """
+    Profile the enclosed page run if profiling is requested, otherwise do nothing.
+
+    Parameters:
+        page: Page title, used in the file names and the summary
+    """
+    if not profiling_requested():
+        yield
+        return
+    try:
+        from pyinstrument import Profiler
+        from pyinstrument.renderers import SpeedscopeRenderer
+    except ImportError:
+        yield  # profiling is best effort: the page still renders
+        return
+
+    profiler = Profiler(interval=PROFILE_INTERVAL_S, async_mode="disabled")
+    started = datetime.now(timezone.utc)
+    t0 = time.perf_counter()
+    profiler.start()
+    try:
+        yield
+    finally:
+        # st.stop()/st.rerun() end a run with an exception; still record it
+        session = profiler.stop()
+        wall = time.perf_counter() - t0
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        stem = f"{started.strftime('%Y%m%dT%H%M%S%f')}_{re.sub(r'[^A-Za-z0-9]+', '_', page).strip('_')}"
+        (PROFILE_DIR / f"{stem}.speedscope.json").write_text(profiler.output(renderer=SpeedscopeRenderer()))
+        (PROFILE_DIR / f"{stem}.html").write_text(profiler.output_html())
+        summary = {
+            "page": page,
+            "started": started.isoformat(timespec="seconds"),
+            "wall_s": wall,
+            "sampled_s": session.duration,
+            "samples": session.sample_count,
+            **_summarise(session.root_frame()),
+        }
+        (PROFILE_DIR / f"{stem}.json").write_text(json.dumps(summary, indent=1))
+        _prune()
+
+
+def list_profiles(limit: int = 20) -> List[Dict]:
+    """Most recent profile summaries, newest first, with the paths of their files."""
+    out = []
+    files = sorted((p for p in PROFILE_DIR.glob("*.json") if not p.name.endswith(".speedscope.json")),
+                   key=lambda p: p.name, reverse=True)
+    for p in files[:limit]:
+        try:
+            summary = json.loads(p.read_text())
+        except (OSError, ValueError):
+            continue
+        stem = p.name[:-len(".json")]
+        summary["speedscope"] = str(PROFILE_DIR / f"{stem}.speedscope.json")
+        summary["html"] = str(PROFILE_DIR / f"{stem}.html")
+        out.append(summary)
+    return out
@@ -0,0 +1,606 @@
+"""
+Backend-agnostic access to Elhub production data - Assessment 4
+
+Pages ask a ProductionRepository for data instead of importing a database
+client directly:
+
+    repo = get_repository()
+    df = cached_query(repo, area="NO5", groups=["hydro"], start=..., end=..., resolution="hour")
+
+Every implementation returns the same frame layout
+(priceArea, productionGroup, startTime, quantityKwh); for 'day' and 'month'
+resolution startTime is the start of the period and quantityKwh its total.
+
+    MongoRepository      ind320.production_2021 (or its time-series copy) + rollup collections
+    CassandraRepository  time-bucketed tables + rollup tables
+    LakeRepository       partitioned local Parquet files queried with DuckDB
+    FrameRepository      an in-memory frame or a local columnar file (tests, demos)
+    RoutedRepository     recent hourly reads to one backend, the rest to another
+
+The Streamlit result cache sits above the interface (cached_query and
+friends), so it behaves the same for every backend. Cached results are keyed
+on the data version of the repository's sources (lib/data_version.py) and
+refresh when an ingest bumps it.
+"""
+
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+import streamlit as st
+
+from lib.cache_metrics import cache_data, cache_resource
+from lib.cassandra_cluster import idempotent
+from lib.cassandra_schema import PRODUCTION_TABLE, month_buckets, read_slices
+from lib.data_version import CACHE_MAX_ENTRIES, current_version, version_of
+from lib.elhub_loader import drop_placeholder_groups
+from lib.instrumentation import instrumented
+from lib.mongo_timeseries import production_collection
+from lib.rollups import CASSANDRA_DAILY, CASSANDRA_MONTHLY, MONGO_DAILY, MONGO_MONTHLY
+
+COLUMNS = ["priceArea", "productionGroup", "startTime", "quantityKwh"]
+RESOLUTIONS = ("hour", "day", "month")
+_PERIOD_FREQ = {"day": "D", "month": "M"}
+
+
+def _empty() -> pd.DataFrame:
+    return pd.DataFrame({c: pd.Series(dtype=t) for c, t in
+                         zip(COLUMNS, ["object", "object", "datetime64[ns]", "float64"])})
+
+
+def _check_resolution(resolution: str):
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"resolution must be one of {RESOLUTIONS}, got {resolution!r}")
+
+
+def _stats_of(df: pd.DataFrame) -> Dict:
+    if df.empty:
+        return {"rows": 0, "first": None, "last": None, "total_kwh": 0.0}
+    return {
+        "rows": int(len(df)),
+        "first": df["startTime"].min(),
+        "last": df["startTime"].max(),
+        "total_kwh": float(df["quantityKwh"].sum()),
+    }
+
+
+class ProductionRepository(ABC):
+    """Shared query interface for production data."""
+
+    name = "base"
+    # (backend, collection/table) watermarks the data depends on; empty = static
+    sources = ()
+
+    @abstractmethod
+    def query(
+        self,
+        area: Optional[str] = None,
+        groups: Optional[Sequence[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        resolution: str = "hour",
+    ) -> pd.DataFrame:
+        """
+        Production rows for an area, groups and inclusive time range.
+
+        Parameters:
+            area: Price area (None = all)
+            groups: Production groups (None = all)
+            start, end: Inclusive time range (None = unbounded)
+            resolution: 'hour', 'day' or 'month'
+
+        Returns:
+            pd.DataFrame: priceArea, productionGroup, startTime, quantityKwh
+        """
+
+    @abstractmethod
+    def distinct(self, field: str, area: Optional[str] = None) -> List[str]:
+        """Sorted distinct values of 'priceArea' or 'productionGroup'."""
+
+    def stats(
+        self,
+        area: Optional[str] = None,
+        groups: Optional[Sequence[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Dict:
+        """
+        Summary of the hourly rows matching a filter.
+
+        Returns:
+            dict: rows, first, last, total_kwh
+        """
+        return _stats_of(self.query(area, groups, start, end, "hour"))
+
+    def in_memory(self, area=None, groups=None, start=None, end=None, resolution="hour") -> bool:
+        """True when the query is answered from a frame the repository already holds."""
+        return False
+
+    def availability(self) -> pd.DataFrame:
+        """Hourly row count per (priceArea, productionGroup), sorted."""
+        return (self.query().groupby(["priceArea", "productionGroup"], observed=True).size()
+                .reset_index(name="n").sort_values(["priceArea", "productionGroup"], ignore_index=True))
+
+
+# ---------------- In-memory / local file ----------------
+class FrameRepository(ProductionRepository):
+    """Repository over an in-memory frame, e.g. for tests and offline demos."""
+
+    name = "memory"
+
+    def __init__(self, df: pd.DataFrame, name: Optional[str] = None):
+        df = df[COLUMNS].copy()
+        df["startTime"] = pd.to_datetime(df["startTime"])
+        self.df = df.sort_values(["priceArea", "productionGroup", "startTime"], ignore_index=True)
+        if name:
+            self.name = name
+
+    @classmethod
+    def from_file(cls, path: str) -> "FrameRepository":
+        """Load a Parquet (needs pyarrow) or CSV export of the production data."""
+        p = Path(path)
+        df = pd.read_parquet(p) if p.suffix == ".parquet" else pd.read_csv(p)
+        return cls(df, name=f"file:{p.name}")
+
+    def _filter(self, area, groups, start, end) -> pd.DataFrame:
+        mask = pd.Series(True, index=self.df.index)
+        if area is not None:
+            mask &= self.df["priceArea"] == area
+        if groups is not None:
+            mask &= self.df["productionGroup"].isin(list(groups))
+        if start is not None:
+            mask &= self.df["startTime"] >= pd.Timestamp(start)
+        if end is not None:
+            mask &= self.df["startTime"] <= pd.Timestamp(end)
+        return self.df[mask]
+
+    def query(self, area=None, groups=None, start=None, end=None, resolution="hour"):
+        _check_resolution(resolution)
+        df = self._filter(area, groups, start, end)
+        if resolution == "hour":
+            return df.reset_index(drop=True)
+        period = df["startTime"].dt.to_period(_PERIOD_FREQ[resolution]).dt.start_time
+        return (
+            df.assign(startTime=period)
+            .groupby(["priceArea", "productionGroup", "startTime"], as_index=False, observed=True)
+            ["quantityKwh"].sum()
+        )
+
+    def distinct(self, field, area=None):
+        df = self.df if area is None else self.df[self.df["priceArea"] == area]
+        return sorted(df[field].dropna().unique().tolist())
+
+
+# ---------------- MongoDB ----------------
+class MongoRepository(ProductionRepository):
+    """
+    Hourly reads from production_2021 or production_ts, day/month reads from
+    the rollups, or aggregated from the hourly collection while there are none.
+    """
+
+    name = "mongodb"
+
+    def __init__(self, client, database: str = "ind320", collection: str = "production_2021", frame=None,
+                 snapshot=None):
+        self.db = client[database]
+        # production_ts behind a flat facade once the time-series layout is active (lib/mongo_timeseries.py)
+        self.collection, name = production_collection(self.db, collection)
+        self.sources = (("mongodb", name),)
+        # Optional lib.delta_frame.DeltaFrame serving unfiltered hourly reads
+        self.frame = frame
+        # Optional lib.snapshot.Snapshot serving monthly reads while it is current
+        self.snapshot = snapshot
+        self._snapshot_monthly = None
+
+    @staticmethod
+    def _match(area, groups, start, end, time_field="startTime") -> dict:
+        match = {}
+        if area is not None:
+            match["priceArea"] = area
+        if groups is not None:
+            match["productionGroup"] = {"$in": list(groups)}
+        if start is not None or end is not None:
+            match[time_field] = {}
+            if start is not None:
+                match[time_field]["$gte"] = pd.Timestamp(start).to_pydatetime()
+            if end is not None:
+                match[time_field]["$lte"] = pd.Timestamp(end).to_pydatetime()
+        return match
+
+    def in_memory(self, area=None, groups=None, start=None, end=None, resolution="hour"):
+        unfiltered = area is None and groups is None and start is None and end is None
+        return resolution == "hour" and unfiltered and self.frame is not None
+
+    def query(self, area=None, groups=None, start=None, end=None, resolution="hour"):
+        _check_resolution(resolution)
+        if self.in_memory(area, groups, start, end, resolution):
+            # Whole history: refresh the held frame by delta instead of re-downloading
+            self.frame.sync(current_version(*self.sources[0]))
+            df = drop_placeholder_groups(self.frame.df)
+            return df.copy(deep=False) if not df.empty else _empty()
+        if resolution == "hour":
+            coll, field = self.collection, "startTime"
+        else:
+            field = resolution
+            coll = self.db[MONGO_DAILY if resolution == "day" else MONGO_MONTHLY]
+            if start is not None:
+                start = pd.Timestamp(start).to_period(_PERIOD_FREQ[resolution]).start_time
+            if resolution == "month" and self._snapshot_current(MONGO_MONTHLY):
+                if self._snapshot_monthly is None:
+                    self._snapshot_monthly = FrameRepository(self.snapshot.table(MONGO_MONTHLY))
+                # Rows are month starts, so the hourly range filter selects months
+                return self._snapshot_monthly.query(area, groups, start, end, "hour")
+            if coll.find_one({}, {"_id": 1}) is None:
+                # No rollups (collection filled without scripts/load_elhub.py)
+                return self._aggregate(area, groups, start, end, resolution)
+
+        projection = {"_id": 0, "priceArea": 1, "productionGroup": 1, field: 1, "quantityKwh": 1}
+        df = pd.DataFrame(list(coll.find(self._match(area, groups, start, end, field), projection)))
+        if df.empty:
+            return _empty()
+        df = df.rename(columns={field: "startTime"})
+        # Legacy documents may hold ISO strings or tz-aware times; normalise to naive UTC
+        df["startTime"] = pd.to_datetime(df["startTime"], utc=True).dt.tz_localize(None)
+        # Documents loaded by the notebooks still hold the placeholder groups
+        return drop_placeholder_groups(df[COLUMNS])
+
+    def _aggregate(self, area, groups, start, end, resolution) -> pd.DataFrame:
+        """Day/month totals computed server-side from the hourly collection with $dateTrunc."""
+        cursor = self.collection.aggregate([
+            {"$match": self._match(area, groups, start, end)},
+            {"$group": {
+                "_id": {"priceArea": "$priceArea", "productionGroup": "$productionGroup",
+                        "startTime": {"$dateTrunc": {"date": "$startTime", "unit": resolution}}},
+                "quantityKwh": {"$sum": "$quantityKwh"},
+            }},
+            {"$project": {"_id": 0, "priceArea": "$_id.priceArea", "productionGroup": "$_id.productionGroup",
+                          "startTime": "$_id.startTime", "quantityKwh": 1}},
+        ])
+        df = pd.DataFrame(list(cursor))
+        if df.empty:
+            return _empty()
+        df["startTime"] = pd.to_datetime(df["startTime"], utc=True).dt.tz_localize(None)
+        return drop_placeholder_groups(df[COLUMNS]).sort_values(["priceArea", "productionGroup", "startTime"], ignore_index=True)
+
+    def _snapshot_current(self, table: str) -> bool:
+        return self.snapshot is not None and self.snapshot.has(table) and self.snapshot.is_current(self.sources)
+
+    def distinct(self, field, area=None):
+        values = self.collection.distinct(field, self._match(area, None, None, None))
+        if field == "productionGroup":
+            values = drop_placeholder_groups(pd.DataFrame({field: values}))[field]
+        return sorted(v for v in values if v)
+
+    def stats(self, area=None, groups=None, start=None, end=None):
+        pipeline = [
+            {"$match": self._match(area, groups, start, end)},
+            {"$group": {
+                "_id": None,
+                "rows": {"$sum": 1},
+                "first": {"$min": "$startTime"},
+                "last": {"$max": "$startTime"},
+                "total_kwh": {"$sum": "$quantityKwh"},
+            }},
+        ]
+        res = list(self.collection.aggregate(pipeline))
+        if not res:
+            return _stats_of(_empty())
+        res[0].pop("_id")
+        return res[0]
+
+
+# ---------------- Cassandra ----------------
+class CassandraRepository(ProductionRepository):
+    """Hourly reads as bucketed slice reads, day/month reads from the rollup tables."""
+
+    name = "cassandra"
+
+    def __init__(self, session, table: str = PRODUCTION_TABLE):
+        self.session = session
+        self.table = table
+        self.sources = (("cassandra", table),)
+
+    def _partitions(self, area, groups):
+        """(area, group) series matching the filter, plus every stored year_month bucket."""
+        layout = list(self.session.execute(idempotent(
+            f"SELECT DISTINCT pricearea, productiongroup, year_month FROM {self.table}"
+        )))
+        partitions = sorted({
+            (a, g) for a, g, _ in layout
+            if (area is None or a == area) and (groups is None or g in groups)
+        })
+        return partitions, [b for _, _, b in layout]
+
+    def query(self, area=None, groups=None, start=None, end=None, resolution="hour"):
+        _check_resolution(resolution)
+        partitions, buckets = self._partitions(area, groups)
+        if not partitions:
+            return _empty()
+
+        # Open-ended ranges are bounded by the stored month buckets
+        if start is None:
+            start = pd.Period(f"{min(buckets) // 100}-{min(buckets) % 100:02d}", "M").start_time
+        if end is None:
+            end = pd.Period(f"{max(buckets) // 100}-{max(buckets) % 100:02d}", "M").end_time
+
+        if resolution == "hour":
+            rows = read_slices(self.session, self.table, partitions, start, end,
+                               columns="pricearea, productiongroup, starttime, quantitykwh")
+        elif resolution == "day":
+            stmt = idempotent(self.session.prepare(
+                f"SELECT pricearea, productiongroup, day, quantitykwh FROM {CASSANDRA_DAILY} "
+                "WHERE pricearea = ? AND productiongroup = ? AND year = ? AND day >= ? AND day <= ?"
+            ))
+            years = sorted({b // 100 for b in month_buckets(start, end)})
+            rows = self._execute_all(stmt, [
+                (a, g, y, pd.Timestamp(start).date(), pd.Timestamp(end).date())
+                for a, g in partitions for y in years
+            ])
+        else:
+            stmt = idempotent(self.session.prepare(
+                f"SELECT pricearea, productiongroup, month, quantitykwh FROM {CASSANDRA_MONTHLY} "
+                "WHERE pricearea = ? AND productiongroup = ? AND month >= ? AND month <= ?"
+            ))
+            first = pd.Timestamp(start).to_period("M").start_time.date()
+            rows = self._execute_all(stmt, [
+                (a, g, first, pd.Timestamp(end).date()) for a, g in partitions
+            ])
+
+        df = pd.DataFrame(list(rows), columns=COLUMNS)
+        if df.empty:
+            return _empty()
+        df["startTime"] = pd.to_datetime(df["startTime"].astype(str))
+        return df
+
+    def _execute_all(self, stmt, args):
+        from cassandra.concurrent import execute_concurrent_with_args
+
+        rows = []
+        for ok, result in execute_concurrent_with_args(self.session, stmt, args, concurrency=32,
+                                                       raise_on_first_error=True):
+            rows.extend(result)
+        return rows
+
+    def distinct(self, field, area=None):
+        pairs, _ = self._partitions(area, None)
+        idx = 0 if field == "priceArea" else 1
+        return sorted({p[idx] for p in pairs})
+
+
+# ---------------- Local lake (DuckDB over Parquet) ----------------
+class LakeRepository(ProductionRepository):
+    """
+    Reads from the partitioned Parquet lake (lib/lake.py). Day and month
+    resolutions, distinct values and stats are GROUP BY queries evaluated
+    in the files, so no hourly frame is loaded for them.
+    """
+
+    name = "lake"
+
+    def __init__(self, lake_dir=None):
+        from lib.lake import LAKE_DIR
+        self.lake_dir = Path(lake_dir or LAKE_DIR)
+        # The version is read from this lake's own version file
+        self.sources = (("lake", f"{self.lake_dir.as_posix()}::production"),)
+
+    def _filter(self, area, groups):
+        where = {}
+        if area is not None:
+            where["priceArea"] = area
+        if groups is not None:
+            where["productionGroup"] = list(groups)
+        return where
+
+    def query(self, area=None, groups=None, start=None, end=None, resolution="hour"):
+        from lib.lake import aggregate, has_dataset, select
+
+        _check_resolution(resolution)
+        if not has_dataset("production", self.lake_dir):
+            return _empty()
+        where = self._filter(area, groups)
+        if resolution == "hour":
+            df = select("production", COLUMNS, where, start, end, lake_dir=self.lake_dir)
+        else:
+            if start is not None:
+                start = pd.Timestamp(start).to_period(_PERIOD_FREQ[resolution]).start_time
+            df = aggregate("production", by=("priceArea", "productionGroup"), bucket=resolution,
+                           where=where, start=start, end=end, lake_dir=self.lake_dir)
+        return df[COLUMNS] if not df.empty else _empty()
+
+    def distinct(self, field, area=None):
+        from lib.lake import has_dataset, sql
+
+        if field not in ("priceArea", "productionGroup"):
+            raise ValueError(f"Unsupported field: {field}")
+        if not has_dataset("production", self.lake_dir):
+            return []
+        where, params = ("WHERE priceArea = ?", [area]) if area is not None else ("", [])
+        df = sql(f'SELECT DISTINCT "{field}" FROM production {where} ORDER BY 1', params, self.lake_dir)
+        return df[field].astype(str).tolist()
+
+    def stats(self, area=None, groups=None, start=None, end=None):
+        from lib.lake import aggregate, has_dataset
+
+        if not has_dataset("production", self.lake_dir):
+            return _stats_of(_empty())
+        where = self._filter(area, groups)
+        parts = [aggregate("production", value=v, agg=a, where=where, start=start, end=end,
+                           lake_dir=self.lake_dir).iat[0, 0]
+                 for v, a in (("quantityKwh", "count"), ("startTime", "min"), ("startTime", "max"),
+                              ("quantityKwh", "sum"))]
+        rows = int(parts[0] or 0)
+        return {
+            "rows": rows,
+            "first": pd.Timestamp(parts[1]) if rows else None,
+            "last": pd.Timestamp(parts[2]) if rows else None,
+            "total_kwh": float(parts[3] or 0.0),
+        }
+
+    def availability(self):
+        from lib.lake import aggregate, has_dataset
+
+        if not has_dataset("production", self.lake_dir):
+            return pd.DataFrame(columns=["priceArea", "productionGroup", "n"])
+        return aggregate("production", by=("priceArea", "productionGroup"), value="quantityKwh", agg="count",
+                         lake_dir=self.lake_dir).rename(columns={"quantityKwh": "n"})
+
+
+# ---------------- Routing ----------------
+class RoutedRepository(ProductionRepository):
+    """
+    Send recent hourly reads to `hot` and everything else to `cold`.
+
+    A query is "hot" when it asks for hourly data that starts within the last
+    `hot_window`; aggregates and historical ranges go to `cold`.
+    """
+
+    name = "routed"
+
+    def __init__(self, hot: ProductionRepository, cold: ProductionRepository,
+                 hot_window: timedelta = timedelta(days=31)):
+        self.hot = hot
+        self.cold = cold
+        self.hot_window = hot_window
+        self.name = f"routed({hot.name}|{cold.name})"
+        self.sources = tuple(hot.sources) + tuple(cold.sources)
+
+    def route(self, start, resolution) -> ProductionRepository:
+        recent = start is not None and pd.Timestamp(start) >= pd.Timestamp.now(tz="UTC").tz_localize(None) - self.hot_window
+        return self.hot if resolution == "hour" and recent else self.cold
+
+    def in_memory(self, area=None, groups=None, start=None, end=None, resolution="hour"):
+        return self.route(start, resolution).in_memory(area, groups, start, end, resolution)
+
+    def query(self, area=None, groups=None, start=None, end=None, resolution="hour"):
+        return self.route(start, resolution).query(area, groups, start, end, resolution)
+
+    def distinct(self, field, area=None):
+        return self.cold.distinct(field, area)
+
+    def stats(self, area=None, groups=None, start=None, end=None):
+        return self.route(start, "hour").stats(area, groups, start, end)
+
+
+# ---------------- Streamlit wiring ----------------
+def _backend_setting() -> str:
+    backend = os.environ.get("IND320_BACKEND")
+    if backend:
+        return backend
+    try:
+        return st.secrets.get("DATA_BACKEND", "mongodb")
+    except Exception:
+        return "mongodb"
+
+
+@cache_resource()
+def get_repository() -> Optional[ProductionRepository]:
+    """
+    Build the repository selected by IND320_BACKEND (or DATA_BACKEND in secrets).
+
+    Values: 'mongodb' (default), 'cassandra', 'routed' (Cassandra for recent
+    hourly reads, MongoDB otherwise), 'lake' or 'lake:<dir>' for the local
+    Parquet lake (scripts/build_lake.py) or 'file:<path>' for a local export.
+
+    Returns:
+        ProductionRepository or None if the backend is unavailable
+    """
+    backend = _backend_setting()
+    if backend.startswith("file:"):
+        return FrameRepository.from_file(backend[len("file:"):])
+    if backend == "lake" or backend.startswith("lake:"):
+        return LakeRepository(backend[len("lake:"):] or None)
+
+    def mongo():
+        from lib.mongodb_client import get_mongo_client, get_production_frame
+        from lib.snapshot import load_snapshot
+        client = get_mongo_client()
+        if not client:
+            return None
+        return MongoRepository(client, frame=get_production_frame(), snapshot=load_snapshot())
+
+    def cassandra():
+        from cassandra_client import get_cassandra_session
+        session = get_cassandra_session()
+        return CassandraRepository(session) if session else None
+
+    if backend == "cassandra":
+        return cassandra()
+    if backend == "routed":
+        hot, cold = cassandra(), mongo()
+        if hot and cold:
+            return RoutedRepository(hot, cold)
+        return hot or cold
+    return mongo()
+
+
+_result_cache = cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+
+
+@instrumented("repository.query", cache=_result_cache)
+def _cached_query(_repo, repo_name, data_version, area, groups, start, end, resolution):
+    return _repo.query(area, groups, start, end, resolution)
+
+
+@_result_cache
+def _cached_distinct(_repo, repo_name, data_version, field, area):
+    return _repo.distinct(field, area)
+
+
+@_result_cache
+def _cached_stats(_repo, repo_name, data_version, area, groups, start, end):
+    return _repo.stats(area, groups, start, end)
+
+
+@_result_cache
+def _cached_availability(_repo, repo_name, data_version):
+    counts = _repo.availability()
+    avail = {}
+    for area, group in zip(counts["priceArea"], counts["productionGroup"]):
+        avail.setdefault(area, []).append(group)
+    return avail, counts
+
+
+def cached_query(repo: Optional[ProductionRepository], area=None, groups=None, start=None, end=None,
+                 resolution: str = "hour") -> pd.DataFrame:
+    """
+    repo.query() behind the Streamlit result cache (keyed on repo.name, data
+    version and the filter). Reads the repository answers from a frame it
+    already holds skip the cache, which would store and unpickle a copy.
+    """
+    if repo is None:
+        return _empty()
+    groups = tuple(sorted(groups)) if groups is not None else None
+    if repo.in_memory(area, groups, start, end, resolution):
+        return repo.query(area, groups, start, end, resolution)
+    return _cached_query(repo, repo.name, version_of(repo.sources), area, groups, start, end, resolution)
+
+
+def cached_distinct(repo: Optional[ProductionRepository], field: str, area: Optional[str] = None) -> List[str]:
+    """repo.distinct() behind the Streamlit result cache."""
+    if repo is None:
+        return []
+    return _cached_distinct(repo, repo.name, version_of(repo.sources), field, area)
+
+
+def cached_stats(repo: Optional[ProductionRepository], area=None, groups=None, start=None, end=None) -> Dict:
+    """repo.stats() behind the Streamlit result cache."""
+    if repo is None:
+        return _stats_of(_empty())
+    groups = tuple(sorted(groups)) if groups is not None else None
+    return _cached_stats(repo, repo.name, version_of(repo.sources), area, groups, start, end)
+
+
+def cached_availability(repo: Optional[ProductionRepository]):
+    """
+    Which production groups have hourly data in each price area.
+
+    Returns:
+        (dict, pd.DataFrame): area -> sorted groups, and the
+                              (priceArea, productionGroup, n) row counts
+    """
+    if repo is None:
+        return {}, pd.DataFrame(columns=["priceArea", "productionGroup", "n"])
+    return _cached_availability(repo, repo.name, version_of(repo.sources))
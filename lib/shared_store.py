@@ -0,0 +1,212 @@
+"""
+Host-wide shared data store for app replicas - Assessment 4
+
+Several app processes on one host would otherwise each hold (and, through
+st.cache_data, repeatedly unpickle) their own copy of the production and
+ERA5 frames. Here one process builds a frame, writes it in the snapshot
+file format (lib/snapshot.py) to SHARED_DIR, and every process maps that
+file read-only, so the numeric and datetime columns live once in the page
+cache:
+
+    SHARED_DIR/production_2021-v42.snap     one file per data version
+    SHARED_DIR/era5-NO5-2021-v0.snap
+
+Publishing is serialised per name with a file lock: the first replica that
+needs a version builds it, the others wait and map the result. Superseded
+versions are unlinked; replicas still mapping them keep their view until
+they move on. Text columns are mapped as categoricals (codes plus a small
+category list), so a replica's private memory is the codes and the
+interpreter, not the data.
+
+Enabled with IND320_SHARED_STORE=1 (POSIX hosts). This module does not
+import Streamlit.
+"""
+
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from lib.snapshot import Snapshot, write_snapshot
+
+SHARED_DIR = Path(os.environ.get(
+    "IND320_SHARED_DIR", "/dev/shm/ind320" if Path("/dev/shm").is_dir() else "data/shared"
+))
+
+
+def shared_store_enabled() -> bool:
+    return os.environ.get("IND320_SHARED_STORE", "").lower() in ("1", "true", "yes") and os.name == "posix"
+
+
+def _path(name: str, version) -> Path:
+    return SHARED_DIR / f"{name}-v{version}.snap"
+
+
+@contextmanager
+def _publish_lock(name: str):
+    import fcntl
+
+    SHARED_DIR.mkdir(parents=True, exist_ok=True)
+    with open(SHARED_DIR / f"{name}.lock", "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _drop_older(name: str, keep: Path):
+    pattern = re.compile(rf"^{re.escape(name)}-v.+\.snap$")
+    for p in SHARED_DIR.glob(f"{name}-v*.snap"):
+        if p != keep and pattern.match(p.name):
+            try:
+                p.unlink()
+            except OSError:
+                pass
+
+
+def latest(name: str) -> Optional[Snapshot]:
+    """Most recently published version of `name`, if any."""
+    files = sorted(SHARED_DIR.glob(f"{name}-v*.snap"), key=lambda p: p.stat().st_mtime)
+    for p in reversed(files):
+        try:
+            return Snapshot(p)
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+def get_or_publish(name: str, version, build: Callable[[Optional[Snapshot]], Tuple[Dict, Dict, Dict]]) -> Snapshot:
+    """
+    Map version `version` of `name`, building and publishing it first if no
+    replica has yet.
+
+    Parameters:
+        name: Dataset name (file prefix)
+        version: Data version the content corresponds to
+        build: previous -> (tables, arrays, meta); called with the latest
+               published snapshot of `name` (or None) so it can update
+               incrementally, and only in the one process holding the lock
+
+    Returns:
+        Snapshot: Read-only mapped view
+    """
+    path = _path(name, version)
+    if not path.exists():
+        with _publish_lock(name):
+            if not path.exists():
+                tables, arrays, meta = build(latest(name))
+                write_snapshot(path, tables, arrays, {**meta, "version": version})
+                _drop_older(name, path)
+    return Snapshot(path)
+
+
+# ---------------- production frame ----------------
+class SharedFrame:
+    """
+    Drop-in for lib.delta_frame.DeltaFrame (sync, df, series) whose frame
+    is a mapped view into the host-wide store.
+
+    The publishing replica seeds a DeltaFrame from the previous published
+    version (or the cold-start snapshot) and fetches only the delta, so a
+    new version costs what one DeltaFrame refresh costs, once per host.
+
+    priceArea and productionGroup are categoricals here, not str objects:
+    group by them with observed=True. The frame and its row ranges are
+    swapped as one tuple, as in DeltaFrame.
+    """
+
+    def __init__(self, collection, name: str = "production_2021", seed: Optional[Callable] = None):
+        self.collection = collection
+        self.name = name
+        self.seed = seed          # () -> (df, watermark, version) fallback when nothing is published
+        self._state: Tuple[pd.DataFrame, Dict[Tuple[str, str], Tuple[int, int]]] = (
+            pd.DataFrame(columns=["priceArea", "productionGroup", "startTime", "quantityKwh"]), {})
+        self.version = None
+        self.watermark = None
+        self.last_refresh = None
+        self._snap: Optional[Snapshot] = None
+        self._lock = threading.Lock()
+
+    @property
+    def df(self) -> pd.DataFrame:
+        return self._state[0]
+
+    @property
+    def _bounds(self) -> Dict[Tuple[str, str], Tuple[int, int]]:
+        return self._state[1]
+
+    def _build(self, previous: Optional[Snapshot]):
+        from lib.delta_frame import DeltaFrame
+        from lib.snapshot import production_frame
+
+        frame = DeltaFrame(self.collection)
+        if previous is not None and previous.has("production"):
+            df, bounds = production_frame(previous)
+            frame.seed(df, previous.meta.get("watermark"), previous.meta.get("version"), bounds)
+        elif self.seed is not None:
+            seeded = self.seed()
+            if seeded is not None:
+                frame.seed(*seeded)
+        report = frame.refresh() if self.collection is not None else {"mode": "none", "fetched": 0}
+        keys = list(frame._bounds)
+        starts = [frame._bounds[k][0] for k in keys]
+        ends = [frame._bounds[k][1] for k in keys]
+        arrays = {"production.series_start": np.asarray(starts, dtype=np.int64),
+                  "production.series_end": np.asarray(ends, dtype=np.int64)}
+        meta = {"watermark": frame.watermark, "series": [list(k) for k in keys],
+                "mode": report.get("mode"), "fetched": report.get("fetched", 0)}
+        return {"production": frame.df}, arrays, meta
+
+    def sync(self, version) -> Optional[Dict]:
+        """Map the published frame for `version` (building it if no replica has); None if already mapped."""
+        if version == self.version and self._snap is not None:
+            return None
+        with self._lock:
+            if version == self.version and self._snap is not None:
+                return None
+            t0 = time.perf_counter()
+            snap = get_or_publish(self.name, version, self._build)
+            keys = snap.meta.get("series", [])
+            starts, ends = snap.array("production.series_start"), snap.array("production.series_end")
+            self._state = (snap.table("production", categorical=True),
+                           {(a, g): (int(s), int(e)) for (a, g), s, e in zip(keys, starts, ends)})
+            self._snap = snap
+            self.version = version
+            self.watermark = snap.meta.get("watermark")
+            self.last_refresh = time.time()
+            return {"mode": f"shared:{snap.meta.get('mode')}", "fetched": snap.meta.get("fetched", 0),
+                    "rows": int(len(self.df)), "seconds": time.perf_counter() - t0}
+
+    def series(self, area: str, group: str) -> pd.DataFrame:
+        df, bounds = self._state
+        start, end = bounds.get((area, group), (0, 0))
+        return df.iloc[start:end]
+
+
+# ---------------- static frames (ERA5) ----------------
+_static: Dict[Tuple[str, str], pd.DataFrame] = {}
+_static_lock = threading.Lock()
+
+
+def shared_table(name: str, loader: Callable[[], pd.DataFrame], version=0) -> pd.DataFrame:
+    """
+    A frame that does not change once loaded (e.g. historical ERA5), mapped
+    from the host-wide store and built by `loader` in one replica only.
+    Text columns come back as categoricals.
+    """
+    key = (name, str(version))
+    with _static_lock:
+        if key in _static:
+            return _static[key]
+    snap = get_or_publish(name, version, lambda previous: ({"data": loader()}, {}, {}))
+    df = snap.table("data", categorical=True)
+    with _static_lock:
+        _static[key] = df
+    return df
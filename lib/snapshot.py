@@ -0,0 +1,227 @@
+"""
+Cold-start snapshot - Assessment 4
+
+scripts/build_snapshot.py precomputes what the first visitor of a fresh
+deployment would otherwise wait for (the production frame and its
+per-series index, monthly rollups, ERA5 for the five area cities and STL
+at the default page parameters) into one versioned file. The app
+memory-maps it on first use: numeric and datetime columns are views into
+the mapped file, so opening it costs a header parse, not a load.
+
+File layout (little-endian):
+
+    8 bytes   MAGIC
+    8 bytes   header length
+    header    JSON: format, meta, arrays {name: dtype, shape, offset}, tables
+    data      arrays, each aligned to 64 bytes
+
+Tables are stored column by column; text columns as int32 codes plus a
+category list in the header. The snapshot records the data versions
+(lib/data_version.py) it was built from, so readers can tell whether it is
+current and, if not, refresh by delta from its updatedAt watermark
+(lib/delta_frame.py) instead of reloading.
+
+This module does not import Streamlit.
+"""
+
+import json
+import os
+import struct
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b"IND320S\x01"
+FORMAT_VERSION = 1
+ALIGN = 64
+SNAPSHOT_PATH = Path(os.environ.get("IND320_SNAPSHOT", "data/snapshot/ind320.snap"))
+
+# STL parameters the Analysis A page opens with
+DEFAULT_STL = {"period": 24 * 7, "seasonal": 13, "trend": 31, "robust": True}
+
+
+# ---------------- writing ----------------
+def _encode_table(name: str, df: pd.DataFrame, arrays: Dict[str, np.ndarray]) -> Dict:
+    columns = []
+    for col in df.columns:
+        s = df[col]
+        key = f"{name}/{col}"
+        if pd.api.types.is_datetime64_any_dtype(s):
+            if getattr(s.dt, "tz", None) is not None:
+                s = s.dt.tz_convert("UTC").dt.tz_localize(None)
+                kind = "datetime_utc"
+            else:
+                kind = "datetime"
+            arrays[key] = s.to_numpy(dtype="datetime64[ns]").view(np.int64)
+            columns.append({"name": col, "kind": kind, "array": key})
+        elif pd.api.types.is_numeric_dtype(s) or pd.api.types.is_bool_dtype(s):
+            arrays[key] = s.to_numpy()
+            columns.append({"name": col, "kind": "numeric", "array": key})
+        else:
+            cat = s.astype("category").cat
+            arrays[key] = cat.codes.to_numpy(dtype=np.int32)
+            columns.append({"name": col, "kind": "category", "array": key,
+                            "categories": [str(c) for c in cat.categories]})
+    return {"rows": int(len(df)), "columns": columns}
+
+
+def write_snapshot(path: Path, tables: Dict[str, pd.DataFrame],
+                   arrays: Optional[Dict[str, np.ndarray]] = None, meta: Optional[Dict] = None) -> Path:
+    """
+    Write tables and arrays to one snapshot file (atomically replaced).
+
+    Parameters:
+        path: Target file
+        tables: name -> DataFrame
+        arrays: name -> ndarray (any fixed-size dtype)
+        meta: JSON-serialisable build information (versions, watermark, ...)
+
+    Returns:
+        Path: The written file
+    """
+    arrays = dict(arrays or {})
+    table_specs = {name: _encode_table(name, df, arrays) for name, df in tables.items()}
+
+    specs, offset = {}, 0
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        arrays[name] = arr
+        offset = -(-offset // ALIGN) * ALIGN
+        specs[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset += arr.nbytes
+
+    header = json.dumps({
+        "format": FORMAT_VERSION,
+        "meta": {"created": datetime.now(timezone.utc).isoformat(timespec="seconds"), **(meta or {})},
+        "arrays": specs,
+        "tables": table_specs,
+    }, default=str).encode()
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGN) * ALIGN
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for name, arr in arrays.items():
+            f.seek(data_start + specs[name]["offset"])
+            f.write(arr.tobytes())
+    tmp.replace(path)
+    return path
+
+
+# ---------------- reading ----------------
+class Snapshot:
+    """Read-only, memory-mapped view of a snapshot file."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._mm = np.memmap(self.path, mode="r", dtype=np.uint8)
+        if bytes(self._mm[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{self.path} is not a snapshot file")
+        (hlen,) = struct.unpack("<Q", bytes(self._mm[len(MAGIC):len(MAGIC) + 8]))
+        header = json.loads(bytes(self._mm[len(MAGIC) + 8:len(MAGIC) + 8 + hlen]))
+        if header.get("format") != FORMAT_VERSION:
+            raise ValueError(f"{self.path}: snapshot format {header.get('format')}, expected {FORMAT_VERSION}")
+        self._data_start = -(-(len(MAGIC) + 8 + hlen) // ALIGN) * ALIGN
+        self.meta = header["meta"]
+        self._arrays = header["arrays"]
+        self._tables = header["tables"]
+
+    def has(self, name: str) -> bool:
+        return name in self._tables or name in self._arrays
+
+    def array(self, name: str) -> np.ndarray:
+        """Zero-copy read-only view of a stored array."""
+        spec = self._arrays[name]
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"])) if spec["shape"] else 1
+        start = self._data_start + spec["offset"]
+        raw = self._mm[start:start + count * dtype.itemsize]
+        return raw.view(dtype).reshape(spec["shape"])
+
+    def table(self, name: str, categorical: bool = False) -> pd.DataFrame:
+        """
+        A stored table. Numeric and datetime columns are views into the
+        mapped file; text columns are rebuilt from their codes (as
+        categoricals with categorical=True, as str objects otherwise).
+        """
+        spec = self._tables[name]
+        data = {}
+        for col in spec["columns"]:
+            arr = self.array(col["array"])
+            if col["kind"] == "category":
+                cats = pd.Index(col["categories"], dtype=object)
+                values = pd.Categorical.from_codes(arr, categories=cats)
+                data[col["name"]] = values if categorical else np.asarray(values, dtype=object)
+            elif col["kind"] == "datetime_utc":
+                data[col["name"]] = pd.DatetimeIndex(arr.view("datetime64[ns]")).tz_localize("UTC")
+            elif col["kind"] == "datetime":
+                data[col["name"]] = arr.view("datetime64[ns]")
+            else:
+                data[col["name"]] = arr
+        return pd.DataFrame(data, copy=False)
+
+    def tables(self) -> List[str]:
+        return list(self._tables)
+
+    def versions(self) -> Dict[Tuple[str, str], int]:
+        return {(b, n): int(v) for b, n, v in self.meta.get("versions", [])}
+
+    def is_current(self, sources: Iterable[Tuple[str, str]]) -> bool:
+        """True when the snapshot was built from the current data version of every source."""
+        from lib.data_version import current_version
+
+        built = self.versions()
+        return all(built.get((b, n)) == current_version(b, n) for b, n in sources)
+
+
+_loaded: Dict[Path, Optional[Snapshot]] = {}
+_load_lock = threading.Lock()
+
+
+def load_snapshot(path: Optional[Path] = None) -> Optional[Snapshot]:
+    """
+    The process-wide snapshot, mapped on first call.
+
+    Returns:
+        Snapshot, or None when the file is missing or has another format
+        (callers then use the live sources)
+    """
+    path = Path(path or SNAPSHOT_PATH)
+    with _load_lock:
+        if path not in _loaded:
+            try:
+                _loaded[path] = Snapshot(path) if path.exists() else None
+            except (OSError, ValueError):
+                _loaded[path] = None
+        return _loaded[path]
+
+
+# ---------------- typed readers ----------------
+def production_frame(snap: Snapshot) -> Tuple[pd.DataFrame, Dict[Tuple[str, str], Tuple[int, int]]]:
+    """Production table (sorted by area, group, startTime) and its per-series row ranges."""
+    df = snap.table("production")
+    keys = snap.meta.get("series", [])
+    starts, ends = snap.array("production.series_start"), snap.array("production.series_end")
+    bounds = {(a, g): (int(s), int(e)) for (a, g), s, e in zip(keys, starts, ends)}
+    return df, bounds
+
+
+def stl_components(snap: Snapshot, area: str, group: str) -> Optional[pd.DataFrame]:
+    """Stored STL at DEFAULT_STL for one series (index = hours), or None."""
+    name = f"stl/{area}/{group}"
+    if name not in snap.tables():
+        return None
+    return snap.table(name).set_index("time")
+
+
+def era5_frame(snap: Snapshot, area: str, year: int) -> Optional[pd.DataFrame]:
+    name = f"era5/{area}/{year}"
+    return snap.table(name) if name in snap.tables() else None
@@ -0,0 +1,113 @@
+"""
+Precomputed ERA5 sparklines - Assessment 4
+
+The Data Table page shows one small line chart per (area, year, variable,
+month). Instead of slicing the hourly frames on every render, the series
+are downsampled once to 6-hour means and stored as one float32 array
+
+    values  (rows, 12 months, SPARK_POINTS)
+
+next to a small index table (area, city, year, variable, mean, min, max).
+scripts/build_snapshot.py writes both into the cold-start snapshot
+(lib/snapshot.py); a 60-row table is then read from those few hundred KB
+without touching the hourly data.
+
+This module does not import Streamlit.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+SPARK_BUCKET_HOURS = 6
+SPARK_POINTS = 31 * 24 // SPARK_BUCKET_HOURS
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+SPARK_TABLE = "sparklines"
+SPARK_VALUES = "sparklines.values"
+
+
+def compute_sparklines(frames: Dict[Tuple[str, int], pd.DataFrame], variables: Sequence[str],
+                       cities: Optional[Dict[str, str]] = None) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Downsample hourly ERA5 frames to per-month sparklines.
+
+    Parameters:
+        frames: (area, year) -> ERA5 frame with a 'time' column (UTC)
+        variables: Columns to include (missing ones are skipped per frame)
+        cities: area -> city name for the index table
+
+    Returns:
+        (index, values): index has one row per (area, year, variable) with
+        city, mean, min and max; values[i] is the (12, SPARK_POINTS) array of
+        6-hour means of row i (NaN where a month has no data or is shorter)
+    """
+    rows, blocks = [], []
+    for (area, year), df in sorted(frames.items()):
+        t = pd.to_datetime(df["time"], utc=True).dt.tz_localize(None)
+        keep = (t.dt.year == year).to_numpy()
+        t = t[keep]
+        month = t.dt.month.to_numpy() - 1
+        offset = (t - t.dt.to_period("M").dt.start_time).dt.total_seconds().to_numpy()
+        slot = np.minimum((offset // (3600 * SPARK_BUCKET_HOURS)).astype(np.int64), SPARK_POINTS - 1)
+
+        for var in variables:
+            if var not in df.columns:
+                continue
+            v = df[var].to_numpy(dtype=float)[keep]
+            ok = ~np.isnan(v)
+            sums = np.zeros((12, SPARK_POINTS))
+            counts = np.zeros((12, SPARK_POINTS))
+            np.add.at(sums, (month[ok], slot[ok]), v[ok])
+            np.add.at(counts, (month[ok], slot[ok]), 1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                blocks.append((sums / counts).astype(np.float32))
+            rows.append({
+                "area": area,
+                "city": (cities or {}).get(area, area),
+                "year": int(year),
+                "variable": var,
+                "mean": float(np.nanmean(v)) if ok.any() else np.nan,
+                "min": float(np.nanmin(v)) if ok.any() else np.nan,
+                "max": float(np.nanmax(v)) if ok.any() else np.nan,
+            })
+
+    values = np.stack(blocks) if blocks else np.zeros((0, 12, SPARK_POINTS), dtype=np.float32)
+    return pd.DataFrame(rows, columns=["area", "city", "year", "variable", "mean", "min", "max"]), values
+
+
+def load_sparklines(snap) -> Optional[Tuple[pd.DataFrame, np.ndarray]]:
+    """Stored sparklines of a lib.snapshot.Snapshot, or None if it has none."""
+    if snap is None or not snap.has(SPARK_TABLE) or not snap.has(SPARK_VALUES):
+        return None
+    return snap.table(SPARK_TABLE), snap.array(SPARK_VALUES)
+
+
+def _points(a: np.ndarray) -> List[float]:
+    """Trailing NaN (short months) dropped; inner gaps kept as None."""
+    valid = np.flatnonzero(~np.isnan(a))
+    if not len(valid):
+        return []
+    a = a[:valid[-1] + 1]
+    return [None if np.isnan(x) else round(float(x), 2) for x in a]
+
+
+def sparkline_table(index: pd.DataFrame, values: np.ndarray, areas=None, years=None,
+                    variables=None) -> pd.DataFrame:
+    """
+    One row per selected (area, year, variable) with a list column per month,
+    ready for st.column_config.LineChartColumn.
+
+    Returns:
+        pd.DataFrame: area, city, year, variable, mean, min, max, Jan ... Dec
+    """
+    mask = np.ones(len(index), dtype=bool)
+    for col, wanted in (("area", areas), ("year", years), ("variable", variables)):
+        if wanted is not None:
+            mask &= index[col].isin(list(wanted)).to_numpy()
+    picked = np.flatnonzero(mask)
+    out = index.iloc[picked].reset_index(drop=True)
+    for m, name in enumerate(MONTHS):
+        out[name] = [_points(values[i, m]) for i in picked]
+    return out
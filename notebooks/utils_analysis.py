@@ -1,9 +1,11 @@
 # notebooks/utils_analysis.py
+# plotly, statsmodels, scipy and sklearn are imported inside the functions
+# that use them, so importing this module (and every page that does) stays
+# cheap; bench/import_budget.py checks that they stay out of cold start.
 import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from statsmodels.tsa.seasonal import STL
+
+from lib.instrumentation import annotate, instrumented
 
 # ---------- column helpers (robust to variants) ----------
 def _pick_col(df: pd.DataFrame, candidates):
@@ -25,6 +27,7 @@ def _colnames(df: pd.DataFrame):
     return area_col, group_col, time_col, qty_col
 
 # ---------- series builder ----------
+@instrumented("_series")
 def _series(df: pd.DataFrame, area: str, group: str) -> pd.Series:
     area_col, group_col, time_col, qty_col = _colnames(df)
 
@@ -62,7 +65,142 @@ def _ensure_stl_params(ts_len: int, period: int, seasonal: int, trend: int):
         seasonal = 7
     return period, seasonal, trend
 
+# ---------- fast approximate STL ----------
+# Series longer than this default to the fast mode on the Analysis A page
+FAST_STL_MIN_HOURS = 2 * 365 * 24
+# Error bound of fast_stl against exact STL at the same smoothers: RMS of the
+# difference of the fitted part (trend + seasonal), relative to the series'
+# std. bench/run.py measures it on synthetic data and fails above the bound.
+FAST_STL_MAX_ERROR = 0.10
+# Trend smoothers from this many hours up are fitted on daily means (the
+# daily STL needs a trend window above its 7-day period); shorter ones on hours
+FAST_STL_DAILY_TREND_HOURS = 9 * 24
+# (period, seasonal, trend) the bound is checked at: the Analysis A page
+# defaults and a short-period setting where the trend slider takes effect
+FAST_STL_CHECKED_PARAMS = ((24 * 7, 13, 31), (24, 13, 31))
+
+
+def _cycle_smooth(x: np.ndarray, period: int, window: int, weights: np.ndarray = None) -> np.ndarray:
+    """
+    Seasonal component of one period: for every phase of the cycle, the
+    (weighted) mean of `window` neighbouring cycles, with the level removed
+    so the component stays centred, as in STL's cycle-subseries step.
+    """
+    n = len(x)
+    cycles = -(-n // period)
+    pad = cycles * period - n
+    X = np.concatenate([x, np.full(pad, np.nan)]).reshape(cycles, period)
+    W = np.ones_like(X) if weights is None else np.concatenate([weights, np.zeros(pad)]).reshape(cycles, period)
+    W = np.where(np.isnan(X), 0.0, W)
+    X = np.where(np.isnan(X), 0.0, X)
+
+    # Centred moving sums over cycles via cumulative sums (cost independent of window)
+    half = window // 2
+    lo = np.clip(np.arange(cycles) - half, 0, cycles)
+    hi = np.clip(np.arange(cycles) + half + 1, 0, cycles)
+    cw = np.vstack([np.zeros((1, period)), np.cumsum(W, axis=0)])
+    cx = np.vstack([np.zeros((1, period)), np.cumsum(W * X, axis=0)])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        S = ((cx[hi] - cx[lo]) / (cw[hi] - cw[lo])).ravel()[:n]
+
+    level = pd.Series(S).rolling(period, center=True, min_periods=1).mean().to_numpy()
+    return np.nan_to_num(S - level)
+
+
+@instrumented("fast_stl")
+def fast_stl(ts: pd.Series, periods=(24, 24 * 7), seasonal: int = 13, trend: int = 31,
+             robust: bool = True, iterations: int = 2) -> pd.DataFrame:
+    """
+    Approximate multi-seasonal STL for long hourly series.
+
+    Trends of FAST_STL_DAILY_TREND_HOURS or more are estimated by STL on
+    the daily means (about 1/24 of the points) and interpolated back to
+    hours. Shorter trends cannot be resolved from daily means; they are a
+    centred moving average of width `trend` over the hourly deseasonalised
+    series, refitted after every seasonal pass. The seasonal components are
+    fitted on the hourly detrended series, one per period in ascending
+    order and refined `iterations` times (as in MSTL). With robust=True the
+    second pass down-weights outliers with STL's bisquare weights.
+
+    Parameters:
+        ts: Hourly series with a DatetimeIndex (from _series)
+        periods: Seasonal periods in hours, e.g. (24, 168) for daily + weekly
+        seasonal: Cycles averaged per phase (odd; like STL's seasonal smoother)
+        trend: Trend smoother in hours (rounded up to whole days on the daily path)
+        robust: Down-weight outliers
+        iterations: Backfitting passes over the seasonal components
+
+    Returns:
+        pd.DataFrame: index = ts.index, columns trend, seasonal (sum of all
+                      periods), seasonal_<p> per period and resid - the
+                      attribute names of an STL result, so it can be passed
+                      as `components` to stl_production_plot
+    """
+    from statsmodels.tsa.seasonal import STL
+
+    ts = ts.astype(float)
+    y = ts.to_numpy()
+    periods = sorted({int(p) for p in periods if 2 <= int(p) <= len(y) // 2})
+
+    trend = max(3, int(trend) | 1)
+    hourly_trend = trend < FAST_STL_DAILY_TREND_HOURS
+
+    def smooth(values: np.ndarray, window: int) -> np.ndarray:
+        return pd.Series(values).rolling(window, center=True, min_periods=1).mean().to_numpy()
+
+    if hourly_trend:
+        # Start from a 24 h moving average, which cancels the daily cycle
+        trend_h = smooth(y, 24)
+    else:
+        # Trend on daily means; the weekly cycle is removed there by a 7-day STL
+        daily = ts.resample("D").mean().interpolate(limit_direction="both")
+        trend_days = -(-trend // 24)
+        trend_days += 1 - trend_days % 2
+        if len(daily) >= 3 * 7:
+            daily_trend = STL(daily, period=7, trend=trend_days, robust=robust).fit().trend
+        else:
+            daily_trend = daily.rolling(trend_days, center=True, min_periods=1).mean()
+        centres = (daily_trend.index + pd.Timedelta(hours=12)).asi8
+        trend_h = np.interp(ts.index.asi8, centres, daily_trend.to_numpy())
+
+    seasonal = max(3, int(seasonal) | 1)
+    comps = {p: np.zeros_like(y) for p in periods}
+    weights = None
+    for it in range(max(1, iterations)):
+        detrended = y - trend_h
+        for p in periods:
+            others = sum((comps[q] for q in periods if q != p), np.zeros_like(y))
+            comps[p] = _cycle_smooth(detrended - others, p, seasonal, weights)
+        if hourly_trend:
+            trend_h = smooth(y - sum(comps.values(), np.zeros_like(y)), trend)
+            detrended = y - trend_h
+        if robust and it == 0:
+            resid = detrended - sum(comps.values(), np.zeros_like(y))
+            h = 6 * np.nanmedian(np.abs(resid))
+            u = np.abs(resid) / h if h > 0 else np.zeros_like(resid)
+            weights = np.where(u < 1, (1 - u ** 2) ** 2, 0.0)
+
+    total = sum(comps.values(), np.zeros_like(y))
+    out = pd.DataFrame({"trend": trend_h, "seasonal": total}, index=ts.index)
+    for p in periods:
+        out[f"seasonal_{p}"] = comps[p]
+    out["resid"] = y - trend_h - total
+    return out
+
+
+def stl_approximation_error(ts: pd.Series, fast: pd.DataFrame, exact) -> float:
+    """
+    RMS difference of the fitted parts (trend + seasonal) of a fast_stl
+    result and an exact STL result, relative to the std of the series.
+    Compare against FAST_STL_MAX_ERROR.
+    """
+    diff = (fast["trend"] + fast["seasonal"]).to_numpy() - (np.asarray(exact.trend) + np.asarray(exact.seasonal))
+    scale = float(np.nanstd(ts.to_numpy(dtype=float)))
+    return float(np.sqrt(np.nanmean(diff ** 2)) / scale) if scale > 0 else 0.0
+
+
 # ---------- STL ----------
+@instrumented("stl_production_plot")
 def stl_production_plot(
     df: pd.DataFrame,
     area: str,
@@ -71,14 +209,36 @@ def stl_production_plot(
     seasonal: int = 13,
     trend: int = 31,
     robust: bool = True,
+    components: pd.DataFrame = None,
+    mode: str = "exact",
 ):
+    """
+    components: Precomputed trend/seasonal/resid for these parameters
+    (e.g. lib.snapshot.stl_components); used instead of fitting when it
+    covers the same hours as the series.
+    mode: 'exact' (statsmodels STL), 'fast' (fast_stl with daily and
+    `period` seasonality) or 'auto' (fast above FAST_STL_MIN_HOURS).
+    """
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
     ts = _series(df, area, group)
     if ts.empty:
         return go.Figure(), False, f"No rows for (area={area}, group={group})."
 
+    annotate(rows=len(ts), nbytes=ts.nbytes)
     period, seasonal, trend = _ensure_stl_params(len(ts.dropna()), period, seasonal, trend)
 
-    res = STL(ts, period=period, seasonal=seasonal, trend=trend, robust=robust).fit()
+    if mode == "auto":
+        mode = "fast" if len(ts) > FAST_STL_MIN_HOURS else "exact"
+
+    if components is not None and components.index.equals(ts.index):
+        res = components
+    elif mode == "fast":
+        res = fast_stl(ts, periods=(24, period), seasonal=seasonal, trend=trend, robust=robust)
+    else:
+        from statsmodels.tsa.seasonal import STL
+        res = STL(ts, period=period, seasonal=seasonal, trend=trend, robust=robust).fit()
 
     # FIXED: Create 4 separate subplots instead of overlaying (professor feedback fix)
     fig = make_subplots(
@@ -100,13 +260,15 @@ def stl_production_plot(
     fig.update_yaxes(title_text="kWh", row=4, col=1)
 
     fig.update_layout(
-        title_text=f"STL Decomposition — {area}/{group} (period={period}, trend={trend}, seasonal={seasonal})",
+        title_text=f"STL Decomposition — {area}/{group} (period={period}, trend={trend}, seasonal={seasonal}"
+                   + (", fast" if mode == "fast" else "") + ")",
         height=800,
         showlegend=False
     )
     return fig, True, ""
 
 # ---------- Spectrogram ----------
+@instrumented("spectrogram_production_plot")
 def spectrogram_production_plot(
     df: pd.DataFrame,
     area: str,
@@ -115,12 +277,15 @@ def spectrogram_production_plot(
     overlap: float = 0.5,
     polar: bool = False,
 ):
+    import plotly.graph_objects as go
+
     x = _series(df, area, group)
     if x.empty:
         return go.Figure(), False, f"No rows for (area={area}, group={group})."
 
     x = x.values.astype(float)
     N = len(x)
+    annotate(rows=N, nbytes=x.nbytes)
     w = int(window_len)
     if w < 32:
         w = 32
@@ -174,11 +339,55 @@ def spectrogram_production_plot(
         )
         return fig, True, ""
 
+# ---------- SPC (temperature outliers) ----------
+@instrumented("spc_outliers")
+def spc_outliers(y: np.ndarray, cutoff: int = 30, k_sigma: float = 3.0) -> dict:
+    """
+    DCT high-pass filter -> SATV, then robust SPC limits (median + k * 1.4826 * MAD).
+    Boundaries are returned on the original scale (trend +/- limit).
+    """
+    from scipy.fftpack import dct, idct
+
+    y = np.asarray(y, dtype=float)
+    annotate(rows=len(y), nbytes=y.nbytes)
+    Y = dct(y, type=2, norm="ortho")
+    cut = np.clip(cutoff, 0, len(Y) - 1)
+    Y[:cut] = 0.0
+    satv = idct(Y, type=2, norm="ortho")
+
+    med = np.median(satv)
+    mad = np.median(np.abs(satv - med))
+    sigma = 1.4826 * mad if mad > 0 else np.std(satv)
+    upper = k_sigma * sigma
+    lower = -k_sigma * sigma
+
+    # Trend (original - SATV) puts the boundaries on the temperature curve
+    trend = y - satv
+    return {
+        "satv": satv,
+        "trend": trend,
+        "upper": trend + upper,
+        "lower": trend + lower,
+        "is_outlier": (satv > upper) | (satv < lower),
+        "mad": mad,
+    }
+
+# ---------- LOF (precipitation anomalies) ----------
+@instrumented("lof_anomalies")
+def lof_anomalies(x: np.ndarray, contamination: float = 0.01, n_neighbors: int = 20) -> np.ndarray:
+    """Boolean anomaly mask from Local Outlier Factor on a 1-D series."""
+    from sklearn.neighbors import LocalOutlierFactor
+
+    X = np.asarray(x, dtype=float).reshape(-1, 1)
+    annotate(rows=len(X), nbytes=X.nbytes)
+    lof = LocalOutlierFactor(n_neighbors=n_neighbors, contamination=contamination)
+    return lof.fit_predict(X) == -1  # -1 outlier, 1 inlier
+
 # ---------- availability map ----------
 def combos_available(df: pd.DataFrame):
     area_col, group_col, time_col, qty_col = _colnames(df)
     c = (
-        df.groupby([area_col, group_col])[qty_col]
+        df.groupby([area_col, group_col], observed=True)[qty_col]
         .size()
         .reset_index(name="n")
         .sort_values([area_col, group_col])
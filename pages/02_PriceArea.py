@@ -4,10 +4,12 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import os
+import time
 from datetime import datetime
 import sys
 sys.path.append('..')
-from lib.mongodb_client import load_production_2021, get_monthly_aggregation
+from lib.cache_metrics import cache_data, record
+from lib.repository import get_repository, cached_query
 
 st.set_page_config(page_title="Price Area Dashboard", page_icon="⚡", layout="wide")
 st.title("⚡ Price Area Dashboard (Elhub demo + Open-Meteo 2021)")
@@ -15,10 +17,12 @@ st.title("⚡ Price Area Dashboard (Elhub demo + Open-Meteo 2021)")
 DATA_PATH = "data/open-meteo-subset.csv"
 
 # ------------- Helper: Load or auto-generate ERA5 demo data -------------
-@st.cache_data
+@cache_data("price_area.era5_csv")
 def load_era5_data():
+    t0 = time.perf_counter()
     if os.path.exists(DATA_PATH):
         df = pd.read_csv(DATA_PATH, parse_dates=["time"])
+        record(DATA_PATH, "disk", hit=True, key=DATA_PATH, seconds=time.perf_counter() - t0)
         st.info("✅ Using cached ERA5 data from local file.")
     else:
         st.warning("No cached ERA5 file found. Creating demo dataset...")
@@ -34,6 +38,8 @@ def load_era5_data():
         })
         os.makedirs("data", exist_ok=True)
         df.to_csv(DATA_PATH, index=False)
+        record(DATA_PATH, "disk", hit=False, key=DATA_PATH, seconds=time.perf_counter() - t0,
+               nbytes=os.path.getsize(DATA_PATH))
         st.success("✅ ERA5 dataset created and cached at data/open-meteo-subset.csv")
     return df
 
@@ -41,25 +47,31 @@ def load_era5_data():
 era5_df = load_era5_data()
 
 # ------------- Real Elhub data from MongoDB (NO FAKE DATA!) -------------
-@st.cache_data(ttl=3600)
+repo = get_repository()
+YEAR_START, YEAR_END = datetime(2021, 1, 1), datetime(2021, 12, 31, 23)
+
 def load_real_elhub_monthly():
     """
-    Load REAL 2021 production data from MongoDB and aggregate by month.
-    This replaces the fake demo data.
+    Load REAL 2021 monthly production totals through the data repository.
+    Served from the monthly rollup maintained at ingest time, so the pie
+    chart and monthly view never re-aggregate the hourly records.
     """
-    df = get_monthly_aggregation()
+    df = cached_query(repo, start=YEAR_START, end=YEAR_END, resolution="month")
 
     if df.empty:
         st.error("Failed to load data from MongoDB")
         return pd.DataFrame()
 
+    df = df.assign(month=df['startTime'].dt.month)
+
     # Pivot to wide format for easier visualization
     df_pivot = df.pivot_table(
         index=['priceArea', 'month'],
         columns='productionGroup',
         values='quantityKwh',
         aggfunc='sum',
-        fill_value=0
+        fill_value=0,
+        observed=True
     ).reset_index()
 
     return df_pivot
@@ -101,38 +113,31 @@ else:
     st.warning("Please select at least one production group")
 
 # line chart of hourly production - REAL DATA from MongoDB
-df_full = load_production_2021()
-
-if df_full.empty:
-    st.warning("No data available from MongoDB")
-else:
-    # Filter data
-    if groups:
-        df_line = df_full[
-            (df_full['priceArea'] == area) &
-            (df_full['productionGroup'].isin(groups)) &
-            (df_full['startTime'].dt.month == month)
-        ].copy()
-
-        if df_line.empty:
-            st.warning(f"No data found for {area}, month {month} with selected production groups")
-            # Show available months for debugging
-            available_months = df_full[df_full['priceArea'] == area]['startTime'].dt.month.unique()
-            st.info(f"Available months for {area}: {sorted(available_months.tolist())}")
-        else:
-            # Rename columns for compatibility
-            df_line = df_line.rename(columns={'startTime': 'time', 'quantityKwh': 'quantitykWh'})
-
-            fig_line = px.line(
-                df_line,
-                x="time",
-                y="quantitykWh",
-                color="productionGroup",
-                title=f"Hourly production — {area}, month={month}"
-            )
-            st.plotly_chart(fig_line, use_container_width=True)
+if groups:
+    # Only the selected area, groups and month are fetched
+    month_start = datetime(2021, month, 1)
+    month_end = (pd.Timestamp(month_start) + pd.offsets.MonthEnd(0)).replace(hour=23)
+    df_line = cached_query(repo, area=area, groups=groups, start=month_start, end=month_end)
+
+    if df_line.empty:
+        st.warning(f"No data found for {area}, month {month} with selected production groups")
+        # Show available months for debugging
+        available_months = df_area['month'].unique()
+        st.info(f"Available months for {area}: {sorted(available_months.tolist())}")
     else:
-        st.warning("Please select at least one production group to view the line chart")
+        # Rename columns for compatibility
+        df_line = df_line.rename(columns={'startTime': 'time', 'quantityKwh': 'quantitykWh'})
+
+        fig_line = px.line(
+            df_line,
+            x="time",
+            y="quantitykWh",
+            color="productionGroup",
+            title=f"Hourly production — {area}, month={month}"
+        )
+        st.plotly_chart(fig_line, use_container_width=True)
+else:
+    st.warning("Please select at least one production group to view the line chart")
 
 # ------------- Footer / Data Source -------------
 with st.expander("📂 Data Source"):
@@ -3,19 +3,17 @@ import streamlit as st
 import pandas as pd
 import sys
 sys.path.append('..')
-from lib.mongodb_client import load_production_2021
-from notebooks.utils_analysis import (
-    stl_production_plot, spectrogram_production_plot, combos_available
-)
+from lib.repository import get_repository, cached_availability, cached_query
+from lib.snapshot import DEFAULT_STL, load_snapshot, stl_components
+from notebooks.utils_analysis import stl_production_plot, spectrogram_production_plot
 
 st.set_page_config(page_title="Analysis A — STL & Spectrogram", page_icon="⚡", layout="wide")
 st.title("⚡ Analysis A — STL & Spectrogram (Elhub production)")
 
 # -------- Load data from MongoDB (NO CSV!) --------
-@st.cache_data
 def load_prod():
     """Load production data from MongoDB - NO CSV files!"""
-    df = load_production_2021()
+    df = cached_query(get_repository())
 
     if df.empty:
         st.error("Failed to load production data from MongoDB")
@@ -28,8 +26,8 @@ def load_prod():
 
 prod = load_prod()
 
-# Build availability (robust to column names)
-avail_map, avail_table = combos_available(prod)
+# Availability per area (cached per data version; warmed by the home page)
+avail_map, avail_table = cached_availability(get_repository())
 
 # -------- UI --------
 st.subheader("Price area")
@@ -50,20 +48,29 @@ group = st.selectbox("", valid_groups, index=0, key="a3_group")
 tabs = st.tabs(["STL decomposition", "Spectrogram"])
 
 with tabs[0]:
-    c1, c2, c3, c4 = st.columns([1.2, 1.2, 1.2, 0.8])
+    c1, c2, c3, c4, c5 = st.columns([1.2, 1.2, 1.2, 0.8, 1.0])
     with c1:
         period = st.number_input("STL period (hours)", value=24*7, min_value=24, step=24)
     with c2:
         seasonal = st.slider("Seasonal smoother", 7, 61, 13, step=2)
     with c3:
-        trend = st.slider("Trend smoother", 7, 121, 31, step=2)
+        trend = st.slider("Trend smoother", 7, 121, 31, step=2,
+                          help="Hours; raised to period + 1 when it is not above the STL period.")
     with c4:
         robust = st.checkbox("Robust", value=True)
+    with c5:
+        mode = st.selectbox("Mode", ["auto", "fast", "exact"],
+                            help="fast: trend on daily means, daily + period seasonality on hours "
+                                 "(MSTL-style). auto uses it for series longer than two years.")
 
-    fig, ok, msg = stl_production_plot(
-        prod, area=area, group=group,
-        period=int(period), seasonal=int(seasonal), trend=int(trend), robust=bool(robust)
-    )
+    # The default view comes precomputed from the deployment snapshot when it is current
+    params = {"period": int(period), "seasonal": int(seasonal), "trend": int(trend), "robust": bool(robust)}
+    snap = load_snapshot()
+    components = None
+    if mode != "fast" and params == DEFAULT_STL and snap is not None and snap.is_current(get_repository().sources):
+        components = stl_components(snap, area, group)
+
+    fig, ok, msg = stl_production_plot(prod, area=area, group=group, components=components, mode=mode, **params)
     if ok:
         st.plotly_chart(fig, use_container_width=True)
     else:
@@ -1,9 +1,13 @@
 # --- A1 Page 2: CSV Table with LineChartColumn (with safe fallback) ---
 
+import time
 import streamlit as st
 import pandas as pd
 from pathlib import Path
-from lib.open_meteo import fetch_era5
+from lib.cache_metrics import cache_data, cache_resource, record
+from lib.open_meteo import HOURLY_VARS, fetch_era5
+from lib.snapshot import load_snapshot
+from lib.sparklines import MONTHS, compute_sparklines, load_sparklines, sparkline_table
 
 st.set_page_config(page_title="Data Table", page_icon="📄", layout="wide")
 st.title("📄 A1 — CSV Table with LineChartColumn")
@@ -11,11 +15,14 @@ st.title("📄 A1 — CSV Table with LineChartColumn")
 CSV_PATH = Path("data/open-meteo-subset.csv")
 CSV_PATH.parent.mkdir(parents=True, exist_ok=True)
 
-@st.cache_data(show_spinner=True)
+@cache_data("data_table.csv", show_spinner=True)
 def load_csv_or_make() -> pd.DataFrame:
     # 1) try the required local CSV (A1 requirement)
+    t0 = time.perf_counter()
     if CSV_PATH.exists():
-        return pd.read_csv(CSV_PATH, parse_dates=["time"])
+        df = pd.read_csv(CSV_PATH, parse_dates=["time"])
+        record(str(CSV_PATH), "disk", hit=True, key=str(CSV_PATH), seconds=time.perf_counter() - t0)
+        return df
 
     # 2) fall back to already-downloaded ERA5 cached on the PriceArea page (A3)
     sess = st.session_state.get("ind320_meteo_df")
@@ -29,25 +36,53 @@ def load_csv_or_make() -> pd.DataFrame:
                         "relative_humidity_2m","wind_speed_10m"] if c in df.columns]
     df = df[keep].copy()
     df.to_csv(CSV_PATH, index=False)
+    record(str(CSV_PATH), "disk", hit=False, key=str(CSV_PATH), seconds=time.perf_counter() - t0,
+           nbytes=CSV_PATH.stat().st_size)
     return df
 
-df = load_csv_or_make()
-st.caption(f"Source: `{CSV_PATH}` (auto-created if missing). Cached for speed.")
 
-# === Build table with one row per variable and a small line preview of first month ===
-df["month"] = pd.to_datetime(df["time"], utc=True).dt.month
-first_month = int(df["month"].min())
-month_df = df[df["month"] == first_month].reset_index(drop=True)
+@cache_resource("data_table.csv_sparklines", show_spinner=False)
+def csv_sparklines():
+    """Sparklines of the local CSV (Bergen, NO5), computed once per process."""
+    df = load_csv_or_make()
+    year = int(pd.to_datetime(df["time"], utc=True).dt.year.mode()[0])
+    return compute_sparklines({("NO5", year): df}, HOURLY_VARS, {"NO5": "Bergen"})
 
-vars_ = [c for c in df.columns if c not in ("time", "month")]
-rows = [{"variable": v, "first_month": month_df[v].tolist()} for v in vars_]
-table = pd.DataFrame(rows)
+
+# Precomputed for every area/year in the deployment snapshot; the local CSV otherwise
+stored = load_sparklines(load_snapshot())
+if stored is not None:
+    index, values = stored
+    st.caption("Source: precomputed 6-hour ERA5 sparklines from the deployment snapshot "
+               "(`scripts/build_snapshot.py`).")
+else:
+    index, values = csv_sparklines()
+    st.caption(f"Source: `{CSV_PATH}` (auto-created if missing), downsampled once per process.")
+
+# === One row per area, year and variable; one 6-hourly line preview per month ===
+c1, c2, c3 = st.columns(3)
+with c1:
+    areas = st.multiselect("Areas", sorted(index["area"].unique()), default=sorted(index["area"].unique()))
+with c2:
+    years = st.multiselect("Years", sorted(index["year"].unique()), default=sorted(index["year"].unique()))
+with c3:
+    variables = st.multiselect("Variables", list(index["variable"].unique()),
+                               default=list(index["variable"].unique()))
+
+table = sparkline_table(index, values, areas=areas, years=years, variables=variables)
 
 st.dataframe(
     table,
     column_config={
+        "area": st.column_config.TextColumn("Area"),
+        "city": st.column_config.TextColumn("City"),
+        "year": st.column_config.NumberColumn("Year", format="%d"),
         "variable": st.column_config.TextColumn("Variable"),
-        "first_month": st.column_config.LineChartColumn("First month (hourly)"),
+        "mean": st.column_config.NumberColumn("Mean", format="%.2f"),
+        "min": st.column_config.NumberColumn("Min", format="%.2f"),
+        "max": st.column_config.NumberColumn("Max", format="%.2f"),
+        **{m: st.column_config.LineChartColumn(m) for m in MONTHS},
     },
     use_container_width=True,
+    hide_index=True,
 )
@@ -1,20 +1,28 @@
 # --- A1 Page 3: Plot page (column picker + month selector) with safe fallback ---
 
+import time
 import streamlit as st
 import pandas as pd
 from pathlib import Path
-from lib.open_meteo import fetch_era5
+from lib.cache_metrics import cache_data, cache_resource, record
+from lib.open_meteo import AREA_CITIES, fetch_era5
+from lib.prefetch import cached_area_era5
+from lib.time_index import TimeIndexedFrame
 
 st.set_page_config(page_title="Plot", page_icon="📈", layout="wide")
 st.title("📈 A1 — Plot with selectors")
 
 CSV_PATH = Path("data/open-meteo-subset.csv")
 CSV_PATH.parent.mkdir(parents=True, exist_ok=True)
+CSV_SOURCE = "Local CSV (Bergen)"
 
-@st.cache_data(show_spinner=True)
+@cache_data("plot.csv", show_spinner=True)
 def load_csv_or_make() -> pd.DataFrame:
+    t0 = time.perf_counter()
     if CSV_PATH.exists():
-        return pd.read_csv(CSV_PATH, parse_dates=["time"])
+        df = pd.read_csv(CSV_PATH, parse_dates=["time"])
+        record(str(CSV_PATH), "disk", hit=True, key=str(CSV_PATH), seconds=time.perf_counter() - t0)
+        return df
 
     sess = st.session_state.get("ind320_meteo_df")
     if isinstance(sess, pd.DataFrame) and "time" in sess.columns:
@@ -26,26 +34,51 @@ def load_csv_or_make() -> pd.DataFrame:
                         "relative_humidity_2m","wind_speed_10m"] if c in df.columns]
     df = df[keep].copy()
     df.to_csv(CSV_PATH, index=False)
+    record(str(CSV_PATH), "disk", hit=False, key=str(CSV_PATH), seconds=time.perf_counter() - t0,
+           nbytes=CSV_PATH.stat().st_size)
     return df
 
-df = load_csv_or_make()
-df["time"] = pd.to_datetime(df["time"], utc=True)
-df["month"] = df["time"].dt.month
+
+@cache_resource("plot.indexed_frame", max_entries=8, show_spinner=True)
+def indexed_frame(source: str, years: tuple) -> TimeIndexedFrame:
+    """Sorted, period-indexed frame per (source, years); built once, then sliced without copying."""
+    if source == CSV_SOURCE:
+        return TimeIndexedFrame(load_csv_or_make())
+    area = source.split(" ")[0]
+    return TimeIndexedFrame(pd.concat([cached_area_era5(area, y) for y in years], ignore_index=True))
+
 
 # === Controls per spec ===
-cols = [c for c in df.columns if c not in ("time", "month")]
+sources = [CSV_SOURCE] + [f"{a} ({city})" for a, (city, _, _) in AREA_CITIES.items()]
+c1, c2 = st.columns(2)
+with c1:
+    source = st.selectbox("Data", sources, index=0)
+with c2:
+    years = (2021, 2021) if source == CSV_SOURCE else st.slider("Years", 2021, 2024, (2021, 2021))
+
+try:
+    tf = indexed_frame(source, tuple(range(years[0], years[1] + 1)))
+except Exception as e:
+    st.error(f"Could not load ERA5 data: {e}")
+    st.stop()
+
+cols = [c for c in tf.df.columns if c != "time"]
 choice = st.selectbox("Choose a column (or All)", ["All"] + cols, index=0)
 
-months_sorted = sorted(df["month"].unique())
-default_month = months_sorted[0] if months_sorted else 1
-m = st.select_slider("Select a month", options=months_sorted, value=default_month)
+months = tf.periods("month")
+if not months:
+    st.warning("No rows in the selected data.")
+    st.stop()
+m = st.select_slider("Select a month", options=months, value=months[0],
+                     format_func=lambda ym: f"{ym[0]}-{ym[1]:02d}")
 
 # === Plot ===
-plot_df = df[df["month"] == m].set_index("time")
+plot_df = tf.month(*m).set_index("time")
 
 if choice == "All":
     st.line_chart(plot_df[cols], use_container_width=True)
 else:
     st.line_chart(plot_df[[choice]], use_container_width=True)
 
-st.caption(f"Data: `{CSV_PATH}` (cached & auto-created if missing). Default shows the first month.")
+st.caption(f"Data: `{CSV_PATH}` (cached & auto-created if missing) or ERA5 per area. "
+           f"Default shows the first month.")
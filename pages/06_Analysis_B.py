@@ -4,9 +4,12 @@ import numpy as np
 import pandas as pd
 import streamlit as st
 import plotly.express as px
-from sklearn.neighbors import LocalOutlierFactor
-from scipy.fftpack import dct, idct
 from pandas.api.types import is_datetime64_any_dtype
+from time import perf_counter
+import sys
+sys.path.append('..')
+from lib.cache_metrics import cache_data, record
+from notebooks.utils_analysis import spc_outliers, lof_anomalies
 
 st.set_page_config(page_title="Analysis B — SPC & LOF (Open-Meteo 2021)", page_icon="⚡", layout="wide")
 st.title("⚡ Analysis B — SPC & LOF (Open-Meteo 2021)")
@@ -14,13 +17,14 @@ st.title("⚡ Analysis B — SPC & LOF (Open-Meteo 2021)")
 DATA_PATH = "data/open-meteo-subset.csv"
 
 # ---------- Data loader with auto-fallback ----------
-@st.cache_data
+@cache_data("analysis_b.era5_csv")
 def load_or_build_era5():
     """
     Returns a DataFrame with columns:
       time (datetime64[ns]), temperature_2m (float), precipitation (float), era5_year (int), city (str)
     If the CSV isn't present, a small 2021 dataset is created and saved.
     """
+    t0 = perf_counter()
     if os.path.exists(DATA_PATH):
         df = pd.read_csv(DATA_PATH)
         # Robust time parsing (works with strings or already-datetimes, UTC or naive)
@@ -47,6 +51,7 @@ def load_or_build_era5():
             base[spikes_idx] += rng.uniform(3, 10, len(spikes_idx))
             df["precipitation"] = base
 
+        record(DATA_PATH, "disk", hit=True, key=DATA_PATH, seconds=perf_counter() - t0)
         st.info("✅ ERA5 data loaded from cache (data/open-meteo-subset.csv).")
         return df
 
@@ -70,6 +75,8 @@ def load_or_build_era5():
     })
     os.makedirs("data", exist_ok=True)
     df.to_csv(DATA_PATH, index=False)
+    record(DATA_PATH, "disk", hit=False, key=DATA_PATH, seconds=perf_counter() - t0,
+           nbytes=os.path.getsize(DATA_PATH))
     st.success("✅ Demo ERA5 dataset created and cached at data/open-meteo-subset.csv")
     return df
 
@@ -108,24 +115,10 @@ with tabs[0]:
         k_sigma = st.slider("SPC threshold (k × MAD)",
                             min_value=1.0, max_value=6.0, value=3.0, step=0.1, key="spc_sigma")
     
-    # SPC Analysis
-    y = df["temperature_2m"].to_numpy()
-    Y = dct(y, type=2, norm="ortho")
-    cut = np.clip(cutoff, 0, len(Y) - 1)
-    Y[:cut] = 0.0
-    satv = idct(Y, type=2, norm="ortho")
-    
-    med = np.median(satv)
-    mad = np.median(np.abs(satv - med))
-    sigma = 1.4826 * mad if mad > 0 else np.std(satv)
-    upper = k_sigma * sigma
-    lower = -k_sigma * sigma
-    is_out = (satv > upper) | (satv < lower)
-    
-    # Calculate Trend (Original - SATV) to plot boundaries on the original scale
-    trend = y - satv
-    upper_boundary = trend + upper
-    lower_boundary = trend + lower
+    # SPC Analysis (notebooks/utils_analysis.spc_outliers)
+    spc = spc_outliers(df["temperature_2m"].to_numpy(), cutoff=cutoff, k_sigma=k_sigma)
+    satv, trend, is_out, mad = spc["satv"], spc["trend"], spc["is_outlier"], spc["mad"]
+    upper_boundary, lower_boundary = spc["upper"], spc["lower"]
 
     df_spc = pd.DataFrame({
         "time": df["time"],
@@ -186,11 +179,8 @@ with tabs[1]:
     with col2:
         n_neighbors = st.slider("LOF neighbors", 5, 50, 20, step=1, key="lof_neighbors")
     
-    # LOF Analysis
-    X = df[["precipitation"]].to_numpy()
-    lof = LocalOutlierFactor(n_neighbors=n_neighbors, contamination=lof_frac)
-    labels = lof.fit_predict(X)  # -1 outlier, 1 inlier
-    is_anom = (labels == -1)
+    # LOF Analysis (notebooks/utils_analysis.lof_anomalies)
+    is_anom = lof_anomalies(df["precipitation"].to_numpy(), contamination=lof_frac, n_neighbors=n_neighbors)
     
     df_lof = pd.DataFrame({
         "time": df["time"],
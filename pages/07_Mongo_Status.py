@@ -1,21 +1,81 @@
 import streamlit as st
 import pandas as pd
+from lib import cache_metrics
+from lib.health import get_health_monitor
 
 st.set_page_config(page_title="MongoDB", page_icon="🗄️", layout="wide")
 st.title("🗄️ A2 — MongoDB connection status")
 
-ok = False
-try:
-    from pymongo import MongoClient
-    uri = st.secrets.get("MONGO_URI", None)
-    if uri:
-        client = MongoClient(uri, serverSelectionTimeoutMS=3000)
-        client.admin.command("ping")
-        ok = True
-except Exception as e:
-    st.warning(f"Mongo not connected: {e}")
-
-if ok:
+# Status comes from the background probe on the pooled client (lib/health.py)
+monitor = get_health_monitor()
+status = monitor.status() if monitor else {'status': 'disconnected'}
+
+if status['status'] == 'connected':
     st.success("MongoDB connected via secrets ✅")
+elif status['status'] == 'checking':
+    st.info("Waiting for the first health probe…")
 else:
+    st.warning(f"Mongo not connected: {status.get('message', 'no client')}")
     st.info("Add `MONGO_URI` to **st.secrets** for cloud deploy; local fallback uses CSV files in `/data`.")
+
+if monitor:
+    latency = status['latency']
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Ping p50", f"{latency['p50_ms']:.1f} ms" if latency['p50_ms'] is not None else "—")
+    c2.metric("Ping p95", f"{latency['p95_ms']:.1f} ms" if latency['p95_ms'] is not None else "—")
+    c3.metric("Ping p99", f"{latency['p99_ms']:.1f} ms" if latency['p99_ms'] is not None else "—")
+    c4.metric("Documents (estimated)",
+              f"{status['document_count']:,}" if status.get('document_count') is not None else "—")
+
+    details = {
+        'Server version': status.get('version'),
+        'Storage size (bytes)': status.get('storage_bytes'),
+        'Last checked (UTC)': status.get('last_checked'),
+        'Latency samples': latency['samples'],
+        'Probe interval (s)': monitor.interval,
+    }
+    st.dataframe(pd.DataFrame(details.items(), columns=['Metric', 'Value']).astype(str),
+                 use_container_width=True, hide_index=True)
+
+# ---------- Cache layers ----------
+st.subheader("Cache layers")
+st.markdown("""
+Every cache of the app reports to `lib/cache_metrics.py`: the Streamlit
+caches, the per-session ERA5 cache and the CSV fallbacks on disk. Counts
+are for this process since it started (or since the last reset); entries
+and evictions are inferred from the keys each cache stored.
+""")
+
+caches = pd.DataFrame(cache_metrics.stats())
+if caches.empty:
+    st.info("No cache has been used yet — open the other pages first.")
+else:
+    t1, t2, t3, t4 = st.columns(4)
+    lookups = caches["hits"].sum() + caches["misses"].sum()
+    t1.metric("Hit rate (all layers)", f"{caches['hits'].sum() / lookups:.1%}" if lookups else "—")
+    t2.metric("Evictions", f"{caches['evictions'].sum():,}")
+    t3.metric("Held in caches", f"{caches['bytes'].fillna(0).sum() / 1e6:,.1f} MB")
+    t4.metric("Compute time saved", f"{caches['saved_s'].sum():,.1f} s")
+
+    st.dataframe(
+        caches,
+        column_config={
+            "hit_rate": st.column_config.ProgressColumn("hit rate", format="%.2f", min_value=0, max_value=1),
+            "bytes": st.column_config.NumberColumn("bytes", format="%d"),
+            "ttl_s": st.column_config.NumberColumn("ttl (s)"),
+            "miss_ms_avg": st.column_config.NumberColumn("miss (ms, avg)", format="%.1f"),
+            "hit_ms_avg": st.column_config.NumberColumn("hit (ms, avg)", format="%.2f"),
+            "saved_s": st.column_config.NumberColumn("saved (s)", format="%.1f"),
+        },
+        use_container_width=True,
+        hide_index=True,
+    )
+
+    d1, d2, d3 = st.columns(3)
+    d1.download_button("Export JSON", cache_metrics.export_json(),
+                       file_name="ind320_caches.json", mime="application/json")
+    d2.download_button("Export Prometheus text", cache_metrics.export_prometheus(),
+                       file_name="ind320_caches.prom", mime="text/plain")
+    if d3.button("Reset counters"):
+        cache_metrics.reset()
+        st.rerun()
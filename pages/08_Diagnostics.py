@@ -0,0 +1,147 @@
+# pages/08_Diagnostics.py
+import streamlit as st
+import pandas as pd
+import sys
+sys.path.append('..')
+from lib import cassandra_cluster, instrumentation
+from lib.profiling import PROFILE_DIR, list_profiles
+
+st.set_page_config(page_title="Diagnostics", page_icon="🩺", layout="wide")
+st.title("🩺 Diagnostics — where does page time go?")
+
+st.markdown("""
+Timings recorded by `lib/instrumentation.py` for the data loaders, the
+analysis functions and the SPC/LOF steps. Start the app with
+`IND320_INSTRUMENT=1` to record from the first render, or switch it on here.
+""")
+
+c1, c2 = st.columns([1, 3])
+with c1:
+    on = st.toggle("Record timings", value=instrumentation.is_enabled())
+    instrumentation.enable(on)
+    if st.button("Clear buffer"):
+        instrumentation.clear()
+
+summary = pd.DataFrame(instrumentation.summary())
+
+st.subheader("Per function")
+if summary.empty:
+    st.info("No timings recorded yet — enable recording and open the other pages.")
+else:
+    st.dataframe(
+        summary,
+        column_config={
+            "total_ms": st.column_config.NumberColumn("total (ms)", format="%.1f"),
+            "p50_ms": st.column_config.NumberColumn("p50 (ms)", format="%.1f"),
+            "p95_ms": st.column_config.NumberColumn("p95 (ms)", format="%.1f"),
+            "max_ms": st.column_config.NumberColumn("max (ms)", format="%.1f"),
+        },
+        use_container_width=True,
+        hide_index=True,
+    )
+
+    st.subheader("Recent calls")
+    recent = pd.DataFrame(instrumentation.records()[-200:][::-1])
+    recent["ts"] = pd.to_datetime(recent["ts"], unit="s")
+    st.dataframe(recent, use_container_width=True, hide_index=True)
+
+    d1, d2 = st.columns(2)
+    d1.download_button("Export JSON", instrumentation.export_json(),
+                       file_name="ind320_timings.json", mime="application/json")
+    d2.download_button("Export Prometheus text", instrumentation.export_prometheus(),
+                       file_name="ind320_timings.prom", mime="text/plain")
+
+# ---------- Sampling profiles ----------
+st.subheader("Page profiles")
+st.markdown(f"""
+Add `?profile=1` to any page URL (or start the app with `IND320_PROFILE=1`)
+to record that rerun with a sampling profiler (`lib/profiling.py`, needs
+`pyinstrument`). Files are written to `{PROFILE_DIR}/`; open the
+`.speedscope.json` in [speedscope](https://www.speedscope.app).
+""")
+
+profiles = list_profiles()
+if not profiles:
+    st.info("No profiles recorded yet.")
+else:
+    overview = pd.DataFrame([
+        {"started": p["started"], "page": p["page"], "wall_s": p["wall_s"], "samples": p["samples"],
+         "top package": p["packages"][0]["package"] if p["packages"] else None}
+        for p in profiles
+    ])
+    st.dataframe(overview, use_container_width=True, hide_index=True,
+                 column_config={"wall_s": st.column_config.NumberColumn("wall (s)", format="%.2f")})
+
+    labels = [f"{p['started']} — {p['page']}" for p in profiles]
+    chosen = profiles[labels.index(st.selectbox("Profile", labels))]
+    p1, p2 = st.columns([1, 2])
+    with p1:
+        st.caption("Self time per package")
+        st.dataframe(pd.DataFrame(chosen["packages"]), use_container_width=True, hide_index=True,
+                     column_config={"self_s": st.column_config.NumberColumn("self (s)", format="%.3f")})
+    with p2:
+        st.caption("Top functions by self time")
+        st.dataframe(pd.DataFrame(chosen["functions"]), use_container_width=True, hide_index=True,
+                     column_config={"self_s": st.column_config.NumberColumn("self (s)", format="%.3f"),
+                                    "total_s": st.column_config.NumberColumn("total (s)", format="%.3f")})
+    f1, f2 = st.columns(2)
+    for col, key, mime, label in ((f1, "speedscope", "application/json", "Download speedscope"),
+                                  (f2, "html", "text/html", "Download HTML call tree")):
+        try:
+            with open(chosen[key], "rb") as f:
+                col.download_button(label, f.read(), file_name=chosen[key].split("/")[-1], mime=mime)
+        except OSError:
+            col.caption(f"{key} file missing")
+
+# ---------- Cassandra requests ----------
+st.subheader("Cassandra requests")
+st.markdown("""
+Latency of every request the app's Cassandra session sends, per coordinator
+node (`lib/cassandra_cluster.py`). Reads are token-aware and speculatively
+retried on another replica when a node is slow, so p99 should stay flat
+while one node restarts.
+""")
+
+with st.expander("Cluster profile"):
+    from cassandra_client import check_connection, get_cluster_settings
+
+    st.json(get_cluster_settings())
+    if st.button("Check nodes"):
+        status = check_connection()
+        if status.get("nodes"):
+            st.dataframe(pd.DataFrame(status["nodes"]), use_container_width=True, hide_index=True)
+        else:
+            st.write(status)
+
+latency = cassandra_cluster.latency_stats()
+total = latency["total"]
+if not total["requests"]:
+    st.info("No Cassandra requests recorded yet — open a page with IND320_BACKEND=cassandra.")
+else:
+    m = st.columns(5)
+    m[0].metric("Requests", f"{total['requests']:,}")
+    m[1].metric("Errors", f"{total['errors']:,}")
+    for col, q in zip(m[2:], (50, 95, 99)):
+        col.metric(f"p{q}", f"{total[f'p{q}_ms']:.1f} ms")
+
+    per_host = pd.DataFrame([
+        {"host": h, **{k: v for k, v in s.items() if k not in ("buckets", "error_types", "sum_s")}}
+        for h, s in latency["hosts"].items()
+    ])
+    st.dataframe(per_host, use_container_width=True, hide_index=True,
+                 column_config={k: st.column_config.NumberColumn(k.replace("_ms", " (ms)"), format="%.1f")
+                                for k in ("mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms")})
+
+    import plotly.express as px
+
+    fig = px.bar(x=[f"≤ {b}" if b != "+Inf" else f"> {cassandra_cluster.BUCKETS_MS[-1]}" for b in total["buckets"]],
+                 y=list(total["buckets"].values()), labels={"x": "latency (ms)", "y": "requests"},
+                 title="Request latency histogram")
+    st.plotly_chart(fig, use_container_width=True)
+
+    c1, c2 = st.columns(2)
+    c1.download_button("Export Prometheus histogram", cassandra_cluster.export_prometheus(),
+                       file_name="ind320_cassandra.prom", mime="text/plain")
+    if c2.button("Reset latencies"):
+        cassandra_cluster.reset_latencies()
+        st.rerun()
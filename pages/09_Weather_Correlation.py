@@ -0,0 +1,102 @@
+# pages/09_Weather_Correlation.py
+import numpy as np
+import pandas as pd
+import streamlit as st
+import plotly.express as px
+from datetime import datetime
+import sys
+sys.path.append('..')
+from lib.cache_metrics import cache_resource
+from lib.repository import get_repository, cached_query
+from lib.open_meteo import AREA_CITIES, HOURLY_VARS
+from lib.prefetch import cached_area_era5
+from lib.correlation import align, correlation_summary, cross_correlation, rolling_corr
+
+st.set_page_config(page_title="Weather vs Production", page_icon="🌬️", layout="wide")
+st.title("🌬️ Weather vs Production — Correlation")
+
+st.markdown("""
+Hourly Elhub production per price area and group, aligned with ERA5 weather for
+the area's city on one UTC hourly grid. Sliding-window and lagged correlations
+are computed for **all areas and groups at once** (lib/correlation.py).
+""")
+
+# ---------- Data ----------
+@cache_resource("weather_correlation.panel", max_entries=4, show_spinner=False)
+def build_panel(_prod: pd.DataFrame, prod_key: tuple, years: tuple):
+    weather = {}
+    for area in AREA_CITIES:
+        parts = [cached_area_era5(area, y) for y in years]
+        weather[area] = pd.concat(parts, ignore_index=True)
+    start, end = datetime(years[0], 1, 1), datetime(years[-1], 12, 31, 23)
+    return align(_prod, weather, HOURLY_VARS, start=start, end=end)
+
+
+repo = get_repository()
+c1, c2 = st.columns(2)
+with c1:
+    year_range = st.slider("Years", 2021, 2024, (2021, 2021))
+with c2:
+    variable = st.selectbox("Weather variable", HOURLY_VARS, index=HOURLY_VARS.index("wind_speed_10m"))
+years = tuple(range(year_range[0], year_range[1] + 1))
+
+start, end = datetime(years[0], 1, 1), datetime(years[-1], 12, 31, 23)
+with st.spinner("Loading production…"):
+    prod = cached_query(repo, start=start, end=end)
+if prod.empty:
+    st.error("No production data for the selected years.")
+    st.stop()
+
+try:
+    with st.spinner("Loading ERA5 and aligning…"):
+        panel = build_panel(prod, (repo.name, len(prod), str(prod["startTime"].max())), years)
+except Exception as e:
+    st.error(f"Could not load ERA5 weather: {e}")
+    st.stop()
+
+c3, c4 = st.columns(2)
+with c3:
+    window_days = st.slider("Sliding window (days)", 1, 90, 30)
+with c4:
+    max_lag = st.slider("Max lag (hours)", 6, 336, 72, step=6)
+
+# ---------- All series at once ----------
+summary = correlation_summary(panel, variable, max_lag=max_lag)
+
+st.subheader(f"Correlation with {variable} (all areas and groups)")
+heat = summary.pivot(index="productionGroup", columns="priceArea", values="corr")
+fig_heat = px.imshow(heat, color_continuous_scale="RdBu_r", zmin=-1, zmax=1, text_auto=".2f", aspect="auto")
+fig_heat.update_layout(height=360, coloraxis_colorbar_title="r (lag 0)")
+st.plotly_chart(fig_heat, use_container_width=True)
+st.dataframe(
+    summary.rename(columns={"best_lag_h": "best lag (h)", "best_corr": "r at best lag"}),
+    use_container_width=True, hide_index=True,
+)
+
+# ---------- One series in detail ----------
+st.subheader("Series detail")
+c5, c6 = st.columns(2)
+with c5:
+    area = st.radio("Price area", sorted({a for a, _ in panel.series}), horizontal=True)
+with c6:
+    groups = [g for a, g in panel.series if a == area]
+    group = st.selectbox("Production group", groups)
+
+i = panel.series_index(area, group)
+weather_rows = panel.weather_for_series(variable)
+window = window_days * 24
+r = rolling_corr(panel.production[i:i + 1], weather_rows[i:i + 1], window)[0]
+lags, cc = cross_correlation(panel.production[i:i + 1], weather_rows[i:i + 1], max_lag)
+
+fig_roll = px.line(x=panel.grid, y=r, labels={"x": "Time (UTC)", "y": "r"},
+                   title=f"{window_days}-day sliding correlation — {area}/{group} vs {variable} "
+                         f"({AREA_CITIES[area][0]})")
+fig_roll.update_yaxes(range=[-1, 1])
+st.plotly_chart(fig_roll, use_container_width=True)
+
+fig_cc = px.line(x=lags, y=cc[0], labels={"x": "Lag (h, positive = weather leads)", "y": "r"},
+                 title="Lagged cross-correlation")
+fig_cc.add_vline(x=0, line_dash="dot")
+best = int(np.argmax(np.abs(np.nan_to_num(cc[0], nan=0.0))))
+st.plotly_chart(fig_cc, use_container_width=True)
+st.caption(f"Strongest correlation r = {cc[0][best]:.2f} at lag {lags[best]} h.")
@@ -0,0 +1,64 @@
+# pages/10_Forecast.py
+import pandas as pd
+import streamlit as st
+import plotly.graph_objects as go
+import sys
+sys.path.append('..')
+from lib.repository import get_repository, cached_query
+from lib.forecasting import FIT_DIR, forecast_frame, list_fits, load_fit
+
+st.set_page_config(page_title="Production Forecast", page_icon="🔮", layout="wide")
+st.title("🔮 Production Forecast")
+
+st.markdown("""
+Forecasts per price area and production group from the stored model fits
+(STL + seasonal naive baseline and SARIMAX). This page never fits a model:
+run `python scripts/forecast_all.py` to (re)fit all series in parallel.
+""")
+
+fits = pd.DataFrame(list_fits())
+if fits.empty:
+    st.info(f"No stored fits in {FIT_DIR}/ yet. Run `python scripts/forecast_all.py` first.")
+    st.stop()
+
+c1, c2, c3 = st.columns(3)
+with c1:
+    area = st.radio("Price area", sorted(fits["area"].unique()), horizontal=True)
+with c2:
+    group = st.selectbox("Production group", sorted(fits.loc[fits["area"] == area, "group"].unique()))
+with c3:
+    models = sorted(fits.loc[(fits["area"] == area) & (fits["group"] == group), "model"].unique())
+    chosen = st.multiselect("Models", models, default=models)
+
+history_days = st.slider("History shown (days)", 3, 60, 14)
+
+fig = go.Figure()
+first_fit = None
+colors = {"stl_naive": "#2ca02c", "sarimax": "#d62728"}
+for model in chosen:
+    fit = load_fit(area, group, model)
+    if fit is None:
+        continue
+    first_fit = first_fit or fit
+    fc = forecast_frame(fit)
+    color = colors.get(model, "#9467bd")
+    fig.add_trace(go.Scatter(x=fc.index, y=fc["upper"], line=dict(width=0), showlegend=False, hoverinfo="skip"))
+    fig.add_trace(go.Scatter(x=fc.index, y=fc["lower"], line=dict(width=0), fill="tonexty",
+                             fillcolor="rgba(128,128,128,0.15)", showlegend=False, hoverinfo="skip"))
+    fig.add_trace(go.Scatter(x=fc.index, y=fc["mean"], name=model, mode="lines", line=dict(color=color)))
+
+if first_fit is not None:
+    end = pd.Timestamp(first_fit["train_end"])
+    hist = cached_query(get_repository(), area=area, groups=[group],
+                        start=end - pd.Timedelta(days=history_days), end=end)
+    if not hist.empty:
+        fig.add_trace(go.Scatter(x=hist["startTime"], y=hist["quantityKwh"], name="observed",
+                                 mode="lines", line=dict(color="#1f77b4")))
+
+fig.update_layout(title=f"{area}/{group} — forecast", xaxis_title="Time (UTC)", yaxis_title="kWh", height=480)
+st.plotly_chart(fig, use_container_width=True)
+
+st.subheader("Stored fits")
+cols = [c for c in ["area", "group", "model", "train_start", "train_end", "horizon", "nobs", "aic",
+                    "warm_start", "seconds", "fitted_at"] if c in fits.columns]
+st.dataframe(fits[cols].sort_values(["area", "group", "model"]), use_container_width=True, hide_index=True)
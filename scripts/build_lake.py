@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Build or update the local Parquet lake
+Assessment 4
+
+Writes Elhub production (from MongoDB, or a CSV/Parquet export with --file)
+and ERA5 for the price-area cities into the Hive-partitioned lake of
+lib/lake.py. Only the (area, year) partitions present in the input are
+rewritten, so re-running after a new ingest is cheap and idempotent.
+
+Select the lake for the app with IND320_BACKEND=lake (or DATA_BACKEND in
+secrets); pages then run their aggregations as DuckDB queries over the
+files instead of loading the hourly data.
+
+Usage:
+    python scripts/build_lake.py
+    python scripts/build_lake.py --file data/production_2021_cleaned.csv --era5-years 2021 2022
+    python scripts/build_lake.py --no-production --era5-years 2023
+    python scripts/build_lake.py --sql "SELECT priceArea, sum(quantityKwh) FROM production GROUP BY 1"
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.elhub_loader import get_mongo_uri, prepare_production_frame
+from lib.lake import LAKE_DIR, sql, write_dataset
+from lib.mongo_timeseries import production_collection
+
+PRODUCTION_FIELDS = ["priceArea", "productionGroup", "startTime", "quantityKwh"]
+
+
+def read_production(args) -> pd.DataFrame:
+    if args.file:
+        p = Path(args.file)
+        df = pd.read_parquet(p) if p.suffix == ".parquet" else pd.read_csv(p)
+        return prepare_production_frame(df)[PRODUCTION_FIELDS]
+
+    from pymongo import MongoClient
+
+    uri = get_mongo_uri()
+    if not uri:
+        raise SystemExit("[ERROR] Set MONGO_URI, add it to .streamlit/secrets.toml or pass --file")
+    client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+    # production_ts once migrated (scripts/migrate_mongo_timeseries.py), where loads now go
+    hourly, _ = production_collection(client[args.database], args.collection)
+    docs = hourly.find({}, {"_id": 0, **{f: 1 for f in PRODUCTION_FIELDS}})
+    df = pd.DataFrame(list(docs))
+    client.close()
+    if df.empty:
+        raise SystemExit("[ERROR] No production documents found")
+    df["startTime"] = pd.to_datetime(df["startTime"], utc=True).dt.tz_localize(None)
+    return df[PRODUCTION_FIELDS]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the local Parquet lake")
+    parser.add_argument("--file", help="CSV/Parquet export instead of MongoDB")
+    parser.add_argument("--database", default="ind320")
+    parser.add_argument("--collection", default="production_2021")
+    parser.add_argument("--no-production", action="store_true", help="Only write ERA5")
+    parser.add_argument("--era5-years", type=int, nargs="*", default=[2021],
+                        help="ERA5 years to download (none to skip)")
+    parser.add_argument("--lake", default=str(LAKE_DIR))
+    parser.add_argument("--sql", help="Run a query against the lake afterwards and print the result")
+    args = parser.parse_args()
+    lake = Path(args.lake)
+
+    print("=" * 70)
+    print("BUILD LOCAL PARQUET LAKE")
+    print("=" * 70)
+    print()
+
+    if not args.no_production:
+        t0 = time.perf_counter()
+        df = read_production(args)
+        result = write_dataset("production", df, lake)
+        print(f"[OK] production: {result['rows']:,} rows, {result['partitions']} partition(s) rewritten "
+              f"in {time.perf_counter() - t0:.1f}s (version {result['version']})")
+
+    if args.era5_years:
+        from lib.open_meteo import AREA_CITIES, fetch_era5
+
+        frames = []
+        for area, (city, lat, lon) in AREA_CITIES.items():
+            for year in args.era5_years:
+                try:
+                    frames.append(fetch_era5(lat=lat, lon=lon, year=year).assign(area=area))
+                    print(f"[OK] ERA5 {area} ({city}) {year}")
+                except Exception as e:
+                    print(f"[SKIP] ERA5 {area} ({city}) {year}: {e}")
+        if frames:
+            era5 = pd.concat(frames, ignore_index=True)
+            era5["time"] = pd.to_datetime(era5["time"], utc=True).dt.tz_localize(None)
+            result = write_dataset("era5", era5, lake)
+            print(f"[OK] era5: {result['rows']:,} rows, {result['partitions']} partition(s) rewritten "
+                  f"(version {result['version']})")
+
+    if args.sql:
+        print()
+        print(sql(args.sql, lake_dir=lake).to_string(index=False))
+
+    print()
+    print("[SUCCESS] Lake at", lake)
+
+
+if __name__ == "__main__":
+    main()
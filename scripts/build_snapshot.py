@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Build the cold-start snapshot for a deployment
+Assessment 4
+
+Precomputes what the first visitor of a fresh process would otherwise wait
+for and writes it to one memory-mappable file (lib/snapshot.py):
+
+    production              hourly production, sorted by area/group/time,
+                            with per-series row ranges
+    production_monthly      monthly totals (lib/rollups.rollup_frame)
+    era5/<area>/<year>      ERA5 for each area's city (lib/open_meteo.AREA_CITIES)
+    stl/<area>/<group>      STL at the Analysis A page defaults
+    sparklines              per-month ERA5 sparklines (lib/sparklines.py)
+
+The snapshot records the data version and updatedAt watermark it was built
+from. While the versions match, the pages serve it as is; after a new
+ingest the production frame fetches only the newer documents.
+
+Run it as a deploy step, after scripts/load_elhub.py.
+
+Usage:
+    python scripts/build_snapshot.py
+    python scripts/build_snapshot.py --years 2021 2022 2023 2024
+    python scripts/build_snapshot.py --file data/production_2021_cleaned.csv --no-era5
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.elhub_loader import PRODUCTION_KEY, get_mongo_uri, prepare_production_frame
+from lib.snapshot import DEFAULT_STL, SNAPSHOT_PATH, write_snapshot
+
+PRODUCTION_FIELDS = ["priceArea", "productionGroup", "startTime", "quantityKwh"]
+
+
+def read_production(args):
+    """Hourly production and the (versions, watermark) it corresponds to."""
+    if args.file:
+        p = Path(args.file)
+        df = pd.read_parquet(p) if p.suffix == ".parquet" else pd.read_csv(p)
+        return prepare_production_frame(df)[PRODUCTION_FIELDS], [], None
+
+    from pymongo import MongoClient
+    from lib.data_version import read_mongo_version
+    from lib.mongo_timeseries import production_collection
+
+    uri = get_mongo_uri()
+    if not uri:
+        raise SystemExit("[ERROR] Set MONGO_URI, add it to .streamlit/secrets.toml or pass --file")
+    client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+    db = client[args.database]
+    # Same layout (and version name) the app reads, see lib/mongo_timeseries.py
+    collection, name = production_collection(db, args.collection)
+    # Read the version first: a load finishing during the download then
+    # leaves the snapshot looking stale (refreshed by delta), never current
+    version = read_mongo_version(db, name)
+    docs = collection.find(
+        {}, {"_id": 0, **{f: 1 for f in PRODUCTION_FIELDS}, "updatedAt": 1}
+    )
+    df = pd.DataFrame(list(docs))
+    client.close()
+    if df.empty:
+        raise SystemExit("[ERROR] No production documents found")
+    df["startTime"] = pd.to_datetime(df["startTime"], utc=True).dt.tz_localize(None)
+    watermark = pd.to_datetime(df["updatedAt"]).max() if "updatedAt" in df.columns else None
+    return df[PRODUCTION_FIELDS], [["mongodb", name, version]], watermark
+
+
+def series_bounds(df: pd.DataFrame):
+    """Series keys and row ranges of a frame sorted by PRODUCTION_KEY."""
+    keys = df["priceArea"].astype(str) + "\x00" + df["productionGroup"].astype(str)
+    k = keys.to_numpy()
+    change = np.flatnonzero(k[1:] != k[:-1]) + 1
+    starts = np.r_[0, change].astype(np.int64)
+    ends = np.r_[change, len(k)].astype(np.int64)
+    return [k[s].split("\x00") for s in starts], starts, ends
+
+
+def stl_tables(df: pd.DataFrame, keys):
+    from statsmodels.tsa.seasonal import STL
+    from notebooks.utils_analysis import _ensure_stl_params, _series
+
+    tables = {}
+    for area, group in keys:
+        ts = _series(df, area, group)
+        if ts.empty:
+            continue
+        period, seasonal, trend = _ensure_stl_params(
+            len(ts.dropna()), DEFAULT_STL["period"], DEFAULT_STL["seasonal"], DEFAULT_STL["trend"]
+        )
+        if (period, seasonal, trend) != (DEFAULT_STL["period"], DEFAULT_STL["seasonal"], DEFAULT_STL["trend"]):
+            print(f"[SKIP] STL {area}/{group}: series too short for the default parameters")
+            continue
+        res = STL(ts, period=period, seasonal=seasonal, trend=trend, robust=DEFAULT_STL["robust"]).fit()
+        tables[f"stl/{area}/{group}"] = pd.DataFrame({
+            "time": ts.index, "trend": res.trend.to_numpy(),
+            "seasonal": res.seasonal.to_numpy(), "resid": res.resid.to_numpy(),
+        })
+    return tables
+
+
+def era5_tables(years):
+    from lib.open_meteo import AREA_CITIES, fetch_era5
+
+    tables = {}
+    for area, (city, lat, lon) in AREA_CITIES.items():
+        for year in years:
+            try:
+                tables[f"era5/{area}/{year}"] = fetch_era5(lat=lat, lon=lon, year=year)
+                print(f"[OK] ERA5 {area} ({city}) {year}")
+            except Exception as e:
+                print(f"[SKIP] ERA5 {area} ({city}) {year}: {e}")
+    return tables
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the cold-start snapshot")
+    parser.add_argument("--file", help="CSV/Parquet export instead of MongoDB")
+    parser.add_argument("--database", default="ind320")
+    parser.add_argument("--collection", default="production_2021")
+    parser.add_argument("--years", type=int, nargs="+", default=[2021], help="ERA5 years to include")
+    parser.add_argument("--no-era5", action="store_true", help="Skip the ERA5 downloads")
+    parser.add_argument("--no-stl", action="store_true", help="Skip the STL precomputation")
+    parser.add_argument("--out", default=str(SNAPSHOT_PATH))
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("BUILD COLD-START SNAPSHOT")
+    print("=" * 70)
+    print()
+
+    t0 = time.perf_counter()
+    df, versions, watermark = read_production(args)
+    df = df.sort_values(list(PRODUCTION_KEY), ignore_index=True)
+    keys, starts, ends = series_bounds(df)
+    print(f"[OK] {len(df):,} production rows, {len(keys)} series")
+
+    from lib.rollups import MONGO_MONTHLY, rollup_frame
+
+    monthly = rollup_frame(df, "M").rename(columns={"period": "startTime"})
+    tables = {"production": df, MONGO_MONTHLY: monthly[PRODUCTION_FIELDS]}
+    print(f"[OK] {len(monthly):,} monthly rollup rows")
+
+    if not args.no_stl:
+        stl = stl_tables(df, keys)
+        tables.update(stl)
+        print(f"[OK] STL for {len(stl)} series")
+    arrays = {"production.series_start": starts, "production.series_end": ends}
+    if not args.no_era5:
+        era5 = era5_tables(args.years)
+        tables.update(era5)
+
+        from lib.open_meteo import AREA_CITIES, HOURLY_VARS
+        from lib.sparklines import SPARK_TABLE, SPARK_VALUES, compute_sparklines
+
+        frames = {(name.split("/")[1], int(name.split("/")[2])): df for name, df in era5.items()}
+        index, values = compute_sparklines(frames, HOURLY_VARS, {a: c for a, (c, _, _) in AREA_CITIES.items()})
+        tables[SPARK_TABLE] = index
+        arrays[SPARK_VALUES] = values
+        print(f"[OK] {len(index)} sparkline rows ({values.nbytes / 1e3:.0f} kB)")
+
+    path = write_snapshot(
+        Path(args.out), tables,
+        arrays=arrays,
+        meta={"versions": versions, "watermark": watermark, "series": keys,
+              "source": args.file or f"{args.database}.{args.collection}"},
+    )
+    size_mb = path.stat().st_size / 1e6
+    print()
+    print(f"[SUCCESS] {path} ({size_mb:.1f} MB) in {time.perf_counter() - t0:.1f}s")
+    if not versions:
+        print("[OK] Built from a file: no data version recorded, pages refresh it from the database")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,9 +17,14 @@ NOT the CSV download URL!
 import requests
 import pandas as pd
 import json
+import sys
 from datetime import datetime
+from pathlib import Path
 import time
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.elhub_loader import PRODUCTION_KEY, clean_group_labels, drop_duplicate_hours
+
 def fetch_elhub_2021_production():
     """
     Fetch 2021 production data from Elhub API.
@@ -165,6 +170,11 @@ def clean_production_labels(df):
     """
     Clean production group labels to remove 'unspecified' suffix.
 
+    Labels are cleaned once per distinct value and broadcast back; placeholder
+    groups and duplicate (area, group, startTime) rows are dropped. All other
+    columns are kept as fetched: restricting and converting them is left to
+    prepare_production_frame when the CSV is loaded (scripts/load_elhub.py).
+
     Fixes instructor feedback:
     "All production group have an extra «unspecified» part in their labels."
     """
@@ -182,9 +192,13 @@ def clean_production_labels(df):
         print(f"  Unique groups: {df['productionGroup'].unique().tolist()}")
         print()
 
-        # Remove " - unspecified" and variants
-        df['productionGroup'] = df['productionGroup'].str.replace(r'\s*-\s*unspecified', '', regex=True, flags=re.IGNORECASE)
-        df['productionGroup'] = df['productionGroup'].str.strip()
+        # Remove " - unspecified" and variants, drop placeholder groups
+        # and duplicate hours (same helpers as scripts/load_elhub.py)
+        df = df.assign(productionGroup=clean_group_labels(df['productionGroup']).astype(object))
+        df = df[df['productionGroup'].notna()]
+        if set(PRODUCTION_KEY) <= set(df.columns):
+            df = drop_duplicate_hours(df)
+        df = df.reset_index(drop=True)
 
         print("After cleaning:")
         print(f"  Unique groups: {df['productionGroup'].unique().tolist()}")
@@ -197,8 +211,6 @@ def clean_production_labels(df):
 
 
 if __name__ == "__main__":
-    import re
-
     # Fetch data
     df = fetch_elhub_2021_production()
 
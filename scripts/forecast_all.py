@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Fit production forecasts for every price area and production group
+Assessment 4
+
+Reads the hourly production from MongoDB (or a CSV/Parquet export with
+--file), fits the STL + seasonal-naive baseline and SARIMAX for each
+(area, group) series in a process pool and stores the fits under
+data/forecast_fits/ (lib/forecasting.py). The forecast page only reads
+these files. Re-runs skip series whose data has not moved on and warm-start
+SARIMAX from the stored parameters otherwise.
+
+Usage:
+    python scripts/forecast_all.py
+    python scripts/forecast_all.py --workers 8 --models sarimax
+    python scripts/forecast_all.py --file data/production_2021_cleaned.csv --area NO5
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.elhub_loader import get_mongo_uri, prepare_production_frame
+from lib.mongo_timeseries import production_collection
+from lib.forecasting import (
+    DEFAULT_HORIZON,
+    DEFAULT_TRAIN_DAYS,
+    FIT_DIR,
+    MODELS,
+    forecast_all,
+)
+
+
+def read_production(args) -> pd.DataFrame:
+    if args.file:
+        p = Path(args.file)
+        df = pd.read_parquet(p) if p.suffix == ".parquet" else pd.read_csv(p)
+        return prepare_production_frame(df)
+
+    from pymongo import MongoClient
+
+    uri = get_mongo_uri()
+    if not uri:
+        raise SystemExit("[ERROR] Set MONGO_URI, add it to .streamlit/secrets.toml or pass --file")
+    client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+    # production_ts once migrated (scripts/migrate_mongo_timeseries.py), where loads now go
+    hourly, _ = production_collection(client[args.database], args.collection)
+    docs = hourly.find(
+        {}, {"_id": 0, "priceArea": 1, "productionGroup": 1, "startTime": 1, "quantityKwh": 1}
+    )
+    df = pd.DataFrame(list(docs))
+    client.close()
+    if df.empty:
+        raise SystemExit("[ERROR] No production documents found")
+    df["startTime"] = pd.to_datetime(df["startTime"], utc=True).dt.tz_localize(None)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit production forecasts for all series")
+    parser.add_argument("--file", help="CSV/Parquet export instead of MongoDB")
+    parser.add_argument("--database", default="ind320")
+    parser.add_argument("--collection", default="production_2021")
+    parser.add_argument("--area", action="append", help="Only these price areas (repeatable)")
+    parser.add_argument("--models", nargs="+", choices=MODELS, default=list(MODELS))
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--horizon", type=int, default=DEFAULT_HORIZON, help="Hours to forecast")
+    parser.add_argument("--train-days", type=int, default=DEFAULT_TRAIN_DAYS)
+    parser.add_argument("--refit", action="store_true", help="Refit even if the stored fit is current")
+    parser.add_argument("--fit-dir", default=str(FIT_DIR))
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("FORECAST ALL PRODUCTION SERIES")
+    print("=" * 70)
+    print()
+
+    df = read_production(args)
+    if args.area:
+        df = df[df["priceArea"].isin(args.area)]
+    combos = sorted(df[["priceArea", "productionGroup"]].drop_duplicates()
+                    .astype(str).itertuples(index=False, name=None))
+    print(f"[OK] {len(df):,} rows, {len(combos)} series, models: {', '.join(args.models)}, "
+          f"workers: {args.workers}")
+    print()
+
+    t0 = time.perf_counter()
+    report = forecast_all(
+        df, combos,
+        models=args.models,
+        workers=args.workers,
+        horizon=args.horizon,
+        train_days=args.train_days,
+        fit_dir=Path(args.fit_dir),
+        reuse=not args.refit,
+    )
+    elapsed = time.perf_counter() - t0
+
+    print(report.to_string(index=False))
+    print()
+    errors = report["status"].astype(str).str.startswith("error")
+    counts = report["status"].where(~errors, "error").value_counts().to_dict()
+    print(f"[OK] {len(report)} fits in {elapsed:.1f}s: {counts}")
+    if errors.any():
+        print(f"[ERROR] {int(errors.sum())} fit(s) failed")
+        sys.exit(1)
+    print("[SUCCESS] Fits stored in", args.fit_dir)
+
+
+if __name__ == "__main__":
+    main()
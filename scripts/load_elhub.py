@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Bulk-load Elhub production data into MongoDB and Cassandra
+Assessment 4
+
+Takes the frame written by scripts/fetch_2021_elhub.py
+(data/production_2021_cleaned.csv) - or fetches it fresh with --fetch -
+runs the ingest normalisation stage (label cleaning, placeholder groups
+dropped, duplicate hours removed) and writes it with batched, idempotent
+writes:
+
+  MongoDB:   insert_many(ordered=False) into an empty collection,
+             bulk_write upserts on (priceArea, productionGroup, startTime)
+             otherwise; into the time-series collection (once migrated with
+             scripts/migrate_mongo_timeseries.py, or --mongo-layout
+             timeseries) the loaded hours are replaced per series
+  Cassandra: prepared INSERTs in UNLOGGED batches grouped by partition key,
+             executed concurrently
+
+Daily and monthly rollups (lib/rollups.py) are refreshed for the months
+touched by the load. Re-running the loader never duplicates rows. Finally
+the data version of each written collection/table is bumped
+(lib/data_version.py) so the app's caches refresh on the next rerun.
+
+Usage:
+    python scripts/load_elhub.py
+    python scripts/load_elhub.py --cassandra-table elhub_production_by_month
+    python scripts/load_elhub.py --fetch --no-mongo --cassandra-table elhub_production_by_month
+    python scripts/load_elhub.py --mongo-layout timeseries
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.elhub_loader import (
+    CASSANDRA_BATCH_SIZE,
+    CASSANDRA_CONCURRENCY,
+    MONGO_BATCH_SIZE,
+    get_mongo_uri,
+    load_to_cassandra,
+    load_to_mongo,
+    load_to_mongo_timeseries,
+    prepare_production_frame,
+)
+from lib.cassandra_schema import bucketed_table
+from lib.data_version import bump_cassandra_version, bump_mongo_version
+from lib.mongo_timeseries import TimeSeriesCollection, create_timeseries_collection, production_collection
+from lib.rollups import rebuild_mongo_rollups, update_cassandra_rollups, update_mongo_rollups
+
+DEFAULT_CSV = "data/production_2021_cleaned.csv"
+
+
+def print_report(report: dict):
+    print(f"[OK] {report['target']}: {report['rows']:,} rows in {report['seconds']:.2f}s "
+          f"({report['rows_per_s']:,.0f} rows/s)")
+    for k, v in report.items():
+        if k not in ("target", "rows", "seconds", "rows_per_s"):
+            print(f"     {k}: {v}")
+    print()
+
+
+def read_input(args) -> pd.DataFrame:
+    if args.fetch:
+        from fetch_2021_elhub import fetch_elhub_2021_production
+        df = fetch_elhub_2021_production()
+        if df is None or df.empty:
+            raise SystemExit("[ERROR] Elhub fetch returned no data")
+        return df
+
+    if not Path(args.csv).exists():
+        raise SystemExit(f"[ERROR] {args.csv} not found - run scripts/fetch_2021_elhub.py first")
+    return pd.read_csv(args.csv)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load Elhub production data")
+    parser.add_argument("--csv", default=DEFAULT_CSV, help="Cleaned production CSV")
+    parser.add_argument("--fetch", action="store_true", help="Fetch from the Elhub API instead of --csv")
+    parser.add_argument("--no-mongo", action="store_true", help="Skip the MongoDB load")
+    parser.add_argument("--database", default="ind320")
+    parser.add_argument("--collection", default="production_2021")
+    parser.add_argument("--mongo-mode", choices=["auto", "insert", "upsert"], default="auto")
+    parser.add_argument("--mongo-layout", choices=["auto", "documents", "timeseries"], default=None,
+                        help="Target layout (default: IND320_MONGO_LAYOUT, else auto = time-series once migrated)")
+    parser.add_argument("--mongo-batch-size", type=int, default=MONGO_BATCH_SIZE)
+    parser.add_argument("--mongo-workers", type=int, default=4)
+    parser.add_argument("--rebuild-rollups", action="store_true",
+                        help="Rebuild the MongoDB rollups from the whole collection")
+    parser.add_argument("--cassandra-table", default=None,
+                        help="Cassandra table to load; legacy elhub_* names map to their bucketed table (skipped when not given)")
+    parser.add_argument("--cassandra-hosts", help="host[:port],... (default: every docker-compose node)")
+    parser.add_argument("--keyspace", default="ind320")
+    parser.add_argument("--cassandra-batch-size", type=int, default=CASSANDRA_BATCH_SIZE)
+    parser.add_argument("--cassandra-concurrency", type=int, default=CASSANDRA_CONCURRENCY)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("BULK LOAD ELHUB PRODUCTION DATA")
+    print("=" * 70)
+    print()
+
+    df = prepare_production_frame(read_input(args))
+    print(f"[OK] Prepared {len(df):,} rows "
+          f"({df['startTime'].min()} to {df['startTime'].max()})")
+    print()
+
+    if not args.no_mongo:
+        from pymongo import MongoClient
+
+        uri = get_mongo_uri()
+        if not uri:
+            raise SystemExit("[ERROR] Set MONGO_URI or add it to .streamlit/secrets.toml")
+        client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+        db = client[args.database]
+        hourly, name = production_collection(db, args.collection, layout=args.mongo_layout)
+        if isinstance(hourly, TimeSeriesCollection):
+            create_timeseries_collection(db, name)
+            print_report(load_to_mongo_timeseries(
+                df, hourly.raw,
+                batch_size=args.mongo_batch_size,
+                workers=args.mongo_workers,
+            ))
+        else:
+            print_report(load_to_mongo(
+                df, hourly,
+                batch_size=args.mongo_batch_size,
+                workers=args.mongo_workers,
+                mode=args.mongo_mode,
+            ))
+        if args.rebuild_rollups:
+            rebuild_mongo_rollups(db, source=hourly)
+            print("[OK] MongoDB rollups rebuilt")
+        else:
+            n = update_mongo_rollups(db, df, source=hourly)
+            print(f"[OK] MongoDB rollups updated for {n} series")
+        version = bump_mongo_version(db, name, rows=len(df))
+        print(f"[OK] {name} data version -> {version}")
+        print()
+        client.close()
+
+    if args.cassandra_table:
+        from lib.cassandra_cluster import build_cluster, cluster_settings
+
+        # Legacy elhub_* names map to the bucketed table the app reads and versions
+        table = bucketed_table(args.cassandra_table)
+        if table != args.cassandra_table:
+            print(f"[OK] {args.cassandra_table} is a legacy table name, loading {table}")
+
+        cluster = build_cluster(cluster_settings(hosts=args.cassandra_hosts), ingest=True)
+        session = cluster.connect(args.keyspace)
+        report = load_to_cassandra(
+            df, session, table,
+            batch_size=args.cassandra_batch_size,
+            concurrency=args.cassandra_concurrency,
+        )
+        print_report(report)
+        if report["failed_batches"]:
+            # Rollups and the version bump would publish a partial load
+            cluster.shutdown()
+            raise SystemExit(f"[ERROR] {report['failed_batches']} of {report['batches']} Cassandra batches "
+                             "failed; re-run the load (writes are idempotent)")
+        n = update_cassandra_rollups(session, df, table)
+        print(f"[OK] Cassandra rollups updated for {n} series")
+        version = bump_cassandra_version(session, table, rows=len(df))
+        print(f"[OK] {table} data version -> {version}")
+        print()
+        cluster.shutdown()
+
+    print("[SUCCESS] Load complete")
+
+
+if __name__ == "__main__":
+    main()
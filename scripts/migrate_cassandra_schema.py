@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Migrate Elhub Cassandra tables to the time-bucketed schema
+Assessment 4
+
+Creates elhub_production_by_month / elhub_consumption_by_month
+(PRIMARY KEY ((pricearea, group, year_month), starttime)) and copies every
+legacy elhub_* table that exists into them with parallel token-range scans.
+The copy is an upsert, so the script can be re-run safely.
+
+Usage:
+    python scripts/migrate_cassandra_schema.py
+    python scripts/migrate_cassandra_schema.py --tables elhub_production_2022_2024 --splits 256
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.cassandra_cluster import build_cluster, cluster_settings
+from lib.cassandra_schema import BUCKETED_TABLES, create_bucketed_tables, migrate_table
+from lib.data_version import bump_cassandra_version
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate Elhub tables to time-bucketed partitions")
+    parser.add_argument("--hosts", help="host[:port],... (default: every docker-compose node)")
+    parser.add_argument("--keyspace", default="ind320")
+    parser.add_argument("--tables", nargs="*", default=list(BUCKETED_TABLES),
+                        help="Legacy tables to copy (missing ones are skipped)")
+    parser.add_argument("--splits", type=int, default=64, help="Token ranges to scan")
+    parser.add_argument("--workers", type=int, default=8, help="Token ranges scanned in parallel")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("CASSANDRA SCHEMA MIGRATION: TIME-BUCKETED PARTITIONS")
+    print("=" * 70)
+    print()
+
+    cluster = build_cluster(cluster_settings(hosts=args.hosts), ingest=True)
+    session = cluster.connect(args.keyspace)
+    create_bucketed_tables(session)
+    cluster.refresh_schema_metadata()
+    print("[OK] Bucketed tables created")
+    print()
+
+    existing = cluster.metadata.keyspaces[args.keyspace].tables
+    for source in args.tables:
+        if source not in existing:
+            print(f"[SKIP] {source} does not exist")
+            continue
+        report = migrate_table(session, source, splits=args.splits, workers=args.workers)
+        print(f"[OK] {report['source']} -> {report['target']}: {report['rows']:,} rows "
+              f"in {report['seconds']:.1f}s ({report['rows_per_s']:,.0f} rows/s)")
+        bump_cassandra_version(session, report['target'], rows=report['rows'])
+
+    cluster.shutdown()
+    print()
+    print("[SUCCESS] Migration complete - cassandra_client now reads the bucketed tables")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Migrate MongoDB production data to a time-series collection
+Assessment 4
+
+Creates production_ts (timeField startTime, metaField {priceArea,
+productionGroup}, granularity hours) and copies production_2021 into it
+series by series, then compares row counts and kWh totals per series.
+Series already copied are skipped, so the script can be re-run after an
+interruption. When every series matches, the production_ts data version is
+bumped and apps in IND320_MONGO_LAYOUT=auto mode switch to it within a few
+minutes (lib/mongo_timeseries.py); production_2021 is left in place.
+
+Usage:
+    python scripts/migrate_mongo_timeseries.py
+    python scripts/migrate_mongo_timeseries.py --drop --batch-size 20000
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lib.data_version import bump_mongo_version
+from lib.elhub_loader import get_mongo_uri
+from lib.mongo_timeseries import SOURCE_COLLECTION, TS_BATCH_SIZE, TS_COLLECTION, migrate_to_timeseries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy production into a MongoDB time-series collection")
+    parser.add_argument("--uri", help="MongoDB URI (default: MONGO_URI or .streamlit/secrets.toml)")
+    parser.add_argument("--database", default="ind320")
+    parser.add_argument("--source", default=SOURCE_COLLECTION)
+    parser.add_argument("--target", default=TS_COLLECTION)
+    parser.add_argument("--batch-size", type=int, default=TS_BATCH_SIZE, help="Measurements per insert_many")
+    parser.add_argument("--drop", action="store_true", help="Recreate the target instead of resuming")
+    args = parser.parse_args()
+
+    from pymongo import MongoClient
+
+    print("=" * 70)
+    print("MONGODB MIGRATION: TIME-SERIES COLLECTION")
+    print("=" * 70)
+    print()
+
+    uri = args.uri or get_mongo_uri()
+    if not uri:
+        print("[ERROR] Set MONGO_URI, add it to .streamlit/secrets.toml or pass --uri")
+        sys.exit(1)
+
+    client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+    db = client[args.database]
+    report = migrate_to_timeseries(
+        db, args.source, args.target,
+        batch_size=args.batch_size,
+        drop=args.drop,
+        progress=lambda series, rows: print(f"[OK] {series}: {rows:,} rows"),
+    )
+    print()
+    print(f"[OK] {args.source} -> {args.target}: {report['rows']:,} rows in {report['seconds']:.1f}s "
+          f"({report['series_copied']} series copied, {report['series_skipped']} already complete)")
+
+    if report["mismatched"]:
+        print(f"[ERROR] Counts or totals differ for: {', '.join(report['mismatched'])}")
+        print("        Re-run the script; the layout is not switched until every series matches")
+        client.close()
+        sys.exit(1)
+
+    version = bump_mongo_version(db, args.target, rows=report["rows"])
+    client.close()
+    print(f"[OK] {args.target} data version -> {version}")
+    print()
+    print("[SUCCESS] Migration verified - mongodb_client now reads the time-series collection")
+
+
+if __name__ == "__main__":
+    main()